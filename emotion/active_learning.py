@@ -0,0 +1,274 @@
+"""
+저신뢰 샘플만 LLM 재라벨링(LabelRetest)으로 보내는 액티브 러닝 단계
+
+20250907_data_retest.ipynb는 모든 증강 행을 LabelRetest로 보냈습니다.
+여기서는 저장된 임베딩 분류기(pipeline.EmotionClassificationPipeline)로 전체를 먼저 점수화하고
+다음 중 하나에 해당하는 행만 LLM으로 보냅니다.
+    - 분류기 확신도(category1/category2 중 낮은 쪽)가 confidence_threshold 미만
+    - category1 확률 1, 2위 차이(margin)가 margin_threshold 미만
+    - 분류기 예측과 기존 라벨이 다름
+나머지 행은 기존 라벨을 re_category1/re_category2로 그대로 사용합니다.
+LLM이 돌려준 라벨은 IncrementalLabelModel에 partial_fit으로 누적 학습되고,
+min_incremental_seen개 이상 학습한 뒤부터는 라우팅에도 함께 쓰입니다. (LLM 라벨을 흉내 내는 모델)
+    - 점진 모델이 기존 라벨을 확신도 confidence_threshold 이상으로 예측하면 위 조건에 걸려도 LLM으로 보내지 않음
+    - 점진 모델이 다른 라벨을 확신도 confidence_threshold 이상으로 예측하면 위 조건에 안 걸려도 LLM으로 보냄
+
+사용법:
+    python active_learning.py 33증강데이터_48개.xlsx retest_augmentation.xlsx \\
+        --pipeline emotion_pipeline.joblib --incremental-model incremental_label_model.joblib
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+
+from taxonomy import HIERARCHY, is_valid_pair
+
+ALL_PAIRS = np.asarray([f'{parent}_{child}' for parent, children in HIERARCHY.items() for child in children])
+
+
+class IncrementalLabelModel:
+    """
+    LLM 재라벨 결과로 점진 학습하는 '중분류_소분류' 복합 라벨 분류기
+
+    클래스는 taxonomy의 모든 유효 조합으로 고정하므로 처음 보는 조합이 와도 partial_fit이 가능합니다.
+    """
+
+    def __init__(self, alpha=1e-4, random_state=42):
+        self.model = SGDClassifier(loss='log_loss', alpha=alpha, random_state=random_state)
+        self.n_seen = 0
+
+    def partial_fit(self, X, category1, category2):
+        labels = np.char.add(np.char.add(np.asarray(category1, dtype=str), '_'), np.asarray(category2, dtype=str))
+        valid = np.isin(labels, ALL_PAIRS)
+        if valid.any():
+            self.model.partial_fit(np.asarray(X)[valid], labels[valid], classes=ALL_PAIRS)
+            self.n_seen += int(valid.sum())
+        return self
+
+    def is_ready(self, min_seen):
+        return self.n_seen >= min_seen and hasattr(self.model, 'classes_')
+
+    def predict(self, X):
+        """(category1, category2, confidence) 배열"""
+        proba = self.model.predict_proba(X)
+        idx = proba.argmax(axis=1)
+        pairs = np.char.partition(self.model.classes_[idx].astype(str), '_')
+        return pairs[:, 0], pairs[:, 2], proba[np.arange(len(idx)), idx]
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+
+def select_for_retest(prediction, category1, category2, confidence_threshold=0.8, margin_threshold=0.2,
+                      incremental=None):
+    """
+    LLM으로 보낼 행 선택
+
+    Args:
+        prediction: EmotionClassificationPipeline.predict_vectors 결과
+        category1, category2: 기존 라벨
+        incremental: IncrementalLabelModel.predict 결과 (category1, category2, confidence), 없으면 None
+
+    Returns:
+        DataFrame: low_confidence, low_margin, disagree, model_agree, model_disagree, selected 불리언 컬럼
+    """
+    cat1_proba = np.sort(prediction['category1_proba'], axis=1)
+    margin = cat1_proba[:, -1] - (cat1_proba[:, -2] if cat1_proba.shape[1] > 1 else 0.0)
+    confidence = np.minimum(prediction['category1_confidence'], prediction['category2_confidence'])
+
+    reasons = pd.DataFrame({
+        'low_confidence': confidence < confidence_threshold,
+        'low_margin': margin < margin_threshold,
+        'disagree': (prediction['category1'] != np.asarray(category1))
+                    | (prediction['category2'] != np.asarray(category2)),
+    })
+    selected = reasons.any(axis=1).to_numpy()
+
+    model_agree = np.zeros(len(reasons), dtype=bool)
+    model_disagree = np.zeros(len(reasons), dtype=bool)
+    if incremental is not None:
+        inc_category1, inc_category2, inc_confidence = incremental
+        same = (inc_category1 == np.asarray(category1, dtype=str)) & (inc_category2 == np.asarray(category2, dtype=str))
+        confident = inc_confidence >= confidence_threshold
+        model_agree = confident & same
+        model_disagree = confident & ~same
+        selected = (selected & ~model_agree) | model_disagree
+
+    reasons['model_agree'] = model_agree
+    reasons['model_disagree'] = model_disagree
+    reasons['selected'] = selected
+    return reasons
+
+
+def parse_retest_response(response):
+    """LabelRetest 응답 '중분류,소분류' → (중분류, 소분류), 형식이 다르거나 응답이 없으면 (None, None)"""
+    if response is None:
+        return None, None
+    categories = [c.strip() for c in str(response).strip().strip('[]').replace("'", '').split(',')]
+    if len(categories) < 2 or not categories[0] or not categories[1]:
+        return None, None
+    return categories[0], categories[1]
+
+
+def active_retest(df, pipeline, retest, text_column='generator_context',
+                  confidence_threshold=0.8, margin_threshold=0.2,
+                  incremental_model=None, min_incremental_seen=500, max_workers=4, chunk_size=1000):
+    """
+    저신뢰/불일치 행만 LLM 재라벨링
+
+    Args:
+        df: text_column, category1, category2 컬럼을 가진 DataFrame
+        pipeline: EmotionClassificationPipeline
+        retest: LabelRetest (create_categories(context, category1, category2))
+        incremental_model: 지정하면 chunk마다 LLM 라벨로 partial_fit
+        min_incremental_seen: 점진 모델이 이 수 이상 학습했을 때부터 라우팅에 사용
+        max_workers: 동시 LLM 호출 수
+
+    Returns:
+        (result, report): re_category1/re_category2/retest_source 컬럼이 추가된 DataFrame, 통계 dict
+    """
+    start = time.perf_counter()
+    result = df.reset_index(drop=True).copy()
+    result['re_category1'] = result['category1']
+    result['re_category2'] = result['category2']
+    result['retest_source'] = 'model'
+
+    texts = result[text_column].fillna('').astype(str).tolist()
+    reason_counts = {'low_confidence': 0, 'low_margin': 0, 'disagree': 0, 'model_agree': 0, 'model_disagree': 0}
+    llm_calls = 0
+    llm_failures = 0
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for chunk_start in range(0, len(result), chunk_size):
+            rows = np.arange(chunk_start, min(chunk_start + chunk_size, len(result)))
+            X = pipeline.embeddings_model.encode([texts[i] for i in rows])
+            prediction = pipeline.predict_vectors(X)
+            incremental = None
+            if incremental_model is not None and incremental_model.is_ready(min_incremental_seen):
+                incremental = incremental_model.predict(X)
+            reasons = select_for_retest(
+                prediction,
+                result.loc[rows, 'category1'].to_numpy(),
+                result.loc[rows, 'category2'].to_numpy(),
+                confidence_threshold, margin_threshold, incremental,
+            )
+            for name in reason_counts:
+                reason_counts[name] += int(reasons[name].sum())
+
+            selected = rows[reasons['selected'].to_numpy()]
+            def call_llm(i):
+                try:
+                    return retest.create_categories(texts[i], result.at[i, 'category1'], result.at[i, 'category2'])
+                except Exception as e:
+                    print(f"  LLM 오류 (인덱스 {i}): {e}")
+                    return None
+
+            responses = pool.map(call_llm, selected)
+            llm_calls += len(selected)
+
+            relabeled = []
+            for i, response in zip(selected, responses):
+                category1, category2 = parse_retest_response(response)
+                if category1 is None:
+                    llm_failures += 1
+                    continue
+                result.at[i, 're_category1'] = category1
+                result.at[i, 're_category2'] = category2
+                result.at[i, 'retest_source'] = 'llm'
+                relabeled.append(i)
+
+            if incremental_model is not None and relabeled:
+                local = np.searchsorted(rows, relabeled)
+                incremental_model.partial_fit(
+                    X[local],
+                    result.loc[relabeled, 're_category1'].to_numpy(),
+                    result.loc[relabeled, 're_category2'].to_numpy(),
+                )
+
+            print(f"{rows[-1] + 1}/{len(result)} 처리, LLM 호출 {llm_calls}건")
+
+    report = {
+        'total_rows': len(result),
+        'llm_calls': llm_calls,
+        'llm_failures': llm_failures,
+        'calls_saved': len(result) - llm_calls,
+        'calls_saved_ratio': (len(result) - llm_calls) / len(result) if len(result) else 0.0,
+        'changed_labels': int(((result['re_category1'] != result['category1'])
+                               | (result['re_category2'] != result['category2'])).sum()),
+        'invalid_labels': int((~is_valid_pair(result['re_category1'], result['re_category2'])).sum()),
+        'elapsed_sec': time.perf_counter() - start,
+        **{f'reason_{name}': count for name, count in reason_counts.items()},
+    }
+    return result, report
+
+
+def print_report(report):
+    print("=" * 60)
+    print(f"전체 행: {report['total_rows']}개")
+    print(f"LLM 호출: {report['llm_calls']}건 (실패 {report['llm_failures']}건)")
+    print(f"절약한 호출: {report['calls_saved']}건 ({report['calls_saved_ratio'] * 100:.1f}%)")
+    print(f"  - 낮은 확신도: {report['reason_low_confidence']}건")
+    print(f"  - 낮은 margin: {report['reason_low_margin']}건")
+    print(f"  - 기존 라벨과 불일치: {report['reason_disagree']}건")
+    print(f"점진 모델: 기존 라벨 확인 {report['reason_model_agree']}건, 다른 라벨 예측 {report['reason_model_disagree']}건")
+    print(f"라벨 변경: {report['changed_labels']}건, 체계 밖 라벨: {report['invalid_labels']}건")
+    print(f"소요 시간: {report['elapsed_sec']:.1f}초")
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    from langchain_openai_retest import LabelRetest
+    from pipeline import EmotionClassificationPipeline
+
+    parser = argparse.ArgumentParser(description="저신뢰 샘플만 LLM 재라벨링")
+    parser.add_argument('input', help="증강 데이터 엑셀 (예: 33증강데이터_48개.xlsx)")
+    parser.add_argument('output', help="결과 엑셀 (예: retest_augmentation.xlsx)")
+    parser.add_argument('--pipeline', default='emotion_pipeline.joblib')
+    parser.add_argument('--incremental-model', default=None, help="점진 학습 모델 파일 (없으면 새로 생성)")
+    parser.add_argument('--min-incremental-seen', type=int, default=500, help="점진 모델을 라우팅에 쓰기 시작할 학습 수")
+    parser.add_argument('--text-column', default='generator_context')
+    parser.add_argument('--confidence-threshold', type=float, default=0.8)
+    parser.add_argument('--margin-threshold', type=float, default=0.2)
+    parser.add_argument('--max-workers', type=int, default=4)
+    parser.add_argument('--metrics-out', default=None, help="LLM 호출 기록 CSV 경로")
+    args = parser.parse_args()
+
+    incremental_model = None
+    if args.incremental_model:
+        if os.path.exists(args.incremental_model):
+            incremental_model = IncrementalLabelModel.load(args.incremental_model)
+        else:
+            incremental_model = IncrementalLabelModel()
+
+    result, report = active_retest(
+        pd.read_excel(args.input),
+        EmotionClassificationPipeline.load(args.pipeline),
+        LabelRetest(),
+        text_column=args.text_column,
+        confidence_threshold=args.confidence_threshold,
+        margin_threshold=args.margin_threshold,
+        incremental_model=incremental_model,
+        min_incremental_seen=args.min_incremental_seen,
+        max_workers=args.max_workers,
+    )
+    result.to_excel(args.output, index=False)
+    if incremental_model is not None:
+        incremental_model.save(args.incremental_model)
+    print_report(report)
+
+    from llm_metrics import get_metrics
+    metrics = get_metrics()
+    print(metrics.summary().to_string(index=False))
+    if args.metrics_out:
+        metrics.to_csv(args.metrics_out)
@@ -0,0 +1,155 @@
+"""
+감정 분류 API 서버
+
+사용법:
+    EMOTION_MODEL_PATH=emotion_pipeline.joblib uvicorn api:app --port 8001
+    EMOTION_BACKEND=onnx-int8 EMOTION_ONNX_DIR=.onnx/snowflake-ko EMOTION_NUM_THREADS=4 uvicorn api:app
+
+POST /predict {"texts": ["..."]} → 각 텍스트의 category1/category2 와 확률
+동시에 들어온 요청들은 MicroBatcher가 모아 한 번의 임베딩 forward pass로 처리합니다.
+"""
+
+import asyncio
+import os
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from pipeline import EmotionClassificationPipeline
+
+MODEL_PATH = os.getenv("EMOTION_MODEL_PATH", "emotion_pipeline.joblib")
+MAX_BATCH_SIZE = int(os.getenv("EMOTION_MAX_BATCH_SIZE", "64"))
+MAX_WAIT_MS = float(os.getenv("EMOTION_MAX_WAIT_MS", "5"))
+BACKEND = os.getenv("EMOTION_BACKEND", "torch")
+ONNX_DIR = os.getenv("EMOTION_ONNX_DIR")
+NUM_THREADS = int(os.getenv("EMOTION_NUM_THREADS", "0")) or None
+
+
+class PredictIn(BaseModel):
+    texts: list[str]
+
+
+class Prediction(BaseModel):
+    text: str
+    category1: str
+    category1_confidence: float
+    category2: str
+    category2_confidence: float
+
+
+class PredictOut(BaseModel):
+    predictions: list[Prediction]
+
+
+class MicroBatcher:
+    """
+    동시 요청을 max_wait_ms 동안 또는 max_batch_size개까지 모아 한 번에 예측
+
+    모델 호출은 한 번에 하나씩 스레드 풀에서 실행되므로 이벤트 루프를 막지 않습니다.
+    """
+
+    def __init__(self, pipeline, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.pipeline = pipeline
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def predict(self, texts):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, future))
+        return await future
+
+    async def _collect(self):
+        items = [await self.queue.get()]
+        size = len(items[0][0])
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            items.append(item)
+            size += len(item[0])
+        return items
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            texts = [text for item_texts, _ in items for text in item_texts]
+            try:
+                results = await loop.run_in_executor(None, self.pipeline.predict_batch, texts)
+            except Exception as e:
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            start = 0
+            for item_texts, future in items:
+                if not future.done():
+                    future.set_result(results[start:start + len(item_texts)])
+                start += len(item_texts)
+
+
+app = FastAPI(title="Emotion Classification API")
+batcher = None
+
+
+@app.on_event("startup")
+async def startup():
+    global batcher
+    if BACKEND not in ("torch", "onnx", "onnx-int8"):
+        raise RuntimeError(f"EMOTION_BACKEND={BACKEND}: torch, onnx, onnx-int8 중 하나여야 합니다")
+    if BACKEND != "torch" and not ONNX_DIR:
+        raise RuntimeError(f"EMOTION_BACKEND={BACKEND}에는 EMOTION_ONNX_DIR이 필요합니다")
+    # 임베딩 모델은 파이프라인에 저장된 이름으로 만들고, ONNX면 backend.json의 model_name과 같은지 확인
+    pipeline = EmotionClassificationPipeline.load(
+        MODEL_PATH, backend=BACKEND, onnx_dir=ONNX_DIR, num_threads=NUM_THREADS)
+    try:
+        # 첫 요청이 모델 로드 비용을 내지 않도록 미리 한 번 인코딩
+        pipeline.embeddings_model.encode(["dummy_text"])
+    except ValueError as e:
+        raise RuntimeError(f"임베딩 모델 로드 실패: {e}") from e
+    batcher = MicroBatcher(pipeline)
+    batcher.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    if batcher:
+        await batcher.stop()
+
+
+@app.post("/predict", response_model=PredictOut)
+async def predict(request: PredictIn):
+    if not request.texts:
+        return {"predictions": []}
+    results = await batcher.predict(request.texts)
+    return {
+        "predictions": [
+            {
+                "text": r['text'],
+                "category1": r['category1_predicted'],
+                "category1_confidence": r['category1_confidence'],
+                "category2": r['category2_predicted'],
+                "category2_confidence": r['category2_confidence'],
+            }
+            for r in results
+        ]
+    }
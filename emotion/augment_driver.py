@@ -0,0 +1,428 @@
+"""
+멀티프로세스 데이터 증강 드라이버
+
+20250905_data_augmentation_cyclic.ipynb의 순환 증강을 (중분류, 소분류)별로 나눠
+여러 워커 프로세스에서 동시에 실행합니다.
+
+- 카테고리마다 target_count개의 슬롯을 만듭니다.
+  슬롯 s < 원본 수 : 원본 s번째 context로 생성 (original_index)
+  슬롯 s >= 원본 수 : 슬롯 (s - 원본 수)의 생성 결과로 다시 생성 (augmentation_index, 노트북의 순환 참조와 동일)
+  순환 슬롯도 중복 검사를 거치므로 생성 결과가 참고 context의 복사본으로 굳어지지 않습니다.
+- 남은 슬롯 수 기준으로 카테고리를 워커에 고르게 나눕니다.
+- 워커는 각자 asyncio 루프와 ChatOpenAI 클라이언트를 가지며 전체 분당 요청 수(--rpm)를 워커 수로 나눠 씁니다.
+- 결과는 워커별 append-only 저널(journal_dir/worker-N.jsonl)에 한 줄씩 기록하므로
+  중간에 멈춰도 다시 실행하면 남은 슬롯만 생성합니다. merge_journal이 저널을 합쳐 최종 DataFrame을 만듭니다.
+- 생성 결과는 DedupContextGenerator로 같은 카테고리의 기존 context(이전 실행의 저널 포함)와 비교해
+  코사인 유사도가 --dedup-threshold 이상이면 다시 생성합니다.
+- 모든 워커가 공유하는 토큰 카운터가 --token-budget에 도달하면 새 호출을 멈추고 깨끗하게 종료합니다.
+- 워커별 LLM 호출 기록(llm_metrics)은 journal_dir/metrics-<run_id>-*.csv 로 남고,
+  종료 시 카테고리별 요약 CSV와 Prometheus 텍스트(.prom)를 만듭니다.
+
+사용법:
+    python augment_driver.py 증강할데이터33.xlsx 33증강데이터_48개.xlsx \\
+        --target-count 48 --workers 4 --concurrency 8 --rpm 500 --token-budget 2000000 \\
+        --journal-dir data/augment_journal --model gpt-4.1-mini
+"""
+
+import asyncio
+import glob
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import sys
+import time
+
+import pandas as pd
+
+from embedding import MODEL_NAME
+
+JOURNAL_COLUMNS = ['generator_context', 'category1', 'category2', 'input_context',
+                   'original_index', 'augmentation_index']
+
+
+def read_journal(journal_dir):
+    """저널의 모든 레코드 (같은 슬롯이 여러 번 있으면 먼저 기록된 것만)"""
+    records = {}
+    for path in sorted(glob.glob(os.path.join(journal_dir, 'worker-*.jsonl'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 강제 종료로 마지막 줄이 잘린 경우
+                    continue
+                records.setdefault((record['category1'], record['category2'], record['slot']), record)
+    return records
+
+
+def merge_journal(journal_dir):
+    """저널 → 노트북과 같은 컬럼의 증강 DataFrame (카테고리, 슬롯 순)"""
+    records = read_journal(journal_dir)
+    if not records:
+        return pd.DataFrame(columns=JOURNAL_COLUMNS)
+    df = pd.DataFrame([records[key] for key in sorted(records)])
+    return df[JOURNAL_COLUMNS].reset_index(drop=True)
+
+
+def build_tasks(df, target_count, journal_dir):
+    """카테고리별 작업 (원본 목록, 저널에서 이미 끝난 슬롯 포함)"""
+    done = read_journal(journal_dir)
+    tasks = []
+    for (category1, category2), group in df.groupby(['category1', 'category2']):
+        selected = group.iloc[:target_count]
+        finished = {
+            slot: record['generator_context']
+            for (c1, c2, slot), record in done.items()
+            if c1 == category1 and c2 == category2
+        }
+        tasks.append({
+            'category1': category1,
+            'category2': category2,
+            'originals': [(int(idx), str(context)) for idx, context in selected['context'].items()],
+            'target': target_count,
+            'done': finished,
+        })
+    return tasks
+
+
+def partition_tasks(tasks, workers):
+    """남은 슬롯 수가 큰 카테고리부터 가장 한가한 워커에 배정"""
+    buckets = [[] for _ in range(workers)]
+    loads = [0] * workers
+    for task in sorted(tasks, key=lambda t: t['target'] - len(t['done']), reverse=True):
+        remaining = task['target'] - len(task['done'])
+        if remaining <= 0:
+            continue
+        i = loads.index(min(loads))
+        buckets[i].append(task)
+        loads[i] += remaining
+    return [bucket for bucket in buckets if bucket]
+
+
+class RateLimiter:
+    """초당 rate회 이하로 호출 간격을 벌리는 비동기 리미터"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class _Worker:
+    def __init__(self, worker_id, journal_dir, options, tokens_used, stop_event, progress):
+        from dedup import DedupContextGenerator
+        from embedding import Embedder
+        from langchain_openai_augmentation import ContextGenerator
+
+        self.worker_id = worker_id
+        self.options = options
+        self.tokens_used = tokens_used
+        self.stop_event = stop_event
+        self.progress = progress
+        # 재생성/재시도를 포함한 실제 LLM 호출마다 리미터 슬롯을 받음
+        self.limiter = RateLimiter(options['rate_per_sec'])
+        self.generator = DedupContextGenerator(
+            ContextGenerator(model=options['model'], max_retries=options['max_retries'],
+                             before_call=self.limiter.wait),
+            Embedder(options['embedding_model']),
+            threshold=options['dedup_threshold'],
+            max_retries=options['dedup_retries'],
+        )
+        self.journal = open(os.path.join(journal_dir, f'worker-{worker_id}.jsonl'), 'a', encoding='utf-8')
+        self.semaphore = asyncio.Semaphore(options['concurrency'])
+
+    def _over_budget(self):
+        budget = self.options['token_budget']
+        if budget and self.tokens_used.value >= budget:
+            self.stop_event.set()
+        return self.stop_event.is_set()
+
+    async def _generate(self, source, category1, category2):
+        """
+        한 건 생성 → (context, 사용 토큰), 예산 소진 시 None
+
+        호출 재시도는 ContextGenerator가, 같은 카테고리의 기존 context와 너무 유사한 결과의
+        재생성은 DedupContextGenerator가 수행합니다. 버려진 생성의 토큰도 예산에 포함하고,
+        재생성과 재시도도 호출마다 리미터를 거칩니다.
+        """
+        if self._over_budget():
+            return None
+        tokens = 0
+
+        def count_tokens(response):
+            nonlocal tokens
+            usage = getattr(response, 'usage_metadata', None) or {}
+            used = int(usage.get('total_tokens', 0))
+            tokens += used
+            with self.tokens_used.get_lock():
+                self.tokens_used.value += used
+
+        context = await self.generator.acreate_context(source, category1, category2, on_response=count_tokens)
+        return context, tokens
+
+    async def _run_slot(self, task, outputs, slot):
+        category1, category2 = task['category1'], task['category2']
+        n_originals = len(task['originals'])
+        if slot < n_originals:
+            original_index, source = task['originals'][slot]
+            augmentation_index = None
+        else:
+            original_index, source = None, outputs[slot - n_originals]
+            augmentation_index = slot - n_originals
+
+        async with self.semaphore:
+            try:
+                result = await self._generate(source, category1, category2)
+            except Exception as e:
+                self.progress.put(('error', category1, category2, f'슬롯 {slot}: {e}'))
+                return
+        if result is None:
+            return
+
+        context, tokens = result
+        outputs[slot] = context
+        self.journal.write(json.dumps({
+            'category1': category1,
+            'category2': category2,
+            'slot': slot,
+            'generator_context': context,
+            'input_context': source,
+            'original_index': original_index,
+            'augmentation_index': augmentation_index,
+            'tokens': tokens,
+            'worker': self.worker_id,
+        }, ensure_ascii=False) + '\n')
+        self.journal.flush()
+        self.progress.put(('done', category1, category2, tokens))
+
+    async def _run_task(self, task):
+        """원본 슬롯을 먼저, 이후 순환 슬롯은 소스가 준비된 것부터 묶어서 실행"""
+        outputs = dict(task['done'])
+        n_originals = len(task['originals'])
+        pending = [slot for slot in range(task['target']) if slot not in outputs]
+        while pending and not self.stop_event.is_set():
+            ready = [slot for slot in pending if slot < n_originals or slot - n_originals in outputs]
+            if not ready:
+                # 소스 슬롯이 실패해 더 진행할 수 없음 (다시 실행하면 이어서 생성)
+                break
+            await asyncio.gather(*(self._run_slot(task, outputs, slot) for slot in ready))
+            if not any(slot in outputs for slot in ready):
+                break
+            pending = [slot for slot in pending if slot not in outputs]
+
+    async def run(self, tasks):
+        # 이전 실행에서 저널에 남은 context를 카테고리별 중복 검사 인덱스에 등록
+        for task in tasks:
+            await asyncio.to_thread(
+                self.generator.seed, list(task['done'].values()), task['category1'], task['category2'])
+        try:
+            await asyncio.gather(*(self._run_task(task) for task in tasks))
+        finally:
+            self.journal.close()
+
+
+def _worker_main(worker_id, tasks, journal_dir, options, tokens_used, stop_event, progress):
+    from llm_metrics import get_metrics
+
+    # Ctrl+C는 메인 프로세스가 stop_event로 전달하므로 워커는 무시 (진행 중 호출과 저널 기록을 마침)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    metrics = get_metrics()
+    metrics.reset(options['run_id'])
+    worker = _Worker(worker_id, journal_dir, options, tokens_used, stop_event, progress)
+    try:
+        asyncio.run(worker.run(tasks))
+    finally:
+        metrics.to_csv(os.path.join(journal_dir, f"metrics-{options['run_id']}-worker-{worker_id}.csv"))
+
+
+class ProgressView:
+    """카테고리별 진행률과 전체 ETA를 주기적으로 다시 그리는 터미널 표"""
+
+    def __init__(self, tasks, interval=2.0):
+        self.progress = {(t['category1'], t['category2']): [len(t['done']), t['target']] for t in tasks}
+        self.interval = interval
+        self.start = time.monotonic()
+        self.completed = 0
+        self.tokens = 0
+        self.errors = []
+        self._last_draw = 0.0
+        self._lines = 0
+
+    def update(self, event):
+        kind, category1, category2, value = event
+        if kind == 'done':
+            self.progress[(category1, category2)][0] += 1
+            self.completed += 1
+            self.tokens += value
+        else:
+            self.errors.append(f'{category1} - {category2} {value}')
+
+    def draw(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_draw < self.interval:
+            return
+        self._last_draw = now
+
+        elapsed = now - self.start
+        rate = self.completed / elapsed if elapsed > 0 else 0.0
+        remaining = sum(target - done for done, target in self.progress.values() if done < target)
+        eta = remaining / rate if rate > 0 else float('inf')
+        lines = [
+            f"{category1} - {category2}: {done}/{target}" + (" ✓" if done >= target else "")
+            for (category1, category2), (done, target) in sorted(self.progress.items())
+            if done < target or force
+        ]
+        lines.append(f"완료 {self.completed}건, {rate:.2f}건/초, 남은 {remaining}건, "
+                     f"ETA {eta / 60:.1f}분, 토큰 {self.tokens}, 오류 {len(self.errors)}건")
+
+        if sys.stdout.isatty() and self._lines:
+            # 이전 표를 지우고 다시 그림
+            sys.stdout.write(f"\x1b[{self._lines}F\x1b[J")
+        sys.stdout.write('\n'.join(lines) + '\n')
+        sys.stdout.flush()
+        self._lines = len(lines)
+
+
+def run_augmentation(df, target_count=48, journal_dir='augment_journal', workers=4, concurrency=8,
+                     rpm=500, token_budget=None, model='gpt-4.1-mini', max_retries=3,
+                     embedding_model=None, dedup_threshold=0.9, dedup_retries=3):
+    """
+    (중분류, 소분류)별 target_count개 증강을 워커 프로세스로 나눠 실행
+
+    Args:
+        df: context, category1, category2 컬럼을 가진 원본 DataFrame
+        rpm: 모든 워커 합산 분당 요청 수 (워커마다 rpm / workers)
+        token_budget: 전체 토큰 예산 (None이면 무제한)
+        embedding_model: 중복 검사용 임베딩 모델 (None이면 embedding.MODEL_NAME)
+        dedup_threshold: 같은 카테고리의 기존 context와 코사인 유사도가 이 값 이상이면 다시 생성
+
+    Returns:
+        DataFrame: 저널을 합친 증강 결과
+    """
+    os.makedirs(journal_dir, exist_ok=True)
+    tasks = build_tasks(df, target_count, journal_dir)
+    buckets = partition_tasks(tasks, workers)
+    view = ProgressView(tasks)
+    if not buckets:
+        print("남은 작업이 없습니다")
+        return merge_journal(journal_dir)
+
+    run_id = time.strftime('%Y%m%d-%H%M%S')
+    options = {
+        'run_id': run_id,
+        'model': model,
+        'concurrency': concurrency,
+        'rate_per_sec': rpm / 60 / len(buckets) if rpm else 0,
+        'token_budget': token_budget,
+        'max_retries': max_retries,
+        'embedding_model': embedding_model or MODEL_NAME,
+        'dedup_threshold': dedup_threshold,
+        'dedup_retries': dedup_retries,
+    }
+    context = multiprocessing.get_context('spawn')
+    tokens_used = context.Value('q', 0)
+    stop_event = context.Event()
+    progress = context.Queue()
+
+    processes = [
+        context.Process(target=_worker_main,
+                        args=(i, bucket, journal_dir, options, tokens_used, stop_event, progress))
+        for i, bucket in enumerate(buckets)
+    ]
+    for process in processes:
+        process.start()
+
+    # 중단 요청 후에도 워커가 모두 끝날 때까지 progress를 계속 비움
+    # (큐에 남은 데이터를 다 보내지 못한 워커 프로세스는 종료되지 않아 join이 멈춤)
+    while any(process.is_alive() for process in processes) or not progress.empty():
+        try:
+            try:
+                view.update(progress.get(timeout=0.5))
+            except queue.Empty:
+                pass
+            view.draw()
+        except KeyboardInterrupt:
+            if not stop_event.is_set():
+                # 진행 중 호출만 마치고 멈추도록 신호
+                stop_event.set()
+                print("\n중단 요청: 진행 중인 호출이 끝나면 종료합니다")
+    for process in processes:
+        process.join()
+    view.draw(force=True)
+
+    if stop_event.is_set() and token_budget and tokens_used.value >= token_budget:
+        print(f"토큰 예산 소진 ({tokens_used.value}/{token_budget}), 다시 실행하면 이어서 생성합니다")
+    for error in view.errors[-10:]:
+        print(f"  오류: {error}")
+    report_metrics(journal_dir, run_id)
+    return merge_journal(journal_dir)
+
+
+def report_metrics(journal_dir, run_id):
+    """워커별 LLM 호출 기록을 합쳐 카테고리별 요약 CSV와 Prometheus 텍스트로 저장"""
+    from llm_metrics import load_records, summarize, to_prometheus
+
+    paths = sorted(glob.glob(os.path.join(journal_dir, f'metrics-{run_id}-worker-*.csv')))
+    records = load_records(paths)
+    if records.empty:
+        return
+    summary = summarize(records, ['category1', 'category2'])
+    summary.to_csv(os.path.join(journal_dir, f'metrics-{run_id}-summary.csv'), index=False, encoding='utf-8-sig')
+    with open(os.path.join(journal_dir, f'metrics-{run_id}.prom'), 'w', encoding='utf-8') as f:
+        f.write(to_prometheus(records, ['operation', 'model']))
+
+    total = summarize(records, ['model'])
+    print(total[['model', 'calls', 'errors', 'retries', 'retry_wait_sec', 'prompt_tokens', 'completion_tokens',
+                 'cost_usd', 'latency_p95']].to_string(index=False))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="카테고리별 멀티프로세스 데이터 증강")
+    parser.add_argument('input', help="원본 데이터 엑셀 (예: 증강할데이터33.xlsx)")
+    parser.add_argument('output', help="결과 엑셀 (예: 33증강데이터_48개.xlsx)")
+    parser.add_argument('--target-count', type=int, default=48)
+    parser.add_argument('--journal-dir', default='augment_journal')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--concurrency', type=int, default=8, help="워커당 동시 호출 수")
+    parser.add_argument('--rpm', type=float, default=500, help="전체 분당 요청 수 (0이면 제한 없음)")
+    parser.add_argument('--token-budget', type=int, default=None)
+    parser.add_argument('--model', default='gpt-4.1-mini')
+    parser.add_argument('--max-retries', type=int, default=3)
+    parser.add_argument('--embedding-model', default=None, help="중복 검사용 임베딩 모델")
+    parser.add_argument('--dedup-threshold', type=float, default=0.9)
+    parser.add_argument('--dedup-retries', type=int, default=3, help="유사도 초과 시 다시 생성할 횟수")
+    args = parser.parse_args()
+
+    augmented_df = run_augmentation(
+        pd.read_excel(args.input),
+        target_count=args.target_count,
+        journal_dir=args.journal_dir,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        rpm=args.rpm,
+        token_budget=args.token_budget,
+        model=args.model,
+        max_retries=args.max_retries,
+        embedding_model=args.embedding_model,
+        dedup_threshold=args.dedup_threshold,
+        dedup_retries=args.dedup_retries,
+    )
+    augmented_df.to_excel(args.output, index=False)
+    print(f"결과가 저장되었습니다: {args.output} ({len(augmented_df)}개)")
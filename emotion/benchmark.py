@@ -0,0 +1,284 @@
+"""
+감정 분류 모델 비교 벤치마크
+
+특성(TF-IDF / 임베딩 / PCA 차원)과 모델(LogisticRegression / SVC / XGBoost) 조합을
+K-fold 교차 검증으로 평가하고, 조합별 학습/예측 시간, 최대 메모리, 정확도, F1을 표로 저장합니다.
+최대 메모리(peak_rss_mb)는 같은 실행 중에 워커 프로세스의 RSS를 샘플링해 fold 시작 시점 대비 증가량으로 잽니다.
+(XGBoost 부스터처럼 파이썬 힙 밖의 네이티브 메모리도 포함, --no-memory면 샘플링 생략)
+fold는 프로세스 풀에서 병렬로 실행되며 임베딩은 embedding.Embedder 캐시를 재사용합니다.
+
+사용법:
+    python benchmark.py retest_augmentation.xlsx \\
+        --features tfidf embedding embedding+pca128 tfidf+pca256 \\
+        --models lr svc xgb --folds 5 --workers 4 \\
+        --label-columns category1 category2 --out benchmark_results.csv
+
+특성 표기:
+    tfidf            : retest_model.ipynb와 같은 TfidfVectorizer
+    embedding        : snowflake-arctic-embed-l-v2.0-ko 임베딩
+    <특성>+pca<N>    : N차원 축소 (임베딩은 PCA, 희소 TF-IDF는 TruncatedSVD)
+"""
+
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import LabelEncoder
+
+# 워커 프로세스 전역 데이터 (initializer에서 한 번만 설정)
+_texts = None
+_embeddings = None
+_labels = None
+
+
+def _init_worker(texts, embeddings, labels):
+    global _texts, _embeddings, _labels
+    _texts = texts
+    _embeddings = embeddings
+    _labels = labels
+
+
+def make_model(name):
+    """retest_model.ipynb / model.ipynb에서 사용한 설정"""
+    if name == 'lr':
+        from sklearn.linear_model import LogisticRegression
+        return LogisticRegression(max_iter=1000, random_state=42, class_weight='balanced')
+    if name == 'svc':
+        from sklearn.svm import SVC
+        return SVC(kernel='linear', random_state=42, class_weight='balanced', max_iter=1000)
+    if name == 'xgb':
+        import xgboost as xgb
+        return xgb.XGBClassifier(
+            n_estimators=300,
+            learning_rate=0.05,
+            max_depth=8,
+            subsample=0.8,
+            colsample_bytree=0.8,
+            random_state=42,
+            tree_method="hist",
+            n_jobs=1
+        )
+    raise ValueError(f"알 수 없는 모델: {name}")
+
+
+def parse_feature(spec):
+    """'embedding+pca128' → ('embedding', 128)"""
+    base, _, reduce = spec.partition('+')
+    if base not in ('tfidf', 'embedding'):
+        raise ValueError(f"알 수 없는 특성: {spec}")
+    n_components = None
+    if reduce:
+        if not reduce.startswith('pca'):
+            raise ValueError(f"알 수 없는 차원 축소: {spec}")
+        n_components = int(reduce[3:])
+    return base, n_components
+
+
+def build_features(spec, train_idx, test_idx):
+    """학습 fold에만 fit한 특성 변환기로 (X_train, X_test) 생성"""
+    base, n_components = parse_feature(spec)
+    if base == 'tfidf':
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        vectorizer = TfidfVectorizer(
+            max_features=10000,
+            ngram_range=(1, 2),
+            min_df=2,
+            max_df=0.95,
+            lowercase=True,
+            sublinear_tf=True
+        )
+        X_train = vectorizer.fit_transform(_texts[train_idx])
+        X_test = vectorizer.transform(_texts[test_idx])
+    else:
+        X_train = _embeddings[train_idx]
+        X_test = _embeddings[test_idx]
+
+    if n_components:
+        if base == 'tfidf':
+            from sklearn.decomposition import TruncatedSVD
+            reducer = TruncatedSVD(n_components=n_components, random_state=42)
+        else:
+            from sklearn.decomposition import PCA
+            reducer = PCA(n_components=n_components, random_state=42)
+        X_train = reducer.fit_transform(X_train)
+        X_test = reducer.transform(X_test)
+    return X_train, X_test
+
+
+def _fit_predict(feature, model_name, train_idx, test_idx, y_train):
+    """특성 생성 + 학습 → (예측, 학습 시간, 예측 시간)"""
+    start = time.perf_counter()
+    X_train, X_test = build_features(feature, train_idx, test_idx)
+    model = make_model(model_name)
+    model.fit(X_train, y_train)
+    fit_sec = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    return y_pred, fit_sec, time.perf_counter() - start
+
+
+class RssSampler:
+    """
+    with 블록 동안 백그라운드 스레드에서 interval초마다 현재 프로세스 RSS를 읽어 최댓값을 기록
+
+    peak_mb는 블록 시작 시점 RSS 대비 최대 증가량(MB)입니다.
+    RSS를 읽는 동안만 잠깐 깨어나므로 측정 대상 실행의 시간에는 거의 영향이 없습니다.
+    """
+
+    def __init__(self, interval=0.005):
+        import psutil
+
+        self.interval = interval
+        self.process = psutil.Process()
+        self.start_rss = self.peak_rss = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        self.peak_rss = max(self.peak_rss, self.process.memory_info().rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = self.process.memory_info().rss
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return False
+
+    @property
+    def peak_mb(self):
+        return (self.peak_rss - self.start_rss) / 1024 ** 2
+
+
+def run_fold(task):
+    """(특성, 모델, fold) 하나를 학습/평가하고 측정값 딕셔너리 반환"""
+    feature, model_name, fold, train_idx, test_idx, measure_memory = task
+    y_train, y_test = _labels[train_idx], _labels[test_idx]
+
+    peak_rss_mb = np.nan
+    if measure_memory:
+        with RssSampler() as sampler:
+            y_pred, fit_sec, predict_sec = _fit_predict(feature, model_name, train_idx, test_idx, y_train)
+        peak_rss_mb = sampler.peak_mb
+    else:
+        y_pred, fit_sec, predict_sec = _fit_predict(feature, model_name, train_idx, test_idx, y_train)
+
+    return {
+        'features': feature,
+        'model': model_name,
+        'fold': fold,
+        'fit_sec': fit_sec,
+        'predict_sec': predict_sec,
+        'peak_rss_mb': peak_rss_mb,
+        'accuracy': accuracy_score(y_test, y_pred),
+        'f1_macro': f1_score(y_test, y_pred, average='macro', zero_division=0),
+        'f1_weighted': f1_score(y_test, y_pred, average='weighted', zero_division=0),
+    }
+
+
+def summarize(results):
+    """fold별 결과를 (특성, 모델) 조합별 평균/표준편차 표로 집계"""
+    metrics = ['fit_sec', 'predict_sec', 'peak_rss_mb', 'accuracy', 'f1_macro', 'f1_weighted']
+    summary = results.groupby(['features', 'model'])[metrics].agg(['mean', 'std'])
+    summary.columns = [f'{metric}_{stat}' for metric, stat in summary.columns]
+    return summary.reset_index().sort_values('f1_macro_mean', ascending=False, ignore_index=True)
+
+
+def run_benchmark(texts, labels, features, models, folds=5, workers=None, embeddings=None, seed=42,
+                  measure_memory=True):
+    """
+    벤치마크 그리드 실행
+
+    Args:
+        texts: 텍스트 배열
+        labels: 라벨 배열
+        features, models: 특성/모델 표기 리스트
+        embeddings: embedding 특성을 쓸 경우 (n, dim) 행렬
+        measure_memory: False면 RSS 샘플링을 생략 (peak_rss_mb는 NaN)
+
+    Returns:
+        (results, summary): fold별 결과 DataFrame, 조합별 요약 DataFrame
+    """
+    texts = np.asarray(texts, dtype=object)
+    labels = LabelEncoder().fit_transform(np.asarray(labels))
+    for spec in features:
+        if parse_feature(spec)[0] == 'embedding' and embeddings is None:
+            raise ValueError("embedding 특성에는 embeddings 행렬이 필요합니다")
+
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+    splits = list(splitter.split(texts, labels))
+    tasks = [
+        (feature, model, fold, train_idx, test_idx, measure_memory)
+        for feature in features
+        for model in models
+        for fold, (train_idx, test_idx) in enumerate(splits)
+    ]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(texts, embeddings, labels)) as pool:
+        rows = []
+        for row in pool.map(run_fold, tasks):
+            print(f"{row['features']:>20} {row['model']:>4} fold {row['fold']}: "
+                  f"f1_macro {row['f1_macro']:.4f}, fit {row['fit_sec']:.2f}s")
+            rows.append(row)
+
+    results = pd.DataFrame(rows)
+    return results, summarize(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="감정 분류 모델 비교 벤치마크")
+    parser.add_argument('data', help="엑셀/parquet 데이터 파일")
+    parser.add_argument('--text-column', default='generator_context')
+    parser.add_argument('--label-columns', nargs='+', default=['category1'],
+                        help="여러 개를 주면 '_'로 합친 복합 라벨 사용")
+    parser.add_argument('--features', nargs='+', default=['tfidf', 'embedding'])
+    parser.add_argument('--models', nargs='+', default=['lr', 'svc', 'xgb'])
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--no-memory', action='store_true', help="최대 메모리(RSS) 샘플링 생략")
+    parser.add_argument('--cache-dir', default='.embedding_cache', help="임베딩 캐시 디렉토리")
+    parser.add_argument('--out', default='benchmark_results.csv')
+    args = parser.parse_args()
+
+    if args.data.endswith('.parquet'):
+        data = pd.read_parquet(args.data)
+    else:
+        data = pd.read_excel(args.data)
+    data = data.dropna(subset=[args.text_column, *args.label_columns]).reset_index(drop=True)
+
+    texts = data[args.text_column].astype(str).to_numpy()
+    labels = data[args.label_columns].astype(str).agg('_'.join, axis=1).to_numpy()
+
+    embeddings = None
+    if any(parse_feature(spec)[0] == 'embedding' for spec in args.features):
+        from embedding import Embedder
+        embeddings = Embedder(cache_dir=args.cache_dir).encode(texts, show_progress=True)
+
+    results, summary = run_benchmark(
+        texts, labels, args.features, args.models,
+        folds=args.folds, workers=args.workers, embeddings=embeddings, measure_memory=not args.no_memory,
+    )
+    root, ext = os.path.splitext(args.out)
+    results.to_csv(f'{root}_folds{ext or ".csv"}', index=False, encoding='utf-8-sig')
+    summary.to_csv(args.out, index=False, encoding='utf-8-sig')
+    print(summary.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
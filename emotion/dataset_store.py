@@ -0,0 +1,222 @@
+"""
+파이프라인 단계별 Parquet 데이터셋 저장소
+
+증강할데이터33.xlsx → 33증강데이터_48개.xlsx → retest_augmentation.xlsx → ... 로 이어지던
+엑셀 전달 체인을 대체합니다.
+
+root/
+    <stage>/
+        _manifest.json      : {"version": n, "parts": [{"file", "rows", "version", "created_at"}]}
+        part-00000.parquet  : append-only 파티션 (한 번 쓰면 수정하지 않음)
+
+- 임베딩 벡터는 fixed_size_list<float32> 컬럼으로 저장합니다 (엑셀 셀 문자열 X).
+- 라벨 컬럼은 dictionary(categorical) 타입으로 저장합니다.
+- append 할 때마다 버전이 1씩 증가하며, load(version=n)으로 과거 시점을 읽을 수 있습니다.
+- load(columns=[...])는 필요한 컬럼만 읽습니다.
+
+사용법:
+    python dataset_store.py import data/store augmented 33증강데이터_48개.xlsx
+    python dataset_store.py ls data/store
+    python dataset_store.py export data/store augmented augmented.xlsx
+"""
+
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+MANIFEST = '_manifest.json'
+LABEL_COLUMNS = ('category1', 'category2', 're_category1', 're_category2')
+
+
+def vectors_to_arrow(vectors):
+    """(n, dim) 행렬 → fixed_size_list<float32> 배열 (복사 없이 평탄화)"""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    return pa.FixedSizeListArray.from_arrays(pa.array(vectors.reshape(-1)), vectors.shape[1])
+
+
+def arrow_to_vectors(array):
+    """fixed_size_list 컬럼 → (n, dim) float32 행렬"""
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    dim = array.type.list_size
+    return array.flatten().to_numpy(zero_copy_only=False).reshape(-1, dim)
+
+
+class DatasetStore:
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _stage_dir(self, stage):
+        return os.path.join(self.root, stage)
+
+    def _manifest(self, stage):
+        path = os.path.join(self._stage_dir(stage), MANIFEST)
+        if not os.path.exists(path):
+            return {'version': 0, 'parts': []}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_manifest(self, stage, manifest):
+        path = os.path.join(self._stage_dir(stage), MANIFEST)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def stages(self):
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.exists(os.path.join(self.root, name, MANIFEST))
+        )
+
+    def version(self, stage):
+        return self._manifest(stage)['version']
+
+    def to_table(self, df, vectors=None, vector_column='vector', label_columns=LABEL_COLUMNS):
+        """DataFrame(+벡터 행렬) → 타입이 정해진 Arrow Table"""
+        df = df.copy()
+        if vectors is None and vector_column in df.columns:
+            vectors = np.vstack(df[vector_column].map(np.asarray).to_numpy())
+        df = df.drop(columns=[vector_column], errors='ignore')
+
+        for column in label_columns:
+            if column in df.columns:
+                df[column] = df[column].astype('category')
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # 파티션마다 카테고리 수가 달라도 스키마가 같도록 인덱스 타입을 int32로 고정
+        for column in label_columns:
+            if column in table.column_names:
+                index = table.column_names.index(column)
+                labels = table.column(column).cast(pa.dictionary(pa.int32(), pa.string()))
+                table = table.set_column(index, column, labels)
+        if vectors is not None:
+            if len(vectors) != len(df):
+                raise ValueError(f"벡터 수 불일치: {len(vectors)} != {len(df)}")
+            table = table.append_column(vector_column, vectors_to_arrow(vectors))
+        return table
+
+    def append(self, stage, df, vectors=None, vector_column='vector'):
+        """
+        stage에 새 파티션 추가
+
+        Args:
+            df: 저장할 DataFrame (vector_column에 리스트/배열이 있으면 벡터로 변환)
+            vectors: (n, dim) 임베딩 행렬 (df 대신 별도로 넘길 때)
+
+        Returns:
+            int: 새 버전 번호
+        """
+        table = self.to_table(df, vectors, vector_column)
+        os.makedirs(self._stage_dir(stage), exist_ok=True)
+
+        manifest = self._manifest(stage)
+        version = manifest['version'] + 1
+        filename = f'part-{len(manifest["parts"]):05d}.parquet'
+        pq.write_table(table, os.path.join(self._stage_dir(stage), filename), compression='zstd')
+
+        manifest['version'] = version
+        manifest['parts'].append({
+            'file': filename,
+            'rows': table.num_rows,
+            'version': version,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        })
+        self._save_manifest(stage, manifest)
+        return version
+
+    def dataset(self, stage, version=None):
+        """stage의 (version 시점까지의) pyarrow Dataset, 실제 읽기는 to_table 시점에 수행"""
+        manifest = self._manifest(stage)
+        if not manifest['parts']:
+            raise KeyError(f"stage '{stage}'에 데이터가 없습니다")
+        files = [
+            os.path.join(self._stage_dir(stage), part['file'])
+            for part in manifest['parts']
+            if version is None or part['version'] <= version
+        ]
+        return ds.dataset(files, format='parquet')
+
+    def load_table(self, stage, columns=None, version=None, filter=None):
+        return self.dataset(stage, version).to_table(columns=columns, filter=filter)
+
+    def load(self, stage, columns=None, version=None, filter=None, vector_column='vector'):
+        """
+        stage를 DataFrame으로 읽기
+
+        columns를 지정하면 해당 컬럼만 읽습니다. 벡터 컬럼은 columns에 명시한 경우에만 읽으며
+        행별 numpy 배열로 반환합니다 (행렬이 필요하면 load_vectors 사용).
+        """
+        if columns is None:
+            columns = [name for name in self.dataset(stage, version).schema.names if name != vector_column]
+        table = self.load_table(stage, columns, version, filter)
+        df = table.drop_columns([vector_column]).to_pandas() if vector_column in table.column_names \
+            else table.to_pandas()
+        if vector_column in table.column_names:
+            df[vector_column] = list(arrow_to_vectors(table.column(vector_column)))
+        return df
+
+    def load_vectors(self, stage, vector_column='vector', version=None, filter=None):
+        """벡터 컬럼만 (n, dim) float32 행렬로 읽기"""
+        return arrow_to_vectors(self.load_table(stage, [vector_column], version, filter).column(vector_column))
+
+    def export_excel(self, stage, path, columns=None, version=None, vector_column='vector'):
+        """stage를 엑셀로 내보내기 (벡터 컬럼은 제외)"""
+        df = self.load(stage, columns, version, vector_column=vector_column)
+        df.drop(columns=[vector_column], errors='ignore').to_excel(path, index=False)
+        return len(df)
+
+    def import_excel(self, stage, path, vector_column='vector'):
+        """기존 엑셀 파일을 stage로 가져오기 (문자열로 저장된 벡터 셀은 파싱)"""
+        df = pd.read_excel(path)
+        df = df.loc[:, ~df.columns.astype(str).str.startswith('Unnamed')]
+        if vector_column in df.columns and df[vector_column].map(lambda v: isinstance(v, str)).any():
+            df[vector_column] = df[vector_column].map(json.loads)
+        return self.append(stage, df, vector_column=vector_column)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parquet 데이터셋 저장소 관리")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    ls = sub.add_parser('ls', help="stage 목록과 버전")
+    ls.add_argument('root')
+
+    imp = sub.add_parser('import', help="엑셀 → stage")
+    imp.add_argument('root')
+    imp.add_argument('stage')
+    imp.add_argument('path')
+
+    exp = sub.add_parser('export', help="stage → 엑셀")
+    exp.add_argument('root')
+    exp.add_argument('stage')
+    exp.add_argument('path')
+    exp.add_argument('--columns', nargs='+', default=None)
+    exp.add_argument('--version', type=int, default=None)
+
+    args = parser.parse_args()
+    store = DatasetStore(args.root)
+
+    if args.command == 'ls':
+        for stage in store.stages():
+            manifest = store._manifest(stage)
+            rows = sum(part['rows'] for part in manifest['parts'])
+            print(f"{stage}: version {manifest['version']}, {len(manifest['parts'])}개 파티션, {rows}행")
+    elif args.command == 'import':
+        version = store.import_excel(args.stage, args.path)
+        print(f"{args.path} → {args.stage} (version {version})")
+    elif args.command == 'export':
+        rows = store.export_excel(args.stage, args.path, args.columns, args.version)
+        print(f"{args.stage} → {args.path} ({rows}행)")
+
+
+if __name__ == "__main__":
+    main()
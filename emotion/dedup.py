@@ -0,0 +1,159 @@
+import asyncio
+
+import numpy as np
+
+
+class DuplicateContextError(Exception):
+    """재시도 후에도 기존 context와 너무 유사한 결과만 생성된 경우"""
+
+
+class CategoryVectorIndex:
+    """
+    카테고리(중분류, 소분류)별 정규화 벡터 행렬 인덱스
+
+    벡터는 L2 정규화하여 저장하므로 내적이 곧 코사인 유사도입니다.
+    행렬은 용량을 두 배씩 늘려가며 증분 추가합니다.
+    """
+
+    def __init__(self, dim=None, initial_capacity=64):
+        self.dim = dim
+        self.initial_capacity = initial_capacity
+        self._matrices = {}
+        self._sizes = {}
+
+    @staticmethod
+    def _normalize(vectors):
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def __len__(self):
+        return sum(self._sizes.values())
+
+    def size(self, key):
+        return self._sizes.get(key, 0)
+
+    def add(self, key, vectors):
+        vectors = self._normalize(vectors)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+
+        size = self._sizes.get(key, 0)
+        matrix = self._matrices.get(key)
+        needed = size + len(vectors)
+        if matrix is None or needed > len(matrix):
+            capacity = max(self.initial_capacity, len(matrix) * 2 if matrix is not None else 0)
+            while capacity < needed:
+                capacity *= 2
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            if matrix is not None:
+                grown[:size] = matrix[:size]
+            matrix = grown
+            self._matrices[key] = matrix
+
+        matrix[size:needed] = vectors
+        self._sizes[key] = needed
+
+    def max_similarity(self, key, vector):
+        """key 카테고리 안에서 가장 유사한 벡터의 (인덱스, 코사인 유사도), 비어 있으면 (-1, -1.0)"""
+        size = self._sizes.get(key, 0)
+        if size == 0:
+            return -1, -1.0
+        query = self._normalize(vector)[0]
+        scores = self._matrices[key][:size] @ query
+        best = int(np.argmax(scores))
+        return best, float(scores[best])
+
+
+class DedupContextGenerator:
+    """
+    ContextGenerator에 온라인 중복 제거 단계를 추가한 래퍼
+
+    생성된 context를 임베딩해 같은 카테고리의 기존 context, 그리고 참고 context와
+    비교합니다. 코사인 유사도가 threshold 이상이면 버리고 다시 생성합니다.
+    create_context와 시그니처가 같으므로 노트북의 증강 루프에 그대로 끼워 쓸 수 있습니다.
+    비동기 루프(augment_driver)에서는 acreate_context를 씁니다.
+    """
+
+    def __init__(self, generator, embeddings_model, threshold=0.9, max_retries=3):
+        self.generator = generator
+        self.embeddings_model = embeddings_model
+        self.threshold = threshold
+        self.max_retries = max_retries
+        self.index = CategoryVectorIndex()
+        self.stats = {'accepted': 0, 'regenerated': 0, 'rejected': 0}
+
+    def _encode(self, texts):
+        return self.embeddings_model.encode(list(texts), normalize_embeddings=True)
+
+    def seed(self, contexts, category1, category2):
+        """체크포인트 등에 이미 있는 context를 인덱스에 등록"""
+        contexts = [c for c in contexts if isinstance(c, str) and c.strip()]
+        if contexts:
+            self.index.add((category1, category2), self._encode(contexts))
+
+    def seed_dataframe(self, df, text_column='generator_context'):
+        """category1, category2 컬럼이 있는 DataFrame을 카테고리별로 등록"""
+        if len(df) == 0 or text_column not in df.columns:
+            return
+        for (category1, category2), group in df.groupby(['category1', 'category2']):
+            self.seed(group[text_column].tolist(), category1, category2)
+
+    def is_duplicate(self, vector, category1, category2, reference_vector=None):
+        if reference_vector is not None and float(np.dot(vector, reference_vector)) >= self.threshold:
+            return True
+        _, score = self.index.max_similarity((category1, category2), vector)
+        return score >= self.threshold
+
+    def _accept(self, generated, vector, category1, category2, reference_vector, attempt):
+        """중복이 아니면 인덱스에 등록하고 True, 중복이면 통계만 갱신하고 False"""
+        if not self.is_duplicate(vector, category1, category2, reference_vector):
+            self.index.add((category1, category2), vector)
+            self.stats['accepted'] += 1
+            return True
+        if attempt < self.max_retries:
+            self.stats['regenerated'] += 1
+        return False
+
+    def _reject(self, category1, category2):
+        self.stats['rejected'] += 1
+        return DuplicateContextError(
+            f"{category1}-{category2}: {self.max_retries + 1}회 생성 모두 유사도 {self.threshold} 이상"
+        )
+
+    def create_context(self, context, category1, category2):
+        reference_vector = self._encode([context])[0]
+
+        for attempt in range(self.max_retries + 1):
+            generated = self.generator.create_context(context, category1, category2)
+            vector = self._encode([generated])[0]
+            if self._accept(generated, vector, category1, category2, reference_vector, attempt):
+                return generated
+
+        raise self._reject(category1, category2)
+
+    async def acreate_context(self, context, category1, category2, on_response=None):
+        """
+        create_context의 비동기 버전
+
+        generator.ainvoke가 있으면 그것으로, 없으면 create_context를 스레드에서 호출합니다.
+        임베딩은 스레드에서 계산하고, 중복 검사와 인덱스 등록은 await 없이 이어서 하므로
+        같은 루프의 다른 코루틴이 같은 카테고리에 동시에 생성해도 서로의 결과와 비교됩니다.
+        on_response(response)는 ainvoke 응답마다 호출됩니다 (버려진 생성의 토큰 집계용).
+        """
+        reference_vector = (await asyncio.to_thread(self._encode, [context]))[0]
+
+        for attempt in range(self.max_retries + 1):
+            if hasattr(self.generator, 'ainvoke'):
+                response = await self.generator.ainvoke(context, category1, category2)
+                if on_response is not None:
+                    on_response(response)
+                generated = response.content
+            else:
+                generated = await asyncio.to_thread(self.generator.create_context, context, category1, category2)
+            vector = (await asyncio.to_thread(self._encode, [generated]))[0]
+            if self._accept(generated, vector, category1, category2, reference_vector, attempt):
+                return generated
+
+        raise self._reject(category1, category2)
@@ -0,0 +1,280 @@
+import atexit
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from quantization import dequantize_int8, quantize_int8
+
+MODEL_NAME = "dragonkue/snowflake-arctic-embed-l-v2.0-ko"
+
+
+def text_key(text):
+    """캐시 키: 텍스트의 sha1 해시"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    텍스트 해시를 키로 하는 디스크 벡터 캐시
+
+    cache_dir/
+        index.json        : {"dim", "dtype", "model_name", "backend", "shards": [파일명]}
+        shard_00000.npy   : (n, dim) 행렬, np.load(mmap_mode='r')로 읽음
+        shard_00000.keys  : 샤드 행 순서대로 한 줄에 키 하나
+        shard_00000.scale.npy : dtype='int8'일 때 벡터별 스케일 (n,)
+
+    dtype은 float32 / float16 / int8 중 하나이며 get은 항상 float32로 반환합니다.
+    dtype=None이면 기존 캐시의 dtype을 따릅니다 (새 캐시는 float32).
+    model_name / backend를 주면 index.json에 기록하고, 다른 모델이나 백엔드로 만든 캐시를 열면
+    dtype과 마찬가지로 ValueError를 냅니다 (키가 텍스트 해시뿐이라 그대로 쓰면 다른 벡터가 나옴).
+    새 벡터는 기존 샤드를 다시 쓰지 않고 새 샤드 파일로만 추가하며, 키도 샤드별 .keys 파일에 쓰므로
+    flush 비용은 캐시 전체 크기와 상관없이 새 샤드 크기만큼입니다.
+    put은 벡터를 메모리 버퍼에 모았다가 flush_size개가 되면 샤드 하나로 기록하므로
+    한 건씩 put 해도 샤드 파일과 memmap이 호출 수만큼 늘지 않습니다.
+    남은 버퍼는 flush()를 호출하거나 프로세스가 정상 종료될 때 기록됩니다.
+    """
+
+    def __init__(self, cache_dir, dtype='float32', flush_size=4096, model_name=None, backend=None):
+        self.cache_dir = cache_dir
+        self.dtype = np.dtype(dtype or 'float32')
+        self.model_name = model_name
+        self.backend = backend
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.dim = None
+        self.shards = []
+        self.keys = {}
+        self._memmaps = {}
+        self.flush_size = flush_size
+        # 아직 샤드에 쓰지 않은 {키: float32 벡터}
+        self._pending = {}
+
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if dtype is None:
+                self.dtype = np.dtype(meta['dtype'])
+            if np.dtype(meta['dtype']) != self.dtype:
+                raise ValueError(f"캐시 dtype 불일치: {meta['dtype']} != {self.dtype}")
+            for field in ('model_name', 'backend'):
+                cached, wanted = meta.get(field), getattr(self, field)
+                if wanted is None:
+                    setattr(self, field, cached)
+                elif cached is not None and cached != wanted:
+                    raise ValueError(f"캐시 {field} 불일치: {cached} != {wanted} ({cache_dir})")
+            self.dim = meta['dim']
+            self.shards = meta['shards']
+            if 'keys' in meta:
+                # 키를 index.json에 모두 담던 이전 형식 → 샤드별 .keys 파일로 옮김
+                self._migrate_keys(meta['keys'])
+            for shard_no in range(len(self.shards)):
+                with open(self._keys_path(shard_no), 'r', encoding='utf-8') as f:
+                    for row, key in enumerate(f.read().split()):
+                        self.keys[key] = (shard_no, row)
+            if meta.get('model_name') != self.model_name or meta.get('backend') != self.backend:
+                self._save_index()
+        elif model_name is not None or backend is not None:
+            # 아직 벡터가 없어도 어떤 모델의 캐시인지 먼저 기록
+            self._save_index()
+        atexit.register(self.flush)
+
+    def __len__(self):
+        return len(self.keys) + len(self._pending)
+
+    def __contains__(self, key):
+        return key in self.keys or key in self._pending
+
+    def _shard(self, shard_no):
+        if shard_no not in self._memmaps:
+            path = os.path.join(self.cache_dir, self.shards[shard_no])
+            scales = None
+            if self.dtype == np.int8:
+                scales = np.load(path[:-len('.npy')] + '.scale.npy')
+            self._memmaps[shard_no] = (np.load(path, mmap_mode='r'), scales)
+        return self._memmaps[shard_no]
+
+    def _keys_path(self, shard_no):
+        return os.path.join(self.cache_dir, self.shards[shard_no][:-len('.npy')] + '.keys')
+
+    def _write_keys(self, shard_no, keys):
+        with open(self._keys_path(shard_no), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(keys) + '\n')
+
+    def _migrate_keys(self, keys):
+        rows_by_shard = [{} for _ in self.shards]
+        for key, (shard_no, row) in keys.items():
+            rows_by_shard[shard_no][row] = key
+        for shard_no, rows in enumerate(rows_by_shard):
+            self._write_keys(shard_no, [rows[row] for row in sorted(rows)])
+        self._save_index()
+
+    def _save_index(self):
+        meta = {
+            'dim': self.dim,
+            'dtype': self.dtype.name,
+            'model_name': self.model_name,
+            'backend': self.backend,
+            'shards': self.shards,
+        }
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.index_path)
+
+    def get(self, keys):
+        """keys 순서대로 (n, dim) float32 행렬 반환, 없는 키가 있으면 KeyError"""
+        out = np.empty((len(keys), self.dim or 0), dtype=np.float32)
+        by_shard = {}
+        for i, key in enumerate(keys):
+            if key in self._pending:
+                out[i] = self._pending[key]
+                continue
+            shard_no, row = self.keys[key]
+            by_shard.setdefault(shard_no, ([], []))
+            by_shard[shard_no][0].append(i)
+            by_shard[shard_no][1].append(row)
+        for shard_no, (positions, rows) in by_shard.items():
+            vectors, scales = self._shard(shard_no)
+            if scales is None:
+                out[positions] = vectors[rows]
+            else:
+                out[positions] = dequantize_int8(vectors[rows], scales[rows])
+        return out
+
+    def put(self, keys, vectors):
+        """새 키와 벡터를 버퍼에 추가하고 flush_size개가 모이면 샤드로 기록 (이미 있는 키는 무시)"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        for i, key in enumerate(keys):
+            if key not in self:
+                self._pending[key] = vectors[i]
+        if self.dim is None and self._pending:
+            self.dim = int(vectors.shape[1])
+        if len(self._pending) >= self.flush_size:
+            self.flush()
+
+    def flush(self):
+        """버퍼의 벡터와 키를 새 샤드 하나로 기록하고 index.json에 샤드 추가"""
+        if not self._pending:
+            return
+        shard_no = len(self.shards)
+        filename = f'shard_{shard_no:05d}.npy'
+        vectors = np.stack(list(self._pending.values()))
+        if self.dtype == np.int8:
+            vectors, scales = quantize_int8(vectors)
+            np.save(os.path.join(self.cache_dir, f'shard_{shard_no:05d}.scale.npy'), scales)
+        np.save(os.path.join(self.cache_dir, filename), vectors.astype(self.dtype))
+        self.shards.append(filename)
+        # 샤드와 키 파일을 다 쓴 뒤에 index.json에 등록하므로 중간에 멈추면 이 샤드는 없던 것이 됨
+        self._write_keys(shard_no, list(self._pending))
+        for row, key in enumerate(self._pending):
+            self.keys[key] = (shard_no, row)
+        self._pending = {}
+        self._save_index()
+
+
+class Embedder:
+    """
+    SentenceTransformer 임베딩 모델 래퍼
+
+    - 캐시에 없는 텍스트만 인코딩합니다 (같은 텍스트는 한 번만).
+    - 인코딩할 텍스트는 길이순으로 정렬해 배치 단위로 모델에 넣습니다.
+    - flush_size개 단위로 캐시에 기록하므로 중간에 멈춰도 계산한 벡터는 남습니다.
+      한 건씩 인코딩하는 경우에도 flush_size개가 모일 때까지는 메모리에 두므로 끝나면 flush()를 호출하세요.
+    - backend='onnx' / 'onnx-int8'이면 onnx_backend.OnnxEncoder(onnx_dir)로 추론합니다.
+      onnx_dir/backend.json의 model_name이 model_name과 다르면 모델 로드 시 ValueError를 냅니다.
+    - 캐시는 model_name과 backend를 기록해 두므로 다른 모델/백엔드로 같은 cache_dir을 열면 ValueError입니다.
+    """
+
+    def __init__(self, model_name=MODEL_NAME, cache_dir=None, batch_size=64,
+                 flush_size=4096, cache_dtype='float32', normalize=True, device=None,
+                 backend='torch', onnx_dir=None, num_threads=None):
+        self.model_name = model_name
+        self.backend = backend
+        self.onnx_dir = onnx_dir
+        self.num_threads = num_threads
+        self.batch_size = batch_size
+        self.flush_size = flush_size
+        self.normalize = normalize
+        self.device = device
+        self.cache = EmbeddingCache(
+            cache_dir, dtype=cache_dtype, flush_size=flush_size, model_name=model_name, backend=backend,
+        ) if cache_dir else None
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            if self.backend == 'torch':
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(self.model_name, device=self.device)
+            elif self.backend in ('onnx', 'onnx-int8'):
+                from onnx_backend import OnnxEncoder, read_config
+                exported = read_config(self.onnx_dir).get('model_name')
+                if exported != self.model_name:
+                    raise ValueError(f"{self.onnx_dir}는 {exported} 모델을 내보낸 것입니다 (필요한 모델: {self.model_name})")
+                self._model = OnnxEncoder(self.onnx_dir, quantized=self.backend == 'onnx-int8',
+                                          num_threads=self.num_threads)
+            else:
+                raise ValueError(f"알 수 없는 backend: {self.backend} (torch, onnx, onnx-int8)")
+        return self._model
+
+    def flush(self):
+        """캐시 버퍼에 남은 벡터를 디스크에 기록"""
+        if self.cache is not None:
+            self.cache.flush()
+
+    def get_sentence_embedding_dimension(self):
+        return self.model.get_sentence_embedding_dimension()
+
+    def _encode_sorted(self, texts, normalize):
+        vectors = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=normalize,
+            convert_to_numpy=True,
+        )
+        return vectors.astype(np.float32, copy=False)
+
+    def encode(self, texts, normalize_embeddings=None, show_progress=False):
+        """
+        텍스트(또는 텍스트 리스트)를 (n, dim) float32 행렬로 변환
+
+        SentenceTransformer.encode와 같이 문자열 하나를 넣으면 1차원 벡터를 반환합니다.
+        """
+        single = isinstance(texts, str)
+        texts = [texts] if single else [str(t) for t in texts]
+        normalize = self.normalize if normalize_embeddings is None else normalize_embeddings
+
+        keys = [text_key(t) for t in texts]
+        unique = dict(zip(keys, texts))
+        if self.cache is not None and normalize == self.normalize:
+            missing = [k for k in unique if k not in self.cache]
+        else:
+            missing = list(unique)
+
+        # 길이순 정렬로 배치 내 패딩을 최소화
+        missing.sort(key=lambda k: len(unique[k]))
+        computed = {}
+        for start in range(0, len(missing), self.flush_size):
+            chunk = missing[start:start + self.flush_size]
+            vectors = self._encode_sorted([unique[k] for k in chunk], normalize)
+            if self.cache is not None and normalize == self.normalize:
+                self.cache.put(chunk, vectors)
+            else:
+                computed.update(zip(chunk, vectors))
+            if show_progress:
+                print(f"인코딩: {min(start + self.flush_size, len(missing))}/{len(missing)}")
+
+        if computed:
+            result = np.vstack([computed[k] for k in keys])
+        else:
+            result = self.cache.get(keys) if keys else np.empty((0, 0), dtype=np.float32)
+        return result[0] if single else result
+
+
+def embed_column(df, column, embedder, show_progress=False):
+    """DataFrame 컬럼 전체를 (n, dim) 행렬로 임베딩 (엑셀 셀에 리스트로 저장하지 않음)"""
+    return embedder.encode(df[column].fillna('').astype(str).tolist(), show_progress=show_progress)
@@ -0,0 +1,71 @@
+"""
+모듈 import 시간 측정 (python -X importtime)
+
+모듈마다 새 인터프리터를 띄워 `python -X importtime -c "import <모듈>"`을 실행하고
+stderr의 누적(cumulative) 시간을 파싱해 전체 시간과 가장 느린 하위 모듈을 출력합니다.
+여러 번 반복해 중앙값을 사용합니다.
+
+사용법:
+    python import_benchmark.py langchain_openai_augmentation langchain_openai_retest taxonomy --repeat 5
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+
+def parse_importtime(stderr):
+    """'import time: self | cumulative | name' 줄 → {모듈명: 누적 마이크로초}"""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        cumulative[name] = max(cumulative.get(name, 0), int(cumulative_us))
+    return cumulative
+
+
+def measure(module, cwd=None):
+    """새 프로세스에서 module을 import했을 때의 {모듈명: 누적 마이크로초}"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True, cwd=cwd or os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} import 실패:\n{result.stderr.splitlines()[-1]}")
+    return parse_importtime(result.stderr)
+
+
+def benchmark(modules, repeat=5, top=10):
+    """
+    Returns:
+        list[dict]: module, total_ms(중앙값), slowest([(하위 모듈, ms), ...])
+    """
+    rows = []
+    for module in modules:
+        runs = [measure(module) for _ in range(repeat)]
+        total_ms = statistics.median(run.get(module, 0) for run in runs) / 1000
+        last = runs[-1]
+        slowest = sorted(
+            ((name, us / 1000) for name, us in last.items() if name != module and '.' not in name),
+            key=lambda item: item[1], reverse=True,
+        )[:top]
+        rows.append({'module': module, 'total_ms': total_ms, 'slowest': slowest})
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="python -X importtime 기반 import 시간 측정")
+    parser.add_argument('modules', nargs='+')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help="출력할 느린 최상위 패키지 수")
+    args = parser.parse_args()
+
+    for row in benchmark(args.modules, args.repeat, args.top):
+        print(f"{row['module']}: {row['total_ms']:.1f} ms (중앙값, {args.repeat}회)")
+        for name, ms in row['slowest']:
+            print(f"    {name:<30} {ms:8.1f} ms")
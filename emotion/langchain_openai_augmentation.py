@@ -1,11 +1,6 @@
-from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-from langchain.prompts import PromptTemplate
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-api_key = os.environ["OPENAI_API_KEY"]
+from llm_client import build_messages, get_chat_model
+from llm_metrics import ainvoke_with_metrics, invoke_with_metrics
+from taxonomy import render_category_list
 
 SYSTEM_PROMPT = """당신은 감정 분석 텍스트 생성 전문 AI 어시스턴트입니다.
 당신의 역할은 주어진 **context(참고 텍스트)**와 category1(중분류), category2(소분류) 정보를 기반으로, 동일한 감정 카테고리에 속하지만 새롭고 독창적인 context를 생성하는 것입니다.
@@ -42,18 +37,10 @@ SYSTEM_PROMPT = """당신은 감정 분석 텍스트 생성 전문 AI 어시스
 
 **중분류별 소분류 목록**
 
-- 기쁨 : 감동, 고마움, 공감, 기대감, 놀람, 만족감, 반가움, 신뢰감, 신명남, 안정감, 자랑스러움, 자신감, 즐거움, 통쾌함, 편안함
-- 두려움 : 걱정, 공포, 놀람, 위축감, 초조함
-- 미움(상대방) : 경멸, 냉담, 반감, 불신감, 비위상함, 시기심, 외면, 치사함
-- 분노 : 날카로움, 발열, 불쾌, 사나움, 원망, 타오름
-- 사랑 : 귀중함, 너그러움, 다정함, 동정(슬픔), 두근거림, 매력적, 아른거림, 열정적임, 호감
-- 수치심 : 미안함, 부끄러움, 죄책감
-- 슬픔 : 고통, 그리움, 동정(슬픔), 무기력, 수치심, 실망, 아픔, 억울함, 외로움, 절망, 허망, 후회
-- 싫어함(상태) : 난처함, 답답함, 불편함, 서먹함, 싫증, 심심함
-- 욕망 : 갈등, 궁금함, 기대감, 불만, 아쉬움, 욕심
-- 중립 : 감동, 걱정, 고마움, 고통, 공감, 공포, 궁금함, 귀중함, 그리움, 난처함, 냉담, 놀람, 다정함, 답답함, 동정(슬픔), 만족감, 무기력, 미안함, 반가움, 불신감, 불쾌, 서먹함, 신뢰감, 안정감, 열정적인, 외로움, 위축감, 자랑스러움, 절망, 통쾌함, 편안함, 호감, 후회
 """
 
+SYSTEM_PROMPT += render_category_list() + "\n"
+
 # 사용자 입력 템플릿
 USER_PROMPT_TEMPLATE = """
 Context: {context}
@@ -63,35 +50,55 @@ Category2: {category2}
 """
 
 class ContextGenerator:
-    def __init__(self, model="gpt-4o", api_key=api_key, temperature=0.8, max_tokens=200, top_p=0.9):
-        self.llm = ChatOpenAI(
+    def __init__(self, model="gpt-4o", api_key=None, temperature=0.8, max_tokens=200, top_p=0.9,
+                 max_retries=2, before_call=None):
+        # ChatOpenAI는 첫 호출 때 만들어지며 같은 설정이면 프로세스 안에서 공유됩니다
+        self.llm_config = dict(
             model=model,
             api_key=api_key,
             temperature=temperature,
             max_tokens=max_tokens,
             top_p=top_p
         )
-        # 프롬프트 템플릿을 인스턴스 변수로 생성
-        self.prompt_template = PromptTemplate(
-            input_variables=["context", "category1", "category2"],
-            template=USER_PROMPT_TEMPLATE
-        )
+        self.model = model
+        self.max_retries = max_retries
+        # 비동기 호출(재시도 포함) 직전마다 await 할 함수 (augment_driver의 워커별 RateLimiter.wait)
+        self.before_call = before_call
+        # 프롬프트 템플릿 (str.format으로 채움, langchain PromptTemplate import 불필요)
+        self.prompt_template = USER_PROMPT_TEMPLATE
 
-    def create_context(self, context, category1, category2):
+    @property
+    def llm(self):
+        return get_chat_model(**self.llm_config)
+
+    def build_prompt(self, context, category1, category2):
         # 템플릿을 사용해서 프롬프트 생성
         formatted_prompt = self.prompt_template.format(
             context=context,
             category1=category1,
             category2=category2,
         )
-        
+
         # 시스템 메시지와 사용자 메시지 생성
-        messages = [
-            SystemMessage(content=SYSTEM_PROMPT),
-            HumanMessage(content=formatted_prompt)
-        ]
-        
-        response = self.llm.invoke(messages)
+        return build_messages(SYSTEM_PROMPT, formatted_prompt)
+
+    def create_context(self, context, category1, category2):
+        # 토큰/지연/재시도/비용은 llm_metrics.get_metrics()에 기록
+        response = invoke_with_metrics(
+            self.llm, self.build_prompt(context, category1, category2), 'create_context', self.model,
+            category1, category2, self.max_retries,
+        )
+        return response.content
+
+    async def ainvoke(self, context, category1, category2):
+        """비동기 호출, usage_metadata가 담긴 응답 메시지 전체를 반환"""
+        return await ainvoke_with_metrics(
+            self.llm, self.build_prompt(context, category1, category2), 'create_context', self.model,
+            category1, category2, self.max_retries, before_call=self.before_call,
+        )
+
+    async def acreate_context(self, context, category1, category2):
+        response = await self.ainvoke(context, category1, category2)
         return response.content
 
 # 사용 예제
@@ -1,11 +1,6 @@
-from langchain_openai import ChatOpenAI
-from langchain.schema import HumanMessage, SystemMessage
-from langchain.prompts import PromptTemplate
-from dotenv import load_dotenv
-import os
-
-load_dotenv()
-api_key = os.environ["OPENAI_API_KEY"]
+from llm_client import build_messages, get_chat_model
+from llm_metrics import invoke_with_metrics
+from taxonomy import render_category_list
 
 SYSTEM_PROMPT = """당신은 감정 분석 텍스트 라벨링 전문 AI 어시스턴트입니다.  
 당신의 역할은 주어진 **context(감정 분석 대상 텍스트)**와 **category1(중분류), category2(소분류)** 정보를 기반으로,  
@@ -29,18 +24,10 @@ context가 올바르게 중분류/소분류로 분류되었는지를 검증하
 
 **중분류별 소분류 목록**
 
-- 기쁨 : 감동, 고마움, 공감, 기대감, 놀람, 만족감, 반가움, 신뢰감, 신명남, 안정감, 자랑스러움, 자신감, 즐거움, 통쾌함, 편안함
-- 두려움 : 걱정, 공포, 놀람, 위축감, 초조함
-- 미움(상대방) : 경멸, 냉담, 반감, 불신감, 비위상함, 시기심, 외면, 치사함
-- 분노 : 날카로움, 발열, 불쾌, 사나움, 원망, 타오름
-- 사랑 : 귀중함, 너그러움, 다정함, 동정(슬픔), 두근거림, 매력적, 아른거림, 열정적임, 호감
-- 수치심 : 미안함, 부끄러움, 죄책감
-- 슬픔 : 고통, 그리움, 동정(슬픔), 무기력, 수치심, 실망, 아픔, 억울함, 외로움, 절망, 허망, 후회
-- 싫어함(상태) : 난처함, 답답함, 불편함, 서먹함, 싫증, 심심함
-- 욕망 : 갈등, 궁금함, 기대감, 불만, 아쉬움, 욕심
-- 중립 : 감동, 걱정, 고마움, 고통, 공감, 공포, 궁금함, 귀중함, 그리움, 난처함, 냉담, 놀람, 다정함, 답답함, 동정(슬픔), 만족감, 무기력, 미안함, 반가움, 불신감, 불쾌, 서먹함, 신뢰감, 안정감, 열정적임, 외로움, 위축감, 자랑스러움, 절망, 통쾌함, 편안함, 호감, 후회
 """
 
+SYSTEM_PROMPT += render_category_list() + "\n"
+
 # 사용자 입력 템플릿
 USER_PROMPT_TEMPLATE = """
 Context: {context}
@@ -50,19 +37,24 @@ Category2: {category2}
 """
 
 class LabelRetest:
-    def __init__(self, model="gpt-4.1", api_key=api_key, temperature=0.8, max_tokens=200, top_p=0.9):
-        self.llm = ChatOpenAI(
+    def __init__(self, model="gpt-4.1", api_key=None, temperature=0.8, max_tokens=200, top_p=0.9,
+                 max_retries=2):
+        # ChatOpenAI는 첫 호출 때 만들어지며 같은 설정이면 프로세스 안에서 공유됩니다
+        self.llm_config = dict(
             model=model,
             api_key=api_key,
             temperature=temperature,
             max_tokens=max_tokens,
             top_p=top_p
         )
-        # 프롬프트 템플릿을 인스턴스 변수로 생성
-        self.prompt_template = PromptTemplate(
-            input_variables=["context", "category1", "category2"],
-            template=USER_PROMPT_TEMPLATE
-        )
+        self.model = model
+        self.max_retries = max_retries
+        # 프롬프트 템플릿 (str.format으로 채움, langchain PromptTemplate import 불필요)
+        self.prompt_template = USER_PROMPT_TEMPLATE
+
+    @property
+    def llm(self):
+        return get_chat_model(**self.llm_config)
 
     def create_categories(self, context, category1, category2):
         # 템플릿을 사용해서 프롬프트 생성
@@ -73,12 +65,12 @@ class LabelRetest:
         )
         
         # 시스템 메시지와 사용자 메시지 생성
-        messages = [
-            SystemMessage(content=SYSTEM_PROMPT),
-            HumanMessage(content=formatted_prompt)
-        ]
+        messages = build_messages(SYSTEM_PROMPT, formatted_prompt)
         
-        response = self.llm.invoke(messages)
+        # 토큰/지연/재시도/비용은 llm_metrics.get_metrics()에 기록
+        response = invoke_with_metrics(
+            self.llm, messages, 'create_categories', self.model, category1, category2, self.max_retries,
+        )
         return response.content
 
 # 사용 예제
@@ -89,8 +81,8 @@ if __name__ == "__main__":
     category1 = "욕망"
     category2 = "기대감"
     
-    new_context = generator.create_context(context, category1, category2)
-    print(f"원본 Context: {context}")
+    new_categories = generator.create_categories(context, category1, category2)
+    print(f"Context: {context}")
     print(f"Category1: {category1}")
     print(f"Category2: {category2}")
-    print(f"\n생성된 Context: {new_context}")
\ No newline at end of file
+    print(f"\n재검증 결과: {new_categories}")
\ No newline at end of file
@@ -0,0 +1,55 @@
+"""
+LLM 클라이언트 지연 생성
+
+langchain_openai / langchain / dotenv는 무거운 import라서 프롬프트만 필요한 워커나 CLI도
+시작 비용을 냅니다. 이 모듈은 첫 LLM 호출 시점에만 import와 OPENAI_API_KEY 조회를 하고,
+같은 설정의 ChatOpenAI 인스턴스는 프로세스당 하나만 만들어 공유합니다.
+"""
+
+import os
+import threading
+
+_lock = threading.Lock()
+_clients = {}
+_env_loaded = False
+
+
+def get_api_key():
+    """.env를 (한 번만) 읽고 OPENAI_API_KEY 반환, 없으면 KeyError"""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+    return os.environ["OPENAI_API_KEY"]
+
+
+def get_chat_model(model, api_key=None, temperature=0.8, max_tokens=200, top_p=0.9):
+    """설정별로 프로세스에 하나만 생성되는 ChatOpenAI"""
+    key = (model, api_key, temperature, max_tokens, top_p)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                from langchain_openai import ChatOpenAI
+                client = ChatOpenAI(
+                    model=model,
+                    api_key=api_key or get_api_key(),
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    top_p=top_p,
+                    # 재시도는 llm_metrics.invoke_with_metrics에서 수행하고 횟수를 기록
+                    max_retries=0
+                )
+                _clients[key] = client
+    return client
+
+
+def build_messages(system_prompt, user_prompt):
+    """[SystemMessage, HumanMessage]"""
+    from langchain.schema import HumanMessage, SystemMessage
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=user_prompt)
+    ]
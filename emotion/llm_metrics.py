@@ -0,0 +1,312 @@
+"""
+LLM 호출 토큰/비용/지연 계측
+
+ContextGenerator.create_context, LabelRetest.create_categories 등 모든 LLM 호출은
+invoke_with_metrics / ainvoke_with_metrics를 거치며 호출마다 다음을 기록합니다.
+    operation, model, category1, category2, prompt/completion/cached 토큰, 지연(초), 재시도 수,
+    재시도 대기(초), 프롬프트 캐시 적중 여부, 추정 비용(USD), 오류
+
+지연(latency_sec)은 마지막 시도 한 번의 시간이고, 그 전의 실패한 시도와 백오프 대기는 retry_wait_sec에 따로 기록합니다.
+재시도는 rate limit(429), 타임아웃, 5xx 오류만 합니다. (인증/요청 형식 오류 등은 바로 실패)
+
+기록은 프로세스별 LLMMetrics(get_metrics())에 쌓이며 실행(run) 단위로 reset 할 수 있습니다.
+summary(by=[...])로 모델/카테고리별 집계, to_csv / to_prometheus로 내보냅니다.
+여러 프로세스의 기록은 records CSV를 합쳐서(load_records) 같은 방식으로 집계합니다.
+
+사용법 (저장된 호출 기록 집계):
+    python llm_metrics.py data/augment_journal/metrics-*.csv --by category1 category2 --out summary.csv
+    python llm_metrics.py data/augment_journal/metrics-*.csv --prometheus llm_metrics.prom
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+
+# 1M 토큰당 USD (입력, 캐시된 입력, 출력) - 요금 변경 시 여기만 수정
+PRICES = {
+    'gpt-4o': (2.50, 1.25, 10.00),
+    'gpt-4o-mini': (0.15, 0.075, 0.60),
+    'gpt-4.1': (2.00, 0.50, 8.00),
+    'gpt-4.1-mini': (0.40, 0.10, 1.60),
+    'gpt-4.1-nano': (0.10, 0.025, 0.40),
+    'gpt-3.5-turbo': (0.50, 0.50, 1.50),
+}
+
+RECORD_FIELDS = ['run_id', 'timestamp', 'operation', 'model', 'category1', 'category2',
+                 'prompt_tokens', 'completion_tokens', 'cached_tokens', 'latency_sec',
+                 'retries', 'retry_wait_sec', 'cache_hit', 'cost_usd', 'error']
+
+LATENCY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+
+# 재시도할 예외 클래스 이름 (openai / httpx 예외를 import 하지 않고 MRO의 이름으로 판별)
+RETRYABLE_ERRORS = {'RateLimitError', 'APITimeoutError', 'InternalServerError', 'TimeoutException', 'TimeoutError'}
+
+
+def estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens=0):
+    """모델 요금표 기준 추정 비용 (요금표에 없는 모델은 0)"""
+    price = PRICES.get(model)
+    if price is None:
+        # 'gpt-4.1-mini-2025-04-14' 같은 스냅샷 이름은 가장 긴 접두사로 매칭
+        prefixes = [name for name in PRICES if model.startswith(name)]
+        if not prefixes:
+            return 0.0
+        price = PRICES[max(prefixes, key=len)]
+    input_price, cached_price, output_price = price
+    uncached = max(prompt_tokens - cached_tokens, 0)
+    return (uncached * input_price + cached_tokens * cached_price + completion_tokens * output_price) / 1e6
+
+
+def parse_usage(response):
+    """langchain AIMessage.usage_metadata → (prompt, completion, cached) 토큰"""
+    usage = getattr(response, 'usage_metadata', None) or {}
+    details = usage.get('input_token_details') or {}
+    return (int(usage.get('input_tokens', 0)), int(usage.get('output_tokens', 0)),
+            int(details.get('cache_read', 0) or 0))
+
+
+class LLMMetrics:
+    """프로세스 내 LLM 호출 기록 (스레드 안전)"""
+
+    def __init__(self, run_id=None):
+        self._lock = threading.Lock()
+        self.reset(run_id)
+
+    def reset(self, run_id=None):
+        """새 실행 시작: 기록을 비우고 run_id를 새로 발급"""
+        with self._lock:
+            self.run_id = run_id or uuid.uuid4().hex[:12]
+            self.records = []
+
+    def record(self, operation, model, prompt_tokens=0, completion_tokens=0, cached_tokens=0,
+               latency_sec=0.0, retries=0, category1=None, category2=None, error=None, retry_wait_sec=0.0):
+        row = {
+            'run_id': self.run_id,
+            'timestamp': time.time(),
+            'operation': operation,
+            'model': model,
+            'category1': category1,
+            'category2': category2,
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'cached_tokens': cached_tokens,
+            'latency_sec': latency_sec,
+            'retries': retries,
+            'retry_wait_sec': retry_wait_sec,
+            'cache_hit': cached_tokens > 0,
+            'cost_usd': estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens),
+            'error': error,
+        }
+        with self._lock:
+            self.records.append(row)
+        return row
+
+    def to_frame(self):
+        import pandas as pd
+        with self._lock:
+            return pd.DataFrame(self.records, columns=RECORD_FIELDS)
+
+    def summary(self, by=('model',)):
+        return summarize(self.to_frame(), by)
+
+    def to_csv(self, path):
+        """호출 단위 기록 CSV (여러 프로세스 기록을 합칠 때 사용)"""
+        self.to_frame().to_csv(path, index=False, encoding='utf-8-sig')
+
+    def to_prometheus(self, by=('operation', 'model')):
+        return to_prometheus(self.to_frame(), by)
+
+
+_metrics = LLMMetrics()
+
+
+def get_metrics():
+    """프로세스 기본 LLMMetrics"""
+    return _metrics
+
+
+def summarize(records, by=('model',)):
+    """
+    호출 기록 DataFrame → by별 호출 수, 오류 수, 토큰, 비용, 지연 통계
+
+    Returns:
+        DataFrame: calls, errors, retries, retry_wait_sec, cache_hits, prompt/completion/cached 토큰 합,
+                   cost_usd, latency_mean/p50/p95, tokens_per_sec
+    """
+    import pandas as pd
+
+    by = list(by)
+    records = records.copy()
+    for column in by:
+        records[column] = records[column].fillna('')
+    records['failed'] = records['error'].notna() & (records['error'].astype(str) != '')
+    grouped = records.groupby(by, dropna=False)
+    summary = pd.DataFrame({
+        'calls': grouped.size(),
+        'errors': grouped['failed'].sum(),
+        'retries': grouped['retries'].sum(),
+        'retry_wait_sec': grouped['retry_wait_sec'].sum(),
+        'cache_hits': grouped['cache_hit'].sum(),
+        'prompt_tokens': grouped['prompt_tokens'].sum(),
+        'completion_tokens': grouped['completion_tokens'].sum(),
+        'cached_tokens': grouped['cached_tokens'].sum(),
+        'cost_usd': grouped['cost_usd'].sum(),
+        'latency_mean': grouped['latency_sec'].mean(),
+        'latency_p50': grouped['latency_sec'].quantile(0.5),
+        'latency_p95': grouped['latency_sec'].quantile(0.95),
+        'latency_total': grouped['latency_sec'].sum(),
+    })
+    summary['tokens_per_sec'] = (summary['prompt_tokens'] + summary['completion_tokens']) \
+        / summary['latency_total'].where(summary['latency_total'] > 0)
+    return summary.drop(columns=['latency_total']).reset_index().sort_values('cost_usd', ascending=False)
+
+
+def _labels(keys, values):
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"') for v in values)
+    return ','.join(f'{k}="{v}"' for k, v in zip(keys, escaped))
+
+
+def to_prometheus(records, by=('operation', 'model')):
+    """호출 기록 → Prometheus 텍스트 포맷 (counter + 지연 histogram)"""
+    by = list(by)
+    records = records.copy()
+    for column in by:
+        records[column] = records[column].fillna('')
+    records['failed'] = records['error'].notna() & (records['error'].astype(str) != '')
+
+    counters = [
+        ('llm_calls_total', "LLM 호출 수", None),
+        ('llm_errors_total', "실패한 LLM 호출 수", 'failed'),
+        ('llm_retries_total', "재시도 수", 'retries'),
+        ('llm_retry_wait_seconds_total', "실패한 시도와 백오프 대기 시간", 'retry_wait_sec'),
+        ('llm_cache_hits_total', "프롬프트 캐시 적중 호출 수", 'cache_hit'),
+        ('llm_prompt_tokens_total', "입력 토큰", 'prompt_tokens'),
+        ('llm_completion_tokens_total', "출력 토큰", 'completion_tokens'),
+        ('llm_cached_tokens_total', "캐시된 입력 토큰", 'cached_tokens'),
+        ('llm_cost_usd_total', "추정 비용 (USD)", 'cost_usd'),
+    ]
+    grouped = list(records.groupby(by)) if len(records) else []
+    lines = []
+    for name, help_text, column in counters:
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        for key, group in grouped:
+            key = key if isinstance(key, tuple) else (key,)
+            value = len(group) if column is None else float(group[column].sum())
+            lines.append(f'{name}{{{_labels(by, key)}}} {value:g}')
+
+    name = 'llm_latency_seconds'
+    lines += [f'# HELP {name} LLM 호출 지연', f'# TYPE {name} histogram']
+    for key, group in grouped:
+        key = key if isinstance(key, tuple) else (key,)
+        labels = _labels(by, key)
+        latency = group['latency_sec']
+        for bucket in LATENCY_BUCKETS:
+            lines.append(f'{name}_bucket{{{labels},le="{bucket:g}"}} {int((latency <= bucket).sum())}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {len(latency)}')
+        lines.append(f'{name}_sum{{{labels}}} {float(latency.sum()):g}')
+        lines.append(f'{name}_count{{{labels}}} {len(latency)}')
+    return '\n'.join(lines) + '\n'
+
+
+def load_records(paths):
+    """여러 records CSV (프로세스별) → 하나의 DataFrame"""
+    import pandas as pd
+    frames = [pd.read_csv(path) for path in paths]
+    if not frames:
+        return pd.DataFrame(columns=RECORD_FIELDS)
+    records = pd.concat(frames, ignore_index=True)
+    if 'retry_wait_sec' not in records:
+        # retry_wait_sec 이전에 저장된 기록
+        records['retry_wait_sec'] = 0.0
+    return records
+
+
+def is_retryable(error):
+    """rate limit(429), 타임아웃, 5xx 오류면 True"""
+    if any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__):
+        return True
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+def _backoff(attempt):
+    return min(2 ** attempt, 30)
+
+
+def invoke_with_metrics(llm, messages, operation, model, category1=None, category2=None,
+                        max_retries=2, metrics=None):
+    """
+    llm.invoke + 재시도(지수 백오프) + 호출 기록
+    재시도할 수 없는 오류이거나 마지막 시도까지 실패하면 예외를 다시 발생
+    """
+    metrics = metrics or _metrics
+    first = time.perf_counter()
+    for attempt in range(max_retries + 1):
+        start = time.perf_counter()
+        try:
+            response = llm.invoke(messages)
+        except Exception as e:
+            if attempt == max_retries or not is_retryable(e):
+                metrics.record(operation, model, latency_sec=time.perf_counter() - start, retries=attempt,
+                               category1=category1, category2=category2, error=repr(e),
+                               retry_wait_sec=start - first)
+                raise
+            time.sleep(_backoff(attempt))
+            continue
+        prompt_tokens, completion_tokens, cached_tokens = parse_usage(response)
+        metrics.record(operation, model, prompt_tokens, completion_tokens, cached_tokens,
+                       time.perf_counter() - start, attempt, category1, category2, retry_wait_sec=start - first)
+        return response
+
+
+async def ainvoke_with_metrics(llm, messages, operation, model, category1=None, category2=None,
+                               max_retries=2, metrics=None, before_call=None):
+    """
+    invoke_with_metrics의 비동기 버전 (llm.ainvoke)
+
+    before_call이 있으면 재시도를 포함한 매 호출 직전에 await 합니다 (예: RateLimiter.wait).
+    """
+    metrics = metrics or _metrics
+    first = time.perf_counter()
+    for attempt in range(max_retries + 1):
+        if before_call is not None:
+            await before_call()
+        start = time.perf_counter()
+        try:
+            response = await llm.ainvoke(messages)
+        except Exception as e:
+            if attempt == max_retries or not is_retryable(e):
+                metrics.record(operation, model, latency_sec=time.perf_counter() - start, retries=attempt,
+                               category1=category1, category2=category2, error=repr(e),
+                               retry_wait_sec=start - first)
+                raise
+            await asyncio.sleep(_backoff(attempt))
+            continue
+        prompt_tokens, completion_tokens, cached_tokens = parse_usage(response)
+        metrics.record(operation, model, prompt_tokens, completion_tokens, cached_tokens,
+                       time.perf_counter() - start, attempt, category1, category2, retry_wait_sec=start - first)
+        return response
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="LLM 호출 기록 집계")
+    parser.add_argument('records', nargs='+', help="LLMMetrics.to_csv로 저장한 호출 기록 CSV")
+    parser.add_argument('--by', nargs='+', default=['operation', 'model'],
+                        help="집계 기준 (run_id, operation, model, category1, category2)")
+    parser.add_argument('--out', default=None, help="요약 CSV 경로")
+    parser.add_argument('--prometheus', default=None, help="Prometheus 텍스트 파일 경로")
+    args = parser.parse_args()
+
+    records = load_records(args.records)
+    summary = summarize(records, args.by)
+    print(summary.to_string(index=False))
+    print(f"\n전체: {len(records)}건, 추정 비용 ${records['cost_usd'].sum():.4f}")
+    if args.out:
+        summary.to_csv(args.out, index=False, encoding='utf-8-sig')
+    if args.prometheus:
+        with open(args.prometheus, 'w', encoding='utf-8') as f:
+            f.write(to_prometheus(records, args.by))
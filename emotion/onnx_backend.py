@@ -0,0 +1,307 @@
+"""
+임베딩 모델 ONNX / int8 동적 양자화 CPU 추론 백엔드
+
+SentenceTransformer(PyTorch) 모델을 한 번 ONNX로 내보내고 가중치를 int8로 동적 양자화한 뒤
+onnxruntime으로 추론합니다. OnnxEncoder.encode는 SentenceTransformer.encode와 같은 인자를 받으므로
+Embedder(backend='onnx')나 기존 노트북 코드에 그대로 끼워 쓸 수 있습니다.
+
+onnx_dir/
+    model.onnx          : float32 그래프
+    model.int8.onnx     : 동적 양자화(QInt8) 그래프
+    backend.json        : {"model_name", "pooling", "max_seq_length", "dim"}
+    tokenizer 파일들
+
+양자화 모델은 PyTorch 출력과 조금 다르므로 check_parity로 코사인 유사도를 확인하고,
+임베딩 캐시는 model_name과 백엔드를 기록하므로 같은 디렉토리를 다른 백엔드로 열면 ValueError가 납니다.
+
+사용법:
+    python onnx_backend.py export --out .onnx/snowflake-ko
+    python onnx_backend.py parity --onnx-dir .onnx/snowflake-ko --data retest_augmentation.xlsx
+    python onnx_backend.py bench --onnx-dir .onnx/snowflake-ko --data retest_augmentation.xlsx --threads 1 4 8
+"""
+
+import json
+import os
+import time
+
+import numpy as np
+
+from embedding import MODEL_NAME
+
+CONFIG = 'backend.json'
+FP32_FILE = 'model.onnx'
+INT8_FILE = 'model.int8.onnx'
+
+
+def read_config(onnx_dir):
+    """onnx_dir/backend.json, 디렉토리가 없거나 export 결과가 아니면 이유를 담은 ValueError"""
+    if not onnx_dir:
+        raise ValueError("ONNX 백엔드에는 onnx_dir이 필요합니다 (python onnx_backend.py export --out <dir>)")
+    path = os.path.join(onnx_dir, CONFIG)
+    if not os.path.exists(path):
+        raise ValueError(f"{path}가 없습니다: onnx_backend.py export로 만든 디렉토리가 아닙니다")
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def export_onnx(out_dir, model_name=MODEL_NAME, quantize=True, opset=17):
+    """
+    SentenceTransformer 모델을 ONNX로 내보내고 (선택) int8 동적 양자화
+
+    Returns:
+        str: out_dir
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    os.makedirs(out_dir, exist_ok=True)
+    st_model = SentenceTransformer(model_name, device='cpu')
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+    pooling = st_model[1].get_pooling_mode_str()
+    if pooling not in ('cls', 'mean'):
+        raise ValueError(f"지원하지 않는 pooling: {pooling}")
+
+    dummy = tokenizer(["dummy_text"], return_tensors='pt')
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            (dummy['input_ids'], dummy['attention_mask']),
+            os.path.join(out_dir, FP32_FILE),
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['last_hidden_state'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'last_hidden_state': {0: 'batch', 1: 'sequence'},
+            },
+            opset_version=opset,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(
+            os.path.join(out_dir, FP32_FILE),
+            os.path.join(out_dir, INT8_FILE),
+            weight_type=QuantType.QInt8,
+        )
+
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, CONFIG), 'w', encoding='utf-8') as f:
+        json.dump({
+            'model_name': model_name,
+            'pooling': pooling,
+            'max_seq_length': st_model.max_seq_length,
+            'dim': st_model.get_sentence_embedding_dimension(),
+        }, f, ensure_ascii=False, indent=2)
+    return out_dir
+
+
+class OnnxEncoder:
+    """
+    onnxruntime 기반 문장 임베딩 (SentenceTransformer.encode 호환)
+
+    Args:
+        onnx_dir: export_onnx 출력 디렉토리
+        quantized: True면 model.int8.onnx 사용
+        num_threads: onnxruntime intra-op 스레드 수 (None이면 onnxruntime 기본값)
+    """
+
+    def __init__(self, onnx_dir, quantized=True, num_threads=None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.config = read_config(onnx_dir)
+        self.pooling = self.config['pooling']
+        self.max_seq_length = self.config['max_seq_length']
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(
+            os.path.join(onnx_dir, INT8_FILE if quantized else FP32_FILE),
+            sess_options=options,
+            providers=['CPUExecutionProvider'],
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(onnx_dir)
+
+    def get_sentence_embedding_dimension(self):
+        return self.config['dim']
+
+    def _encode_batch(self, texts):
+        tokens = self.tokenizer(
+            texts, padding=True, truncation=True, max_length=self.max_seq_length, return_tensors='np',
+        )
+        attention_mask = tokens['attention_mask'].astype(np.int64)
+        hidden = self.session.run(None, {
+            'input_ids': tokens['input_ids'].astype(np.int64),
+            'attention_mask': attention_mask,
+        })[0]
+        if self.pooling == 'cls':
+            return hidden[:, 0]
+        mask = attention_mask[:, :, None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences, batch_size=32, normalize_embeddings=False,
+               convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        # 길이순으로 묶어 패딩을 줄이고 원래 순서로 되돌림
+        order = np.argsort([len(t) for t in texts], kind='stable')
+        out = np.empty((len(texts), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            idx = order[start:start + batch_size]
+            out[idx] = self._encode_batch([texts[i] for i in idx])
+            if show_progress_bar:
+                print(f"인코딩: {min(start + batch_size, len(texts))}/{len(texts)}")
+
+        if normalize_embeddings:
+            out /= np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+        return out[0] if single else out
+
+
+def check_parity(texts, onnx_model, torch_model, min_cosine=0.99, batch_size=32):
+    """
+    ONNX 출력과 PyTorch 출력의 행별 코사인 유사도 비교
+
+    Returns:
+        dict: min_cosine, mean_cosine, passed
+    """
+    a = onnx_model.encode(texts, batch_size=batch_size, normalize_embeddings=True)
+    b = torch_model.encode(texts, batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True)
+    cosine = np.sum(a * b, axis=1)
+    return {
+        'n': len(texts),
+        'min_cosine': float(cosine.min()),
+        'mean_cosine': float(cosine.mean()),
+        'passed': bool(cosine.min() >= min_cosine),
+    }
+
+
+def exported_backends(onnx_dir):
+    """onnx_dir에 있는 ONNX 백엔드 ('onnx', export --no-quantize가 아니면 'onnx-int8'도)"""
+    backends = ['onnx']
+    if os.path.exists(os.path.join(onnx_dir, INT8_FILE)):
+        backends.append('onnx-int8')
+    return backends
+
+
+def load_model(backend, onnx_dir=None, num_threads=None):
+    """
+    backend: 'torch', 'onnx', 'onnx-int8'
+
+    torch는 onnx_dir을 주면 그 디렉토리로 내보낸 모델(backend.json의 model_name)을 로드하므로
+    parity/bench가 항상 같은 모델끼리 비교합니다.
+    """
+    if backend == 'torch':
+        from sentence_transformers import SentenceTransformer
+        if num_threads:
+            import torch
+            torch.set_num_threads(num_threads)
+        model_name = read_config(onnx_dir)['model_name'] if onnx_dir else MODEL_NAME
+        return SentenceTransformer(model_name, device='cpu')
+    if backend in ('onnx', 'onnx-int8'):
+        return OnnxEncoder(onnx_dir, quantized=backend == 'onnx-int8', num_threads=num_threads)
+    raise ValueError(f"알 수 없는 backend: {backend}")
+
+
+def _cold_start(backend, onnx_dir, num_threads):
+    """새 프로세스에서 import + 모델 로드 + 첫 encode('dummy_text')까지 걸린 시간"""
+    start = time.perf_counter()
+    load_model(backend, onnx_dir, num_threads).encode("dummy_text")
+    return time.perf_counter() - start
+
+
+def benchmark(texts, onnx_dir, backends=None, threads=(None,), batch_size=32):
+    """
+    백엔드 x 스레드 수 조합별 cold start(초)와 처리량(문장/초)
+
+    cold start는 import 비용까지 포함하도록 spawn 프로세스에서 측정합니다.
+    backends를 주지 않으면 torch와 onnx_dir에 있는 ONNX 백엔드 전부입니다.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    if backends is None:
+        backends = ['torch'] + exported_backends(onnx_dir)
+    rows = []
+    spawn = multiprocessing.get_context('spawn')
+    for backend in backends:
+        for num_threads in threads:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                cold_start = pool.submit(_cold_start, backend, onnx_dir, num_threads).result()
+
+            model = load_model(backend, onnx_dir, num_threads)
+            model.encode(texts[:batch_size], batch_size=batch_size)
+            start = time.perf_counter()
+            model.encode(texts, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            rows.append({
+                'backend': backend,
+                'threads': num_threads or 'default',
+                'cold_start_sec': cold_start,
+                'sentences_per_sec': len(texts) / elapsed,
+            })
+            print(f"{backend:>10} threads={rows[-1]['threads']}: cold start {cold_start:.2f}s, "
+                  f"{rows[-1]['sentences_per_sec']:.1f} 문장/초")
+    return rows
+
+
+def _read_texts(path, column, limit):
+    import pandas as pd
+
+    df = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_excel(path)
+    texts = df[column].dropna().astype(str).tolist()
+    return texts[:limit] if limit else texts
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ONNX 임베딩 백엔드 내보내기/검증/벤치마크")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    exp = sub.add_parser('export', help="SentenceTransformer → ONNX (+int8)")
+    exp.add_argument('--out', required=True)
+    exp.add_argument('--model-name', default=MODEL_NAME)
+    exp.add_argument('--no-quantize', action='store_true')
+
+    for name, help_text in (('parity', "PyTorch 대비 출력 비교"), ('bench', "cold start / 처리량 측정")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('--onnx-dir', required=True)
+        p.add_argument('--data', required=True, help="엑셀/parquet 데이터 파일")
+        p.add_argument('--text-column', default='generator_context')
+        p.add_argument('--limit', type=int, default=1000)
+        p.add_argument('--threads', type=int, nargs='+', default=[None])
+        p.add_argument('--batch-size', type=int, default=32)
+    sub.choices['parity'].add_argument('--min-cosine', type=float, default=0.99)
+
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        export_onnx(args.out, args.model_name, quantize=not args.no_quantize)
+        print(f"ONNX 모델 저장: {args.out}")
+        return
+
+    texts = _read_texts(args.data, args.text_column, args.limit)
+    if args.command == 'parity':
+        torch_model = load_model('torch', args.onnx_dir)
+        failed = False
+        for backend in ('onnx', 'onnx-int8'):
+            if backend not in exported_backends(args.onnx_dir):
+                print(f"{backend}: {INT8_FILE}가 없어 건너뜀 (export --no-quantize)")
+                continue
+            report = check_parity(texts, load_model(backend, args.onnx_dir, args.threads[0]), torch_model,
+                                  args.min_cosine, args.batch_size)
+            print(f"{backend}: {report}")
+            failed |= not report['passed']
+        raise SystemExit(1 if failed else 0)
+
+    benchmark(texts, args.onnx_dir, threads=args.threads, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import joblib
+import numpy as np
+from sklearn.preprocessing import LabelEncoder, OneHotEncoder
+
+from embedding import MODEL_NAME, Embedder
+from taxonomy import masked_category2_argmax
+
+
+def default_classifier():
+    """model.ipynb에서 사용한 XGBoost 설정"""
+    import xgboost as xgb
+    return xgb.XGBClassifier(
+        n_estimators=300,
+        learning_rate=0.05,
+        max_depth=8,
+        subsample=0.8,
+        colsample_bytree=0.8,
+        random_state=42,
+        tree_method="hist",
+        n_jobs=-1
+    )
+
+
+class EmotionClassificationPipeline:
+    """
+    텍스트 입력 → 임베딩 → Category1 예측 → Category2 예측 파이프라인
+
+    Category2 모델은 임베딩 벡터 뒤에 Category1 원핫 벡터를 붙인 특성으로 학습합니다.
+    학습 시에는 실제 Category1, 예측 시에는 예측된 Category1을 사용합니다.
+    mask_category2=True면 Category2는 예측된 Category1의 소분류 중에서만 고릅니다.
+    save()/load()로 분류기와 인코더를 하나의 파일로 저장해 재학습 없이 재사용합니다.
+    """
+
+    def __init__(self, embeddings_model, cat1_model, cat2_model,
+                 cat1_encoder, cat2_encoder, cat1_onehot_encoder, mask_category2=True):
+        self.embeddings_model = embeddings_model
+        self.cat1_model = cat1_model
+        self.cat2_model = cat2_model
+        self.cat1_encoder = cat1_encoder
+        self.cat2_encoder = cat2_encoder
+        self.cat1_onehot_encoder = cat1_onehot_encoder
+        self.mask_category2 = mask_category2
+
+    @classmethod
+    def fit(cls, X, y_cat1, y_cat2, embeddings_model=None, cat1_model=None, cat2_model=None):
+        """
+        임베딩 행렬 X와 라벨로 두 단계 분류기를 학습
+
+        Args:
+            X: (n, dim) 임베딩 행렬
+            y_cat1, y_cat2: 중분류/소분류 라벨
+            cat1_model, cat2_model: sklearn 호환 분류기 (기본: XGBClassifier)
+        """
+        y_cat1 = np.asarray(y_cat1)
+        y_cat2 = np.asarray(y_cat2)
+
+        cat1_encoder = LabelEncoder()
+        cat2_encoder = LabelEncoder()
+        cat1_onehot_encoder = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
+
+        cat1_model = cat1_model or default_classifier()
+        cat1_model.fit(X, cat1_encoder.fit_transform(y_cat1))
+
+        y_cat1_onehot = cat1_onehot_encoder.fit_transform(y_cat1.reshape(-1, 1))
+        cat2_model = cat2_model or default_classifier()
+        cat2_model.fit(np.hstack([X, y_cat1_onehot]), cat2_encoder.fit_transform(y_cat2))
+
+        return cls(embeddings_model, cat1_model, cat2_model,
+                   cat1_encoder, cat2_encoder, cat1_onehot_encoder)
+
+    def predict_vectors(self, X):
+        """
+        임베딩 행렬에 대한 배치 예측
+
+        Returns:
+            dict: category1/category2 라벨 배열, 각 예측 확률(confidence) 배열과 전체 확률 행렬
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+
+        cat1_proba = self.cat1_model.predict_proba(X)
+        cat1_idx = cat1_proba.argmax(axis=1)
+        cat1_pred = self.cat1_encoder.inverse_transform(cat1_idx)
+
+        cat1_onehot = self.cat1_onehot_encoder.transform(cat1_pred.reshape(-1, 1))
+        cat2_proba = self.cat2_model.predict_proba(np.hstack([X, cat1_onehot]))
+        if self.mask_category2:
+            cat2_idx = masked_category2_argmax(cat2_proba, cat1_pred, self.cat2_encoder.classes_)
+        else:
+            cat2_idx = cat2_proba.argmax(axis=1)
+        cat2_pred = self.cat2_encoder.inverse_transform(cat2_idx)
+
+        return {
+            'category1': cat1_pred,
+            'category1_confidence': cat1_proba[np.arange(len(X)), cat1_idx],
+            'category1_proba': cat1_proba,
+            'category2': cat2_pred,
+            'category2_confidence': cat2_proba[np.arange(len(X)), cat2_idx],
+            'category2_proba': cat2_proba,
+        }
+
+    def predict_batch(self, texts):
+        """
+        여러 텍스트를 한 번의 임베딩 호출로 예측
+
+        Returns:
+            list: 예측 결과 딕셔너리 리스트
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        vectors = self.embeddings_model.encode(texts)
+        result = self.predict_vectors(vectors)
+        return [
+            {
+                'text': text,
+                'category1_predicted': str(result['category1'][i]),
+                'category1_confidence': float(result['category1_confidence'][i]),
+                'category2_predicted': str(result['category2'][i]),
+                'category2_confidence': float(result['category2_confidence'][i]),
+            }
+            for i, text in enumerate(texts)
+        ]
+
+    def predict_single(self, text):
+        return self.predict_batch([text])[0]
+
+    def save(self, path):
+        """분류기와 인코더 저장 (임베딩 모델은 이름만 저장)"""
+        joblib.dump({
+            'embedding_model_name': getattr(self.embeddings_model, 'model_name', MODEL_NAME),
+            'cat1_model': self.cat1_model,
+            'cat2_model': self.cat2_model,
+            'cat1_encoder': self.cat1_encoder,
+            'cat2_encoder': self.cat2_encoder,
+            'cat1_onehot_encoder': self.cat1_onehot_encoder,
+        }, path)
+
+    @classmethod
+    def load(cls, path, embeddings_model=None, **embedder_options):
+        """
+        embeddings_model을 주지 않으면 저장된 모델 이름으로 Embedder(**embedder_options)를 만듦
+        (예: backend='onnx-int8', onnx_dir=...), 주면 저장된 모델 이름과 같은지 확인
+        """
+        state = joblib.load(path)
+        saved_name = state['embedding_model_name']
+        if embeddings_model is None:
+            embeddings_model = Embedder(saved_name, **embedder_options)
+        elif getattr(embeddings_model, 'model_name', saved_name) != saved_name:
+            raise ValueError(
+                f"{path}는 {saved_name} 임베딩으로 학습되었습니다 (받은 모델: {embeddings_model.model_name})")
+        return cls(embeddings_model, state['cat1_model'], state['cat2_model'],
+                   state['cat1_encoder'], state['cat2_encoder'], state['cat1_onehot_encoder'])
+
+
+if __name__ == "__main__":
+    import argparse
+    import pandas as pd
+
+    from embedding import embed_column
+
+    parser = argparse.ArgumentParser(description="감정 분류 파이프라인 학습 및 저장")
+    parser.add_argument('data', help="학습 데이터 엑셀/parquet 파일")
+    parser.add_argument('--out', default='emotion_pipeline.joblib')
+    parser.add_argument('--text-column', default='generator_context')
+    parser.add_argument('--cat1-column', default='category1')
+    parser.add_argument('--cat2-column', default='category2')
+    parser.add_argument('--cache-dir', default=None, help="임베딩 캐시 디렉토리")
+    args = parser.parse_args()
+
+    if args.data.endswith('.parquet'):
+        data = pd.read_parquet(args.data)
+    else:
+        data = pd.read_excel(args.data)
+
+    embedder = Embedder(cache_dir=args.cache_dir)
+    X = embed_column(data, args.text_column, embedder, show_progress=True)
+    pipeline = EmotionClassificationPipeline.fit(
+        X, data[args.cat1_column].values, data[args.cat2_column].values, embeddings_model=embedder)
+    pipeline.save(args.out)
+    print(f"파이프라인 저장 완료: {args.out} ({len(data)}개 샘플)")
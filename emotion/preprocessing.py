@@ -0,0 +1,168 @@
+"""
+원본 감정 어노테이션 parquet 전처리
+
+250903.ipynb / 250905_data_prepro.ipynb의 처리 과정을 한 번에 수행합니다.
+    1. annotation 문자열에서 각 annotator의 emotion('중분류_소분류') 추출
+    2. 중분류, 소분류 각각 min_count표 이상 받은 다수결 값이 있는 행만 남김
+    3. taxonomy.HIERARCHY에 없는 (중분류, 소분류) 조합 제거
+
+ast.literal_eval과 행 단위 .apply 대신 Arrow 문자열 커널과 numpy 집계로 처리하며,
+parquet row group(배치) 단위로 스트리밍합니다.
+
+사용법:
+    python preprocessing.py data/0000.parquet 증강할데이터33.xlsx
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from taxonomy import is_valid_pair
+
+EMOTION_MARKER = "'emotion': '"
+
+def explode_annotations(annotation):
+    """
+    annotation 문자열 배열을 annotator 단위로 펼침
+
+    Returns:
+        (row, emotions, category1, category2):
+        row는 각 emotion이 속한 행 번호(int64), 나머지는 Arrow 문자열 배열
+    """
+    annotation = pa.array(annotation) if not isinstance(annotation, (pa.Array, pa.ChunkedArray)) else annotation
+    if isinstance(annotation, pa.ChunkedArray):
+        annotation = annotation.combine_chunks()
+
+    # "[{..., 'emotion': 'A_B', ...}, ...]" → ["[{...", "A_B', ...}, {...", ...]
+    parts = pc.split_pattern(annotation, EMOTION_MARKER)
+    flat = pc.list_flatten(parts)
+    parent = pc.list_parent_indices(parts).to_numpy()
+
+    # 각 리스트의 첫 조각은 emotion 앞부분이므로 제외
+    offsets = parts.offsets.to_numpy()
+    is_head = np.zeros(len(flat), dtype=bool)
+    is_head[offsets[:-1][np.diff(offsets) > 0]] = True
+    keep = pa.array(~is_head)
+    flat = pc.filter(flat, keep)
+    row = parent[~is_head].astype(np.int64)
+
+    emotions = pc.list_element(pc.split_pattern(flat, "'", max_splits=1), 0)
+    pairs = pc.extract_regex(emotions, r'^(?P<category1>[^_]*)_(?P<category2>.*)$')
+
+    # '중분류_소분류' 형식이 아닌 값은 제외
+    valid = pc.is_valid(pairs)
+    if pc.all(valid).as_py() is False:
+        row = row[valid.to_numpy(zero_copy_only=False)]
+        emotions = pc.filter(emotions, valid)
+        pairs = pc.filter(pairs, valid)
+    return row, emotions, pc.struct_field(pairs, 'category1'), pc.struct_field(pairs, 'category2')
+
+
+def majority_vote(row, labels, n_rows, min_count=3):
+    """
+    행별 다수결 값 (collections.Counter.most_common과 같이 동률이면 먼저 나온 값)
+
+    Returns:
+        (values, counts): 길이 n_rows, 최다 득표 수가 min_count 미만인 행은 None / 최다 득표 수
+    """
+    encoded = pc.dictionary_encode(labels)
+    codes = encoded.indices.to_numpy(zero_copy_only=False).astype(np.int64)
+    dictionary = np.asarray(encoded.dictionary.to_pylist(), dtype=object)
+
+    # (행, 값) 쌍별 득표 수와 첫 등장 위치
+    key = row * max(len(dictionary), 1) + codes
+    _, first_pos, counts = np.unique(key, return_index=True, return_counts=True)
+    key_rows = row[first_pos]
+
+    # 행 → 득표 수 내림차순 → 첫 등장 순으로 정렬 후 행별 첫 번째 선택
+    order = np.lexsort((first_pos, -counts, key_rows))
+    key_rows = key_rows[order]
+    is_first = np.ones(len(order), dtype=bool)
+    is_first[1:] = key_rows[1:] != key_rows[:-1]
+    best = order[is_first]
+
+    values = np.full(n_rows, None, dtype=object)
+    best_counts = np.zeros(n_rows, dtype=np.int64)
+    best_counts[row[first_pos[best]]] = counts[best]
+    winners = best[counts[best] >= min_count]
+    values[row[first_pos[winners]]] = dictionary[codes[first_pos[winners]]]
+    return values, best_counts
+
+
+def preprocess_table(table, min_count=3, remove_invalid=True, include_annotations=False, row_offset=0):
+    """
+    Arrow Table/RecordBatch 하나를 전처리
+
+    Returns:
+        DataFrame: index(파일 내 행 번호), context, category1, category2
+        (include_annotations=True면 annotation: emotion 리스트 컬럼 추가)
+    """
+    n_rows = table.num_rows
+    row, emotions, category1, category2 = explode_annotations(table.column('annotation'))
+
+    cat1, cat1_count = majority_vote(row, category1, n_rows, min_count)
+    cat2, cat2_count = majority_vote(row, category2, n_rows, min_count)
+
+    keep = (cat1_count >= min_count) & (cat2_count >= min_count)
+    if remove_invalid:
+        keep &= is_valid_pair(cat1, cat2)
+
+    result = pd.DataFrame({
+        'index': np.arange(row_offset, row_offset + n_rows)[keep],
+        'context': table.column('context').to_numpy(zero_copy_only=False)[keep],
+        'category1': cat1[keep],
+        'category2': cat2[keep],
+    })
+    if include_annotations:
+        offsets = np.searchsorted(row, np.arange(n_rows + 1))
+        per_row = pa.ListArray.from_arrays(pa.array(offsets, pa.int32()), emotions)
+        result['annotation'] = per_row.to_numpy(zero_copy_only=False)[keep]
+    return result
+
+
+def iter_preprocessed(path, batch_size=65536, **kwargs):
+    """parquet 파일을 배치 단위로 읽으며 전처리 결과를 순차 반환"""
+    parquet = pq.ParquetFile(path)
+    offset = 0
+    for batch in parquet.iter_batches(batch_size=batch_size, columns=['context', 'annotation']):
+        yield preprocess_table(batch, row_offset=offset, **kwargs)
+        offset += batch.num_rows
+
+
+def preprocess_parquet(path, batch_size=65536, **kwargs):
+    """parquet 파일 전체를 전처리해 category1/category2를 categorical dtype으로 반환"""
+    frames = list(iter_preprocessed(path, batch_size=batch_size, **kwargs))
+    result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=['index', 'context', 'category1', 'category2'])
+    return result.astype({'category1': 'category', 'category2': 'category'})
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="감정 어노테이션 parquet 전처리")
+    parser.add_argument('input', help="원본 parquet 파일 (예: data/0000.parquet)")
+    parser.add_argument('output', help="결과 파일 (.parquet 또는 .xlsx)")
+    parser.add_argument('--min-count', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=65536)
+    parser.add_argument('--keep-invalid', action='store_true', help="체계에 없는 조합도 남김")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    df = preprocess_parquet(
+        args.input,
+        batch_size=args.batch_size,
+        min_count=args.min_count,
+        remove_invalid=not args.keep_invalid,
+        include_annotations=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    if args.output.endswith('.parquet'):
+        df.to_parquet(args.output, index=False)
+    else:
+        df.assign(annotation=df['annotation'].map(list)).to_excel(args.output, index=False)
+    print(f"전처리 완료: {len(df)}개 행 ({elapsed:.2f}초) → {args.output}")
@@ -0,0 +1,189 @@
+"""
+임베딩 행렬 양자화와 int8 내적 검색
+
+- float16: 메모리 1/2, 그대로 float32로 올려 내적
+- int8   : 벡터별 스케일(scale = max|x| / 127)을 둔 대칭 스칼라 양자화, 메모리 약 1/4
+
+QuantizedIndex.search는 int8 코드 행렬과 질의 코드의 행렬곱으로 후보를 고른 뒤
+상위 rerank개 후보만 float32 질의와 다시 내적해 정렬합니다.
+재정렬에는 역양자화한 벡터를 쓰거나, 디스크의 float32 memmap을 넘겨 원본 벡터를 쓸 수 있습니다.
+
+사용법 (float32 대비 메모리, recall@k, 질의 지연 비교):
+    python quantization.py .embedding_cache --k 10 --queries 1000
+    python quantization.py data/store:retest --k 10
+"""
+
+import time
+
+import numpy as np
+
+from similarity import normalize, topk_search
+
+
+def quantize_int8(vectors):
+    """(n, dim) float → (int8 코드, float32 벡터별 스케일)"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize_int8(codes, scales):
+    return codes.astype(np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+
+class QuantizedIndex:
+    """
+    float16 / int8 양자화 행렬에 대한 top-k 코사인 유사도 검색
+
+    Args:
+        vectors: (n, dim) 벡터 (내부에서 정규화)
+        dtype: 'float32', 'float16', 'int8'
+        rerank_vectors: int8 재정렬에 사용할 float32 원본 (예: np.load(..., mmap_mode='r'))
+    """
+
+    def __init__(self, vectors, dtype='int8', rerank_vectors=None, block_size=65536):
+        self.dtype = np.dtype(dtype)
+        self.block_size = block_size
+        self.rerank_vectors = rerank_vectors
+        vectors = normalize(vectors)
+        self.scales = None
+        if self.dtype == np.int8:
+            self.codes, self.scales = quantize_int8(vectors)
+        else:
+            self.codes = vectors.astype(self.dtype)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + (0 if self.scales is None else self.scales.nbytes)
+
+    def _candidate_vectors(self, ids):
+        if self.rerank_vectors is not None:
+            return normalize(self.rerank_vectors[np.sort(ids)])[np.argsort(np.argsort(ids))]
+        if self.scales is not None:
+            return dequantize_int8(self.codes[ids], self.scales[ids])
+        return self.codes[ids].astype(np.float32)
+
+    def _coarse_topk(self, queries, n_candidates):
+        """블록 단위 행렬곱 점수로 질의별 상위 n_candidates 후보 (ids, scores), 전체 float32 사본은 만들지 않음"""
+        query_scales = None
+        if self.scales is not None:
+            codes, query_scales = quantize_int8(queries)
+            queries = codes.astype(np.float32)
+        best_ids = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+
+        for start in range(0, len(self.codes), self.block_size):
+            block = self.codes[start:start + self.block_size]
+            scores = queries @ block.astype(np.float32).T
+            if self.scales is not None:
+                # 정수 코드 내적 (float32 BLAS로 계산해도 |값| <= 127*127*dim 이라 정확)
+                scores *= self.scales[start:start + len(block)]
+            ids = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+            best_ids = np.concatenate([best_ids, ids], axis=1)
+            best_scores = np.concatenate([best_scores, scores], axis=1)
+            if best_scores.shape[1] > n_candidates:
+                part = np.argpartition(-best_scores, n_candidates - 1, axis=1)[:, :n_candidates]
+                best_ids = np.take_along_axis(best_ids, part, axis=1)
+                best_scores = np.take_along_axis(best_scores, part, axis=1)
+        if query_scales is not None:
+            # 질의 스케일은 질의마다 상수라 순위에는 영향이 없으므로 마지막에 한 번만 곱해 코사인 유사도 근사값으로 맞춤
+            best_scores *= query_scales[:, None]
+        return best_ids, best_scores
+
+    def search(self, queries, k=10, rerank=None):
+        """
+        Args:
+            queries: (nq, dim) 질의 벡터
+            k: 이웃 수
+            rerank: int8 재정렬 후보 수 (기본 4*k, 0이면 재정렬 없이 int8 코드로 근사한 코사인 유사도 순,
+                    float 형식은 무시)
+
+        Returns:
+            (ids, scores): (nq, k) 배열, float32 점수 내림차순
+        """
+        queries = normalize(queries)
+        rerank = 4 * k if rerank is None else rerank
+        if self.scales is None:
+            rerank = 0
+        n_candidates = min(max(rerank, k), len(self.codes))
+        candidates, scores = self._coarse_topk(queries, n_candidates)
+
+        if rerank:
+            for i, ids in enumerate(candidates):
+                scores[i] = self._candidate_vectors(ids) @ queries[i]
+        order = np.argsort(-scores, axis=1)[:, :k]
+        return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def recall_at_k(found_ids, true_ids):
+    """질의별 |found ∩ true| / k 의 평균"""
+    k = true_ids.shape[1]
+    return float(np.mean([len(np.intersect1d(f, t)) / k for f, t in zip(found_ids, true_ids)]))
+
+
+def benchmark(vectors, k=10, n_queries=1000, seed=42):
+    """
+    float32 정확 검색 대비 float16 / int8 / int8+재정렬의 메모리, recall@k, 지연 비교
+
+    질의는 코퍼스에서 뽑은 샘플이며 자기 자신도 정답에 포함됩니다.
+    """
+    vectors = normalize(vectors)
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.choice(len(vectors), min(n_queries, len(vectors)), replace=False)]
+
+    start = time.perf_counter()
+    true_ids, _ = topk_search(queries, vectors, k)
+    baseline_sec = time.perf_counter() - start
+
+    rows = [{'format': 'float32', 'memory_mb': vectors.nbytes / 1024 ** 2, 'recall_at_k': 1.0,
+             'query_ms': baseline_sec / len(queries) * 1000}]
+    configs = [('float16', 'float16', None), ('int8', 'int8', 0), ('int8+rerank', 'int8', 4 * k)]
+    for name, dtype, rerank in configs:
+        index = QuantizedIndex(vectors, dtype)
+        start = time.perf_counter()
+        ids, _ = index.search(queries, k, rerank=rerank)
+        elapsed = time.perf_counter() - start
+        rows.append({
+            'format': name,
+            'memory_mb': index.nbytes / 1024 ** 2,
+            'recall_at_k': recall_at_k(ids, true_ids),
+            'query_ms': elapsed / len(queries) * 1000,
+        })
+    return rows
+
+
+def load_vectors(source):
+    """'.npy' 파일, Embedder 캐시 디렉토리, 또는 'DatasetStore루트:stage'에서 벡터 행렬 로드"""
+    import os
+
+    if source.endswith('.npy'):
+        return np.load(source, mmap_mode='r')
+    if ':' in source and not os.path.isdir(source):
+        from dataset_store import DatasetStore
+        root, stage = source.rsplit(':', 1)
+        return DatasetStore(root).load_vectors(stage)
+
+    from embedding import EmbeddingCache
+    cache = EmbeddingCache(source, dtype=None)
+    return cache.get(list(cache.keys))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="양자화 임베딩 메모리/recall 벤치마크")
+    parser.add_argument('source', help=".npy 파일, 임베딩 캐시 디렉토리, 또는 store_root:stage")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+
+    vectors = load_vectors(args.source)
+    print(f"벡터: {vectors.shape}")
+    print(f"{'format':>12} {'memory_mb':>10} {'recall@' + str(args.k):>10} {'query_ms':>9}")
+    for row in benchmark(vectors, args.k, args.queries):
+        print(f"{row['format']:>12} {row['memory_mb']:>10.2f} {row['recall_at_k']:>10.4f} {row['query_ms']:>9.3f}")
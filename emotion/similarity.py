@@ -0,0 +1,342 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def normalize(vectors):
+    """행 단위 L2 정규화된 float32 행렬 (정규화 후 내적 = 코사인 유사도)"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _encode_categories(query_categories, corpus_categories):
+    """카테고리 라벨(문자열 등)을 공통 정수 코드로 변환"""
+    if query_categories is None and corpus_categories is None:
+        return None, None
+    if query_categories is None or corpus_categories is None:
+        raise ValueError("query_categories와 corpus_categories는 함께 지정해야 합니다")
+    query_categories = np.asarray(query_categories)
+    corpus_categories = np.asarray(corpus_categories)
+    _, codes = np.unique(np.concatenate([query_categories, corpus_categories]), return_inverse=True)
+    return codes[:len(query_categories)], codes[len(query_categories):]
+
+
+def _merge_topk(ids, scores, new_ids, new_scores, k):
+    """현재 top-k와 새 후보를 합쳐 다시 top-k (정렬되지 않은 상태)"""
+    ids = np.concatenate([ids, new_ids], axis=1)
+    scores = np.concatenate([scores, new_scores], axis=1)
+    if scores.shape[1] <= k:
+        return ids, scores
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(ids, part, axis=1), np.take_along_axis(scores, part, axis=1)
+
+
+def _block_topk(scores, k, offset):
+    """유사도 블록에서 행별 top-k 후보 (전역 id, 점수)"""
+    if scores.shape[1] > k:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(scores.shape[1]), scores.shape).copy()
+    return part + offset, np.take_along_axis(scores, part, axis=1)
+
+
+def _sort_topk(ids, scores, k):
+    order = np.argsort(-scores, axis=1, kind='stable')
+    ids = np.take_along_axis(ids, order, axis=1)
+    scores = np.take_along_axis(scores, order, axis=1)
+    # 후보가 k개보다 적으면 id -1, 점수 -inf로 채움
+    if ids.shape[1] < k:
+        pad = k - ids.shape[1]
+        ids = np.pad(ids, ((0, 0), (0, pad)), constant_values=-1)
+        scores = np.pad(scores, ((0, 0), (0, pad)), constant_values=-np.inf)
+    ids = ids[:, :k]
+    scores = scores[:, :k]
+    ids[~np.isfinite(scores)] = -1
+    return ids, scores
+
+
+def _search_block(queries, corpus, k, query_ids, query_cats, corpus_cats, corpus_block):
+    n_queries = len(queries)
+    best_ids = np.empty((n_queries, 0), dtype=np.int64)
+    best_scores = np.empty((n_queries, 0), dtype=np.float32)
+    rows = np.arange(n_queries)
+
+    for c_start in range(0, len(corpus), corpus_block):
+        c_end = min(c_start + corpus_block, len(corpus))
+        scores = queries @ corpus[c_start:c_end].T
+
+        if query_ids is not None:
+            # 자기 자신 제외
+            local = query_ids - c_start
+            hit = (local >= 0) & (local < c_end - c_start)
+            scores[rows[hit], local[hit]] = -np.inf
+        if query_cats is not None:
+            scores[query_cats[:, None] != corpus_cats[None, c_start:c_end]] = -np.inf
+
+        block_ids, block_scores = _block_topk(scores, k, c_start)
+        best_ids, best_scores = _merge_topk(best_ids, best_scores, block_ids, block_scores, k)
+
+    return _sort_topk(best_ids, best_scores, k)
+
+
+def topk_search(queries, corpus, k=3, query_ids=None, query_categories=None, corpus_categories=None,
+                query_block=1024, corpus_block=16384, n_jobs=None):
+    """
+    정규화된 임베딩 행렬에 대한 정확한 top-k 코사인 유사도 검색
+
+    Args:
+        queries: (nq, dim) 정규화된 질의 행렬
+        corpus: (n, dim) 정규화된 대상 행렬
+        k: 이웃 수
+        query_ids: 각 질의의 corpus 내 id (자기 자신 제외용, 없으면 -1)
+        query_categories, corpus_categories: 지정하면 같은 카테고리 안에서만 검색
+        query_block, corpus_block: 블록 크기 (메모리 사용량 ~ query_block * corpus_block * 4 byte * n_jobs)
+        n_jobs: 질의 블록을 나눠 처리할 스레드 수 (기본 1)
+            1이면 행렬곱 병렬화는 BLAS 자체 스레드에 맡깁니다.
+            2 이상이면 스레드마다 BLAS를 1스레드로 제한해 (n_jobs x BLAS 스레드) 과다 구독을 막습니다.
+
+    Returns:
+        (ids, scores): (nq, k) int64 / float32 배열, 내림차순 정렬.
+        이웃이 k개보다 적으면 id -1, 점수 -inf
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    corpus = np.asarray(corpus, dtype=np.float32)
+    if query_ids is not None:
+        query_ids = np.asarray(query_ids, dtype=np.int64)
+    query_cats, corpus_cats = _encode_categories(query_categories, corpus_categories)
+
+    starts = list(range(0, len(queries), query_block))
+
+    def run(q_start):
+        q_end = min(q_start + query_block, len(queries))
+        return _search_block(
+            queries[q_start:q_end], corpus, k,
+            None if query_ids is None else query_ids[q_start:q_end],
+            None if query_cats is None else query_cats[q_start:q_end],
+            corpus_cats, corpus_block,
+        )
+
+    ids = np.full((len(queries), k), -1, dtype=np.int64)
+    scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    n_jobs = min(n_jobs or 1, len(starts))
+    if n_jobs <= 1:
+        results = map(run, starts)
+    else:
+        from threadpoolctl import threadpool_limits
+
+        # numpy 행렬곱은 GIL을 놓으므로 스레드로 블록을 병렬 처리하되 BLAS 내부 스레드는 1개로
+        with threadpool_limits(limits=1, user_api='blas'), ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            results = list(pool.map(run, starts))
+    for q_start, (block_ids, block_scores) in zip(starts, results):
+        ids[q_start:q_start + len(block_ids)] = block_ids
+        scores[q_start:q_start + len(block_ids)] = block_scores
+    return ids, scores
+
+
+def all_pairs_topk(vectors, k=3, categories=None, **kwargs):
+    """행렬 안의 모든 샘플에 대해 자기 자신을 제외한 top-k 이웃"""
+    vectors = normalize(vectors)
+    return topk_search(
+        vectors, vectors, k,
+        query_ids=np.arange(len(vectors)),
+        query_categories=categories,
+        corpus_categories=categories,
+        **kwargs,
+    )
+
+
+class ExactIndex:
+    """정규화 행렬 전체를 블록 단위로 검색하는 정확한 인덱스"""
+
+    def __init__(self, vectors=None, categories=None):
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+        self.categories = None
+        if vectors is not None:
+            self.add(vectors, categories)
+
+    def __len__(self):
+        return len(self.vectors)
+
+    def add(self, vectors, categories=None):
+        vectors = normalize(vectors)
+        self.vectors = vectors if len(self.vectors) == 0 else np.vstack([self.vectors, vectors])
+        if categories is not None:
+            categories = np.asarray(categories)
+            self.categories = categories if self.categories is None else np.concatenate([self.categories, categories])
+
+    def search(self, queries, k=3, query_ids=None, query_categories=None, **kwargs):
+        return topk_search(
+            normalize(queries), self.vectors, k,
+            query_ids=query_ids,
+            query_categories=query_categories,
+            corpus_categories=None if query_categories is None else self.categories,
+            **kwargs,
+        )
+
+
+class IVFIndex:
+    """
+    역파일(IVF) 근사 인덱스
+
+    구면 k-means로 nlist개 중심을 학습하고, 각 벡터를 가장 가까운 중심의 리스트에 넣습니다.
+    검색 시 질의별로 가까운 nprobe개 리스트만 정확히 비교합니다.
+    리스트마다 (벡터, id, 카테고리) 배열을 용량을 두 배씩 늘려가며 두므로
+    add는 새 벡터만 배정해서 해당 리스트 끝에 붙입니다. (기존 벡터는 다시 배정하지 않음)
+    """
+
+    def __init__(self, nlist=256, nprobe=8, seed=42):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids = None
+        self.list_vectors = None
+        self.list_ids = None
+        self.list_categories = None
+        self.list_sizes = None
+        self.has_categories = False
+        # 카테고리 라벨 → 정수 코드 (리스트에는 코드로 저장)
+        self.category_codes = {}
+        self.ntotal = 0
+
+    def __len__(self):
+        return self.ntotal
+
+    def train(self, vectors, n_iter=20, sample_size=100_000):
+        vectors = normalize(vectors)
+        rng = np.random.default_rng(self.seed)
+        if len(vectors) > sample_size:
+            vectors = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        nlist = min(self.nlist, len(vectors))
+        centroids = vectors[rng.choice(len(vectors), nlist, replace=False)].copy()
+
+        for _ in range(n_iter):
+            assign = self._assign(vectors, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, vectors)
+            empty = np.bincount(assign, minlength=nlist) == 0
+            # 빈 클러스터는 임의 샘플로 다시 초기화
+            sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+            centroids = normalize(sums)
+
+        self.centroids = centroids
+        self.nlist = nlist
+        return self
+
+    @staticmethod
+    def _assign(vectors, centroids, block=65536):
+        out = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), block):
+            out[start:start + block] = np.argmax(vectors[start:start + block] @ centroids.T, axis=1)
+        return out
+
+    @staticmethod
+    def _grow(array, needed):
+        """needed개가 들어가도록 용량을 두 배씩 늘린 배열 (앞부분 복사)"""
+        if len(array) >= needed:
+            return array
+        capacity = max(len(array) * 2, 16)
+        while capacity < needed:
+            capacity *= 2
+        grown = np.empty((capacity, *array.shape[1:]), dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def add(self, vectors, categories=None):
+        """벡터를 가장 가까운 리스트 끝에 추가 (id는 추가 순서)"""
+        if self.centroids is None:
+            self.train(vectors)
+        vectors = normalize(vectors)
+        if self.list_sizes is None:
+            dim = vectors.shape[1]
+            self.list_vectors = [np.empty((0, dim), dtype=np.float32) for _ in range(self.nlist)]
+            self.list_ids = [np.empty(0, dtype=np.int64) for _ in range(self.nlist)]
+            self.list_categories = [np.empty(0, dtype=np.int64) for _ in range(self.nlist)]
+            self.list_sizes = np.zeros(self.nlist, dtype=np.int64)
+            self.has_categories = categories is not None
+        elif (categories is not None) != self.has_categories:
+            raise ValueError("categories는 모든 add에서 함께 지정하거나 모두 생략해야 합니다")
+
+        ids = np.arange(self.ntotal, self.ntotal + len(vectors), dtype=np.int64)
+        if categories is not None:
+            categories = np.asarray([self.category_codes.setdefault(c, len(self.category_codes)) for c in categories],
+                                    dtype=np.int64)
+        assign = self._assign(vectors, self.centroids)
+        order = np.argsort(assign, kind='stable')
+        counts = np.bincount(assign, minlength=self.nlist)
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        for list_no in np.nonzero(counts)[0]:
+            rows = order[offsets[list_no]:offsets[list_no + 1]]
+            size = self.list_sizes[list_no]
+            needed = size + len(rows)
+            self.list_vectors[list_no] = self._grow(self.list_vectors[list_no], needed)
+            self.list_vectors[list_no][size:needed] = vectors[rows]
+            self.list_ids[list_no] = self._grow(self.list_ids[list_no], needed)
+            self.list_ids[list_no][size:needed] = ids[rows]
+            if categories is not None:
+                self.list_categories[list_no] = self._grow(self.list_categories[list_no], needed)
+                self.list_categories[list_no][size:needed] = categories[rows]
+            self.list_sizes[list_no] = needed
+        self.ntotal += len(vectors)
+
+    def search(self, queries, k=3, nprobe=None, query_ids=None, query_categories=None):
+        queries = normalize(queries)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        n_queries = len(queries)
+        if query_ids is not None:
+            query_ids = np.asarray(query_ids, dtype=np.int64)
+        query_cats = None
+        if query_categories is not None:
+            if not self.has_categories:
+                raise ValueError("categories 없이 추가한 인덱스에는 query_categories를 쓸 수 없습니다")
+            # 인덱스에 없는 카테고리는 -1 (어떤 벡터와도 일치하지 않음)
+            query_cats = np.asarray([self.category_codes.get(c, -1) for c in query_categories], dtype=np.int64)
+
+        coarse = queries @ self.centroids.T
+        probes = np.argpartition(-coarse, nprobe - 1, axis=1)[:, :nprobe]
+
+        best_ids = np.full((n_queries, k), -1, dtype=np.int64)
+        best_scores = np.full((n_queries, k), -np.inf, dtype=np.float32)
+
+        # 리스트 단위로 그 리스트를 탐색하는 질의들을 모아서 한 번에 행렬곱
+        for list_no in np.unique(probes):
+            size = self.list_sizes[list_no]
+            if size == 0:
+                continue
+            q_rows = np.nonzero((probes == list_no).any(axis=1))[0]
+            scores = queries[q_rows] @ self.list_vectors[list_no][:size].T
+            member_ids = self.list_ids[list_no][:size]
+            if query_ids is not None:
+                scores[query_ids[q_rows][:, None] == member_ids[None, :]] = -np.inf
+            if query_cats is not None:
+                scores[query_cats[q_rows][:, None] != self.list_categories[list_no][None, :size]] = -np.inf
+
+            local_ids, local_scores = _block_topk(scores, k, 0)
+            merged_ids, merged_scores = _merge_topk(
+                best_ids[q_rows], best_scores[q_rows], member_ids[local_ids], local_scores, k)
+            best_ids[q_rows], best_scores[q_rows] = merged_ids, merged_scores
+
+        return _sort_topk(best_ids, best_scores, k)
+
+
+def attach_neighbour_columns(df, ids, scores, text_column='generator_context',
+                             label_columns=('re_category1', 're_category2')):
+    """
+    label_test.ipynb의 top{n}_context / top{n}_category 컬럼을 벡터화해서 생성
+
+    top{n}_category 형식: "{라벨1}_{라벨2}_{유사도:.4f}"
+    """
+    df = df.copy()
+    texts = df[text_column].to_numpy()
+    labels = df[list(label_columns)].astype(str).agg('_'.join, axis=1).to_numpy()
+    for n in range(ids.shape[1]):
+        col_ids = ids[:, n]
+        valid = col_ids >= 0
+        context = np.full(len(df), None, dtype=object)
+        category = np.full(len(df), None, dtype=object)
+        context[valid] = texts[col_ids[valid]]
+        category[valid] = [f"{label}_{score:.4f}" for label, score in zip(labels[col_ids[valid]], scores[valid, n])]
+        df[f'top{n + 1}_context'] = context
+        df[f'top{n + 1}_category'] = category
+    return df
@@ -0,0 +1,125 @@
+"""
+감정 라벨 체계 (중분류 → 소분류)
+
+LLM 시스템 프롬프트의 목록, 전처리 단계의 조합 검증, 분류기의 소분류 디코딩이
+모두 이 모듈의 HIERARCHY 하나를 기준으로 합니다.
+
+라벨은 CATEGORY1 / CATEGORY2 순서의 정수 id로 인코딩하며(없는 라벨은 -1),
+유효한 (중분류, 소분류) 조합은 VALID_PAIRS 불리언 행렬로 한 번 계산해 두어
+수백만 건의 검증도 배열 인덱싱 한 번으로 끝납니다.
+
+LLM 프롬프트 모듈은 HIERARCHY만 필요하므로 numpy/pandas는 쓰는 시점에 import 하고,
+VALID_PAIRS도 처음 접근할 때 만듭니다. (프롬프트 모듈 import 시간에서 numpy 로딩이 대부분이었음)
+"""
+
+from functools import cache
+
+HIERARCHY = {
+    '기쁨': ['감동', '고마움', '공감', '기대감', '놀람', '만족감', '반가움', '신뢰감', '신명남', '안정감',
+           '자랑스러움', '자신감', '즐거움', '통쾌함', '편안함'],
+    '두려움': ['걱정', '공포', '놀람', '위축감', '초조함'],
+    '미움(상대방)': ['경멸', '냉담', '반감', '불신감', '비위상함', '시기심', '외면', '치사함'],
+    '분노': ['날카로움', '발열', '불쾌', '사나움', '원망', '타오름'],
+    '사랑': ['귀중함', '너그러움', '다정함', '동정(슬픔)', '두근거림', '매력적', '아른거림', '열정적임', '호감'],
+    '수치심': ['미안함', '부끄러움', '죄책감'],
+    '슬픔': ['고통', '그리움', '동정(슬픔)', '무기력', '수치심', '실망', '아픔', '억울함', '외로움', '절망',
+           '허망', '후회'],
+    '싫어함(상태)': ['난처함', '답답함', '불편함', '서먹함', '싫증', '심심함'],
+    '욕망': ['갈등', '궁금함', '기대감', '불만', '아쉬움', '욕심'],
+    '중립': ['감동', '걱정', '고마움', '고통', '공감', '공포', '궁금함', '귀중함', '그리움', '난처함', '냉담',
+           '놀람', '다정함', '답답함', '동정(슬픔)', '만족감', '무기력', '미안함', '반가움', '불신감', '불쾌',
+           '서먹함', '신뢰감', '안정감', '열정적임', '외로움', '위축감', '자랑스러움', '절망', '통쾌함',
+           '편안함', '호감', '후회'],
+}
+
+CATEGORY1 = tuple(HIERARCHY)
+CATEGORY2 = tuple(sorted({child for children in HIERARCHY.values() for child in children}))
+
+CATEGORY1_ID = {label: i for i, label in enumerate(CATEGORY1)}
+CATEGORY2_ID = {label: i for i, label in enumerate(CATEGORY2)}
+
+
+@cache
+def _valid_pairs():
+    import numpy as np
+    # 마지막 행/열은 없는 라벨(-1) 자리로 항상 False
+    valid = np.zeros((len(CATEGORY1) + 1, len(CATEGORY2) + 1), dtype=bool)
+    for parent, children in HIERARCHY.items():
+        valid[CATEGORY1_ID[parent], [CATEGORY2_ID[c] for c in children]] = True
+    valid.setflags(write=False)
+    return valid
+
+
+def __getattr__(name):
+    # taxonomy.VALID_PAIRS / from taxonomy import VALID_PAIRS 는 처음 접근할 때 계산
+    if name == 'VALID_PAIRS':
+        return _valid_pairs()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _encode(labels, categories):
+    import numpy as np
+    import pandas as pd
+    # 체계에 없는 라벨/None은 -1 (Categorical은 범주 밖 값을 곧 허용하지 않을 예정이라 get_indexer 사용)
+    return pd.Index(categories).get_indexer(np.asarray(labels, dtype=object)).astype(np.int64)
+
+
+def encode_category1(labels):
+    """중분류 라벨 배열 → int id 배열 (없는 라벨은 -1)"""
+    return _encode(labels, CATEGORY1)
+
+
+def encode_category2(labels):
+    """소분류 라벨 배열 → int id 배열 (없는 라벨은 -1)"""
+    return _encode(labels, CATEGORY2)
+
+
+def decode_category1(ids):
+    import numpy as np
+    return np.asarray(CATEGORY1 + (None,), dtype=object)[np.asarray(ids)]
+
+
+def decode_category2(ids):
+    import numpy as np
+    return np.asarray(CATEGORY2 + (None,), dtype=object)[np.asarray(ids)]
+
+
+def is_valid_pair(category1, category2):
+    """(중분류, 소분류) 조합이 체계에 있는지 여부 (불리언 배열)"""
+    return _valid_pairs()[encode_category1(category1), encode_category2(category2)]
+
+
+def filter_valid(df, category1_column='category1', category2_column='category2'):
+    """체계에 없는 조합(예: 소분류 '중립')을 가진 행 제거"""
+    return df[is_valid_pair(df[category1_column], df[category2_column])]
+
+
+def children_mask(category1, category2_classes=CATEGORY2):
+    """
+    각 행의 중분류에 속하는 소분류만 True인 (n, len(category2_classes)) 마스크
+
+    category2_classes는 분류기의 클래스 순서(예: LabelEncoder.classes_)를 따릅니다.
+    """
+    class_ids = encode_category2(category2_classes)
+    return _valid_pairs()[encode_category1(category1)[:, None], class_ids[None, :]]
+
+
+def masked_category2_argmax(category2_proba, category1, category2_classes):
+    """
+    예측된 중분류의 자식 소분류 중 확률이 가장 높은 클래스 인덱스
+
+    허용된 클래스가 하나도 없는 행(체계 밖 중분류 등)은 마스크 없이 argmax 합니다.
+    """
+    import numpy as np
+
+    mask = children_mask(category1, category2_classes)
+    masked = np.where(mask, category2_proba, -np.inf)
+    idx = masked.argmax(axis=1)
+    no_child = ~mask.any(axis=1)
+    idx[no_child] = np.asarray(category2_proba)[no_child].argmax(axis=1)
+    return idx
+
+
+def render_category_list():
+    """시스템 프롬프트용 '- 중분류 : 소분류, ...' 목록"""
+    return '\n'.join(f"- {parent} : {', '.join(children)}" for parent, children in HIERARCHY.items())
@@ -0,0 +1,6 @@
+"""emotion 모듈은 패키지가 아니라 스크립트 디렉토리이므로 테스트에서 바로 import 할 수 있게 경로 추가"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+import langchain_openai_augmentation
+import llm_metrics
+from dedup import DedupContextGenerator
+from langchain_openai_augmentation import ContextGenerator
+from llm_metrics import LLMMetrics
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class FakeLLM:
+    """정해진 순서대로 오류를 내거나 응답하는 ChatOpenAI 대역"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(content=outcome, usage_metadata={'input_tokens': 10, 'output_tokens': 5})
+
+
+class FakeEmbedder:
+    """'중복'으로 시작하는 문장은 참고 context와 같은 벡터"""
+
+    def encode(self, texts, normalize_embeddings=True):
+        vectors = []
+        for text in texts:
+            vector = np.zeros(8, dtype=np.float32)
+            vector[0 if text.startswith(('참고', '중복')) else 1 + hash(text) % 7] = 1.0
+            vectors.append(vector)
+        return np.array(vectors)
+
+
+def test_before_call_runs_before_every_attempt(monkeypatch):
+    monkeypatch.setattr(llm_metrics, '_backoff', lambda attempt: 0)
+    llm = FakeLLM([RateLimitError(), RateLimitError(), '결과'])
+    waits = []
+
+    async def before_call():
+        waits.append(llm.calls)
+
+    response = asyncio.run(llm_metrics.ainvoke_with_metrics(
+        llm, [], 'create_context', 'gpt-4.1-mini', max_retries=2, metrics=LLMMetrics(), before_call=before_call))
+
+    assert response.content == '결과'
+    assert waits == [0, 1, 2]
+
+
+def test_regenerations_and_retries_each_take_a_limiter_slot(monkeypatch):
+    monkeypatch.setattr(llm_metrics, '_backoff', lambda attempt: 0)
+    llm = FakeLLM(['중복1', RateLimitError(), '중복2', '새 문장'])
+    monkeypatch.setattr(langchain_openai_augmentation, 'get_chat_model', lambda **config: llm)
+    # 메시지 형식은 이 테스트와 무관 (langchain 메시지 객체 대신 문자열 쌍)
+    monkeypatch.setattr(langchain_openai_augmentation, 'build_messages', lambda system, user: [system, user])
+    slots = []
+
+    async def wait():
+        slots.append(llm.calls)
+
+    generator = DedupContextGenerator(
+        ContextGenerator(model='gpt-4.1-mini', before_call=wait), FakeEmbedder(), threshold=0.9, max_retries=3)
+
+    result = asyncio.run(generator.acreate_context('참고 문장', '기쁨', '감동'))
+
+    assert result == '새 문장'
+    # 중복 재생성 2번 + rate limit 재시도 1번 → 실제 호출 4번 모두 리미터를 거침
+    assert llm.calls == 4
+    assert slots == [0, 1, 2, 3]
+    assert generator.stats == {'accepted': 1, 'regenerated': 2, 'rejected': 0}
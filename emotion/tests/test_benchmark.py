@@ -0,0 +1,33 @@
+import numpy as np
+
+import benchmark
+from benchmark import RssSampler
+
+
+def test_rss_sampler_sees_native_allocations():
+    # numpy 버퍼는 파이썬 힙 밖(네이티브)에 잡히므로 tracemalloc이 아닌 RSS로만 보임
+    with RssSampler(interval=0.001) as sampler:
+        buffer = np.ones(64 * 1024 ** 2 // 8)
+    del buffer
+
+    assert sampler.peak_mb >= 50
+
+
+def test_run_fold_measures_memory_in_the_timed_run(monkeypatch):
+    rng = np.random.default_rng(0)
+    labels = np.repeat([0, 1], 50)
+    embeddings = rng.normal(size=(100, 8)) + labels[:, None]
+    benchmark._init_worker(None, embeddings, labels)
+
+    calls = []
+    fit_predict = benchmark._fit_predict
+    monkeypatch.setattr(benchmark, '_fit_predict', lambda *args: calls.append(args) or fit_predict(*args))
+    train_idx, test_idx = np.arange(0, 100, 2), np.arange(1, 100, 2)
+
+    measured = benchmark.run_fold(('embedding', 'lr', 0, train_idx, test_idx, True))
+    skipped = benchmark.run_fold(('embedding', 'lr', 0, train_idx, test_idx, False))
+
+    # fold당 학습은 한 번뿐
+    assert len(calls) == 2
+    assert measured['peak_rss_mb'] >= 0 and measured['accuracy'] > 0.9
+    assert np.isnan(skipped['peak_rss_mb'])
@@ -0,0 +1,111 @@
+import json
+
+import numpy as np
+import pytest
+
+from embedding import Embedder, EmbeddingCache, text_key
+
+
+def _vectors(n, dim=16, seed=0):
+    return np.random.default_rng(seed).normal(size=(n, dim)).astype(np.float32)
+
+
+def test_put_get_round_trip_across_reopen(tmp_path):
+    vectors = _vectors(10)
+    keys = [text_key(f'문장{i}') for i in range(10)]
+    cache = EmbeddingCache(str(tmp_path), flush_size=4, model_name='m', backend='torch')
+
+    cache.put(keys[:6], vectors[:6])
+    cache.put(keys[6:], vectors[6:])
+    # 버퍼에 남은 벡터도 바로 조회됨
+    np.testing.assert_array_equal(cache.get(keys[::-1]), vectors[::-1])
+    cache.flush()
+
+    reopened = EmbeddingCache(str(tmp_path), model_name='m', backend='torch')
+    assert len(reopened) == 10
+    np.testing.assert_array_equal(reopened.get(keys), vectors)
+
+
+def test_existing_keys_are_not_rewritten(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put(['a'], _vectors(1, seed=1))
+    cache.put(['a'], _vectors(1, seed=2))
+    cache.flush()
+
+    np.testing.assert_array_equal(EmbeddingCache(str(tmp_path)).get(['a']), _vectors(1, seed=1))
+
+
+def test_int8_cache(tmp_path):
+    vectors = _vectors(20)
+    cache = EmbeddingCache(str(tmp_path), dtype='int8')
+    cache.put([str(i) for i in range(20)], vectors)
+    cache.flush()
+
+    restored = EmbeddingCache(str(tmp_path), dtype=None).get([str(i) for i in range(20)])
+
+    assert np.abs(restored - vectors).max() <= np.abs(vectors).max() / 127
+    with pytest.raises(ValueError, match='dtype'):
+        EmbeddingCache(str(tmp_path), dtype='float32')
+
+
+@pytest.mark.parametrize('model_name, backend', [('other', 'torch'), ('m', 'onnx-int8')])
+def test_other_model_or_backend_is_rejected(tmp_path, model_name, backend):
+    cache = EmbeddingCache(str(tmp_path), model_name='m', backend='torch')
+    cache.put(['a'], _vectors(1))
+    cache.flush()
+
+    with pytest.raises(ValueError):
+        EmbeddingCache(str(tmp_path), model_name=model_name, backend=backend)
+    # 모델을 지정하지 않으면 (quantization.load_vectors 등) 기록된 값을 따름
+    assert EmbeddingCache(str(tmp_path)).model_name == 'm'
+
+
+def test_flush_writes_only_the_new_shard_keys(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), flush_size=100)
+    for i in range(5):
+        cache.put([f'{i}-{j}' for j in range(100)], _vectors(100, seed=i))
+
+    with open(tmp_path / 'index.json', encoding='utf-8') as f:
+        meta = json.load(f)
+    assert 'keys' not in meta
+    assert len(meta['shards']) == 5
+    assert (tmp_path / 'shard_00004.keys').read_text().split() == [f'4-{j}' for j in range(100)]
+
+
+def test_interrupted_flush_is_ignored(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    cache.put(['a'], _vectors(1))
+    cache.flush()
+    # index.json에 등록하기 전에 멈춘 샤드
+    np.save(tmp_path / 'shard_00001.npy', _vectors(1, seed=5))
+
+    reopened = EmbeddingCache(str(tmp_path))
+    reopened.put(['b'], _vectors(1, seed=6))
+    reopened.flush()
+
+    assert sorted(EmbeddingCache(str(tmp_path)).keys) == ['a', 'b']
+    np.testing.assert_array_equal(EmbeddingCache(str(tmp_path)).get(['b']), _vectors(1, seed=6))
+
+
+def test_legacy_index_is_migrated(tmp_path):
+    vectors = _vectors(3)
+    np.save(tmp_path / 'shard_00000.npy', vectors)
+    with open(tmp_path / 'index.json', 'w', encoding='utf-8') as f:
+        json.dump({'dim': 16, 'dtype': 'float32', 'shards': ['shard_00000.npy'],
+                   'keys': {'c': [0, 2], 'a': [0, 0], 'b': [0, 1]}}, f)
+
+    cache = EmbeddingCache(str(tmp_path), model_name='m', backend='torch')
+
+    np.testing.assert_array_equal(cache.get(['a', 'b', 'c']), vectors)
+    with open(tmp_path / 'index.json', encoding='utf-8') as f:
+        meta = json.load(f)
+    assert 'keys' not in meta and meta['model_name'] == 'm' and meta['backend'] == 'torch'
+
+
+def test_embedder_cache_records_model_and_backend(tmp_path):
+    Embedder('model-a', cache_dir=str(tmp_path))
+
+    with pytest.raises(ValueError):
+        Embedder('model-b', cache_dir=str(tmp_path))
+    with pytest.raises(ValueError):
+        Embedder('model-a', cache_dir=str(tmp_path), backend='onnx', onnx_dir='unused')
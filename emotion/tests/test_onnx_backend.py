@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from onnx_backend import CONFIG, FP32_FILE, INT8_FILE, exported_backends, read_config
+
+
+def _export_dir(tmp_path, quantized=True):
+    (tmp_path / FP32_FILE).write_bytes(b'')
+    if quantized:
+        (tmp_path / INT8_FILE).write_bytes(b'')
+    (tmp_path / CONFIG).write_text(json.dumps({'model_name': 'some/model', 'pooling': 'cls',
+                                               'max_seq_length': 512, 'dim': 8}), encoding='utf-8')
+    return str(tmp_path)
+
+
+def test_read_config(tmp_path):
+    assert read_config(_export_dir(tmp_path))['model_name'] == 'some/model'
+
+
+@pytest.mark.parametrize('onnx_dir', [None, ''])
+def test_read_config_without_dir(onnx_dir):
+    with pytest.raises(ValueError, match='onnx_dir'):
+        read_config(onnx_dir)
+
+
+def test_read_config_not_an_export(tmp_path):
+    with pytest.raises(ValueError, match=CONFIG):
+        read_config(str(tmp_path))
+
+
+def test_exported_backends(tmp_path):
+    quantized, plain = tmp_path / 'quantized', tmp_path / 'plain'
+    quantized.mkdir()
+    plain.mkdir()
+
+    assert exported_backends(_export_dir(quantized)) == ['onnx', 'onnx-int8']
+    # export --no-quantize 결과에는 int8 그래프가 없음
+    assert exported_backends(_export_dir(plain, quantized=False)) == ['onnx']
@@ -0,0 +1,119 @@
+import ast
+import os
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from preprocessing import majority_vote, preprocess_parquet, preprocess_table
+from taxonomy import HIERARCHY
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', '0000.parquet')
+
+
+def _notebook(df, min_count=3):
+    """250905_data_prepro.ipynb의 literal_eval + Counter 처리 (조합 제거 전)"""
+    def majority_value(values):
+        value, count = Counter(values).most_common(1)[0]
+        return value if count >= min_count else None
+
+    rows = []
+    for index, (context, annotation) in enumerate(zip(df['context'], df['annotation'])):
+        pairs = [dic['emotion'].split('_') for dic in ast.literal_eval(annotation)]
+        category1 = majority_value([p[0] for p in pairs])
+        category2 = majority_value([p[1] for p in pairs])
+        if category1 is not None and category2 is not None:
+            rows.append((index, context, category1, category2))
+    return pd.DataFrame(rows, columns=['index', 'context', 'category1', 'category2'])
+
+
+def _annotation(emotions):
+    return str([{'annotator_id': i, 'emotion': emotion} for i, emotion in enumerate(emotions)])
+
+
+def _table(annotations):
+    return pa.table({
+        'context': [f'문장{i}' for i in range(len(annotations))],
+        'annotation': [_annotation(emotions) for emotions in annotations],
+    })
+
+
+def _assert_same(result, expected):
+    result = result[['index', 'context', 'category1', 'category2']].astype(
+        {'index': 'int64', 'category1': object, 'category2': object}).reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected.astype({'index': 'int64'}), check_dtype=False)
+
+
+@pytest.mark.skipif(not os.path.exists(DATA), reason="data/0000.parquet 없음")
+def test_matches_notebook_on_sample_data():
+    df = pd.read_parquet(DATA)
+    expected = _notebook(df)
+
+    # 배치 경계가 있어도 파일 내 행 번호(index)가 이어져야 함
+    result = preprocess_parquet(DATA, batch_size=97, remove_invalid=False)
+
+    assert len(expected) > 0
+    _assert_same(result, expected)
+
+
+def test_matches_notebook_on_random_annotations():
+    rng = np.random.default_rng(0)
+    pairs = [(parent, child) for parent, children in HIERARCHY.items() for child in children[:3]]
+    annotations = []
+    for _ in range(500):
+        # 라벨 종류를 적게 골라 다수결이 나오는 행과 안 나오는 행이 섞이게 함
+        choices = rng.choice(len(pairs), size=3)
+        annotations.append([
+            '_'.join(pairs[i]) for i in rng.choice(choices, size=rng.integers(1, 7))])
+    table = _table(annotations)
+
+    result = preprocess_table(table, remove_invalid=False)
+
+    _assert_same(result, _notebook(table.to_pandas()))
+
+
+def test_tie_keeps_first_seen_value_like_counter():
+    # 중분류는 슬픔 3표/기쁨 3표 동률 → Counter.most_common 처럼 먼저 나온 슬픔
+    table = _table([['슬픔_고통', '기쁨_고통', '기쁨_고통', '슬픔_고통', '기쁨_고통', '슬픔_고통']])
+
+    result = preprocess_table(table, remove_invalid=False)
+
+    assert result['category1'].tolist() == ['슬픔']
+    assert result['category2'].tolist() == ['고통']
+
+
+def test_majority_vote_min_count():
+    row = np.array([0, 0, 0, 1, 1, 2])
+    labels = pa.array(['a', 'a', 'b', 'c', 'c', 'd'])
+
+    values, counts = majority_vote(row, labels, 4, min_count=2)
+
+    assert values.tolist() == ['a', 'c', None, None]
+    assert counts.tolist() == [2, 2, 1, 0]
+
+
+def test_removes_pairs_outside_hierarchy_and_malformed_values():
+    table = _table([
+        ['기쁨_감동'] * 3,
+        ['분노_감동'] * 3,           # 체계에 없는 조합 (노트북의 제거 목록에도 있음)
+        ['기쁨', '기쁨', '기쁨'],     # '중분류_소분류' 형식이 아님
+    ])
+
+    result = preprocess_table(table, include_annotations=True)
+
+    assert result['index'].tolist() == [0]
+    assert list(result['annotation'][0]) == ['기쁨_감동'] * 3
+    assert preprocess_table(table, remove_invalid=False)['index'].tolist() == [0, 1]
+
+
+def test_empty_parquet(tmp_path):
+    path = tmp_path / 'empty.parquet'
+    pq.write_table(_table([]).cast(pa.schema([('context', pa.string()), ('annotation', pa.string())])), path)
+
+    result = preprocess_parquet(path)
+
+    assert len(result) == 0
+    assert list(result.columns) == ['index', 'context', 'category1', 'category2']
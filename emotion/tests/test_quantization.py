@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from quantization import QuantizedIndex, dequantize_int8, quantize_int8, recall_at_k
+from similarity import normalize, topk_search
+
+
+@pytest.fixture(scope='module')
+def vectors():
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(50, 64))
+    return normalize(centers[rng.integers(0, 50, 4000)] + rng.normal(size=(4000, 64)) * 0.6)
+
+
+@pytest.fixture(scope='module')
+def truth(vectors):
+    return topk_search(vectors[:200], vectors, 10)
+
+
+def test_int8_round_trip_error_is_bounded(vectors):
+    codes, scales = quantize_int8(vectors)
+
+    restored = dequantize_int8(codes, scales)
+
+    assert codes.dtype == np.int8 and scales.dtype == np.float32
+    # 반올림 오차는 벡터별 스케일의 절반 이하
+    assert (np.abs(restored - vectors) <= scales[:, None] / 2 + 1e-7).all()
+
+
+def test_zero_vector_does_not_divide_by_zero():
+    codes, scales = quantize_int8(np.zeros((1, 8)))
+
+    assert (codes == 0).all() and scales.tolist() == [1.0]
+
+
+@pytest.mark.parametrize('dtype, rerank, min_recall', [
+    ('float32', None, 1.0),
+    ('float16', None, 0.99),
+    ('int8', 0, 0.95),
+    # 역양자화 벡터로 재정렬하면 질의 양자화 오차만 줄어듦 (원본 재정렬은 아래 memmap 테스트)
+    ('int8', 40, 0.95),
+])
+def test_recall_against_float32(vectors, truth, dtype, rerank, min_recall):
+    index = QuantizedIndex(vectors, dtype, block_size=1000)
+
+    ids, scores = index.search(vectors[:200], 10, rerank=rerank)
+
+    assert recall_at_k(ids, truth[0]) >= min_recall
+    assert (np.diff(scores, axis=1) <= 1e-6).all()
+
+
+def test_int8_scores_approximate_cosine(vectors, truth):
+    index = QuantizedIndex(vectors, 'int8')
+
+    ids, scores = index.search(vectors[:200], 10, rerank=0)
+
+    # 자기 자신은 1.0 근처, 상위 점수는 float32 코사인과 거의 같음
+    np.testing.assert_allclose(scores[:, 0], 1.0, atol=0.02)
+    np.testing.assert_allclose(scores, truth[1], atol=0.02)
+
+
+def test_rerank_with_float32_memmap(tmp_path, vectors, truth):
+    path = tmp_path / 'vectors.npy'
+    np.save(path, vectors)
+    index = QuantizedIndex(vectors, 'int8', rerank_vectors=np.load(path, mmap_mode='r'))
+
+    ids, scores = index.search(vectors[:200], 10)
+
+    assert recall_at_k(ids, truth[0]) >= 0.99
+    np.testing.assert_allclose(scores, truth[1], rtol=1e-5, atol=1e-5)
+
+
+def test_memory_footprint(vectors):
+    assert QuantizedIndex(vectors, 'float16').nbytes == vectors.nbytes // 2
+    assert QuantizedIndex(vectors, 'int8').nbytes < vectors.nbytes // 3
+
+
+def test_k_larger_than_index():
+    vectors = normalize(np.random.default_rng(1).normal(size=(5, 16)))
+
+    ids, _ = QuantizedIndex(vectors, 'int8').search(vectors[:2], 10)
+
+    assert ids.shape == (2, 5)
+    assert sorted(ids[0].tolist()) == list(range(5))
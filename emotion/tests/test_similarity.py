@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from similarity import ExactIndex, IVFIndex, all_pairs_topk, normalize, topk_search
+
+
+def _clustered(n=3000, dim=32, n_clusters=30, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    labels = rng.integers(0, n_clusters, n)
+    return normalize(centers[labels] + rng.normal(size=(n, dim)) * 0.5), labels
+
+
+def _brute_force(queries, corpus, k):
+    scores = normalize(queries) @ normalize(corpus).T
+    return np.argsort(-scores, axis=1, kind='stable')[:, :k], -np.sort(-scores, axis=1)[:, :k]
+
+
+def _recall(found, truth):
+    return np.mean([len(np.intersect1d(f, t)) / truth.shape[1] for f, t in zip(found, truth)])
+
+
+def test_topk_matches_brute_force_across_blocks():
+    vectors, _ = _clustered(n=1000)
+    queries = vectors[:130]
+    expected_ids, expected_scores = _brute_force(queries, vectors, 5)
+
+    # 블록 경계가 질의/대상 수와 맞지 않아도 결과가 같아야 함
+    ids, scores = topk_search(queries, vectors, 5, query_block=64, corpus_block=300)
+
+    np.testing.assert_allclose(scores, expected_scores, rtol=1e-5, atol=1e-6)
+    assert _recall(ids, expected_ids) == 1.0
+
+
+def test_topk_thread_pool_gives_same_result():
+    vectors, _ = _clustered(n=800)
+    serial = topk_search(vectors[:200], vectors, 4, query_block=50)
+    parallel = topk_search(vectors[:200], vectors, 4, query_block=50, n_jobs=4)
+
+    np.testing.assert_array_equal(serial[0], parallel[0])
+    np.testing.assert_array_equal(serial[1], parallel[1])
+
+
+def test_all_pairs_excludes_self_and_respects_categories():
+    vectors, _ = _clustered(n=500)
+    categories = np.array(['a', 'b'])[np.arange(500) % 2]
+
+    ids, scores = all_pairs_topk(vectors, k=3, categories=categories)
+
+    assert not (ids == np.arange(500)[:, None]).any()
+    assert (categories[ids] == categories[:, None]).all()
+    assert (np.diff(scores, axis=1) <= 0).all()
+
+
+def test_fewer_neighbours_than_k_are_padded():
+    vectors = normalize(np.eye(3, dtype=np.float32))
+    ids, scores = topk_search(vectors, vectors, 5, query_ids=np.arange(3))
+
+    assert (ids[:, 2:] == -1).all()
+    assert np.isneginf(scores[:, 2:]).all()
+
+
+def test_exact_index_add_in_parts():
+    vectors, _ = _clustered(n=600)
+    index = ExactIndex(vectors[:250])
+    index.add(vectors[250:])
+
+    ids, _ = index.search(vectors[:20], 5)
+    expected, _ = _brute_force(vectors[:20], vectors, 5)
+    assert len(index) == 600
+    assert _recall(ids, expected) == 1.0
+
+
+def test_ivf_recall():
+    vectors, _ = _clustered(n=5000, dim=48, n_clusters=40)
+    queries = vectors[:300]
+    expected, _ = _brute_force(queries, vectors, 10)
+
+    index = IVFIndex(nlist=40, nprobe=8)
+    index.add(vectors)
+    ids, _ = index.search(queries, 10)
+
+    assert _recall(ids, expected) >= 0.95
+    # 모든 리스트를 보면 정확 검색과 같음
+    ids, _ = index.search(queries, 10, nprobe=40)
+    assert _recall(ids, expected) == 1.0
+
+
+def test_ivf_incremental_add_matches_single_add():
+    vectors, labels = _clustered(n=2000)
+    categories = labels % 3
+
+    whole = IVFIndex(nlist=16, nprobe=16)
+    whole.train(vectors)
+    whole.add(vectors, categories)
+    parts = IVFIndex(nlist=16, nprobe=16)
+    parts.train(vectors)
+    for start in range(0, 2000, 300):
+        parts.add(vectors[start:start + 300], categories[start:start + 300])
+
+    assert len(parts) == len(whole) == 2000
+    args = dict(k=5, query_ids=np.arange(100), query_categories=categories[:100])
+    np.testing.assert_array_equal(parts.search(vectors[:100], **args)[0], whole.search(vectors[:100], **args)[0])
+    ids, _ = parts.search(vectors[:100], **args)
+    assert (categories[ids] == categories[:100, None]).all()
+
+
+def test_ivf_category_filter_requires_categories():
+    vectors, _ = _clustered(n=200)
+    index = IVFIndex(nlist=4)
+    index.add(vectors)
+
+    with pytest.raises(ValueError):
+        index.search(vectors[:2], 3, query_categories=['a', 'b'])
+    with pytest.raises(ValueError):
+        index.add(vectors[:2], categories=['a', 'b'])
@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from taxonomy import (
+    CATEGORY1, CATEGORY2, HIERARCHY, VALID_PAIRS, children_mask, decode_category1, decode_category2,
+    encode_category1, encode_category2, filter_valid, is_valid_pair, masked_category2_argmax,
+    render_category_list,
+)
+
+EMOTION_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_valid_pairs_matches_hierarchy():
+    expected = {(parent, child) for parent, children in HIERARCHY.items() for child in children}
+
+    found = {
+        (CATEGORY1[i], CATEGORY2[j])
+        for i, j in zip(*np.nonzero(VALID_PAIRS[:-1, :-1]))
+    }
+
+    assert found == expected
+    assert VALID_PAIRS.shape == (len(CATEGORY1) + 1, len(CATEGORY2) + 1)
+
+
+def test_unknown_label_row_and_column_are_false():
+    assert not VALID_PAIRS[-1].any()
+    assert not VALID_PAIRS[:, -1].any()
+    assert not is_valid_pair(['없는라벨', '기쁨'], ['감동', '없는라벨']).any()
+
+
+def test_valid_pairs_is_read_only():
+    with pytest.raises(ValueError):
+        VALID_PAIRS[0, 0] = True
+
+
+def test_shared_children_belong_to_each_parent():
+    # '놀람', '기대감'처럼 여러 중분류에 속하는 소분류
+    assert is_valid_pair(['기쁨', '두려움', '중립', '분노'], ['놀람'] * 4).tolist() == [True, True, True, False]
+    assert is_valid_pair(['기쁨', '욕망'], ['기대감', '기대감']).all()
+
+
+def test_encode_decode_round_trip():
+    labels = ['슬픔', '없는라벨', '기쁨', None]
+    ids = encode_category1(labels)
+
+    assert ids.tolist() == [CATEGORY1.index('슬픔'), -1, CATEGORY1.index('기쁨'), -1]
+    assert decode_category1(ids).tolist() == ['슬픔', None, '기쁨', None]
+    assert decode_category2(encode_category2(['후회', '?'])).tolist() == ['후회', None]
+
+
+def test_filter_valid():
+    df = pd.DataFrame({'category1': ['기쁨', '분노', '중립'], 'category2': ['감동', '감동', '중립']})
+
+    assert filter_valid(df).index.tolist() == [0]
+
+
+def test_masked_argmax_picks_best_child_of_parent():
+    classes = np.array(['감동', '공포', '후회'])
+    proba = np.array([
+        [0.1, 0.7, 0.2],    # 기쁨 → 자식 중 감동만 허용
+        [0.1, 0.7, 0.2],    # 슬픔 → 후회
+        [0.1, 0.7, 0.2],    # 체계 밖 중분류 → 마스크 없이 argmax
+    ])
+
+    idx = masked_category2_argmax(proba, ['기쁨', '슬픔', '없는라벨'], classes)
+
+    assert idx.tolist() == [0, 2, 1]
+    assert children_mask(['두려움'], classes).tolist() == [[False, True, False]]
+
+
+def test_render_category_list_has_every_parent():
+    lines = render_category_list().splitlines()
+
+    assert len(lines) == len(HIERARCHY)
+    assert lines[0] == f"- 기쁨 : {', '.join(HIERARCHY['기쁨'])}"
+
+
+def test_prompt_modules_do_not_import_numpy():
+    # 프롬프트 모듈은 HIERARCHY만 쓰므로 taxonomy import만으로 numpy를 읽지 않음
+    code = "import sys, langchain_openai_augmentation, langchain_openai_retest; print('numpy' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code], cwd=EMOTION_DIR, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == 'False'
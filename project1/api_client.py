@@ -5,64 +5,162 @@ FastAPI 엔드포인트를 통해 레시피 데이터를 조회하는 클라이
 
 사용법:
     python api_client.py
+    python api_client.py --bench --requests 2000 --concurrency 50
 
 기능:
     1. 모든 레시피 목록 조회
     2. 특정 레시피 상세 조회
     3. 레시피 검색 및 필터링
+    4. 여러 레시피 동시 조회 (get_many) / 일괄 조회 (get_recipes_batch)
+    5. 요청/초 벤치마크 (요청마다 세션 생성 vs 재사용 세션 vs /recipes/batch)
+
+RecipeAPIClient는 하나의 aiohttp 세션(keep-alive, 연결 수 제한, DNS 캐시)을 재사용합니다.
+async with RecipeAPIClient() as client: 형태로 쓰거나 끝나면 await client.close()를 호출하세요.
 """
 
+import argparse
 import asyncio
+import random
+import time
 import aiohttp
 import json
 from typing import List, Dict, Optional
 import pandas as pd
 
 BASE_URL = "http://localhost:8000"
+# 목록은 기본으로 요약 컬럼만 주므로 본문(rcp_parts_dtls 등)까지 필요하면 fields로 전부 요청
+ALL_FIELDS = [
+    "id", "rcp_seq", "rcp_nm", "rcp_way2", "rcp_pat2", "info_eng", "info_car", "info_pro", "info_fat", "info_na",
+    "rcp_parts_dtls", "recipe_steps", "rcp_na_tip", "hash_tag",
+]
+RETRY_STATUS = {429, 502, 503, 504}
 
 class RecipeAPIClient:
-    def __init__(self, base_url: str = BASE_URL):
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        limit: int = 100,
+        limit_per_host: int = 100,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+        timeout: float = 30,
+        max_retries: int = 3,
+        backoff: float = 0.2,
+        cache: bool = False,
+    ):
         self.base_url = base_url
-
-    async def get_all_recipes(self) -> List[Dict]:
-        """모든 레시피 목록을 가져오기"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{self.base_url}/recipes/") as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    print(f"Error {response.status}: {await response.text()}")
-                    return []
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        # URL → (ETag, 응답 본문), 서버가 ETag를 보내면 If-None-Match로 재검증
+        self.cache = {} if cache else None
+        self._session = None
+
+    async def __aenter__(self):
+        self._get_session()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def _get_json(self, path: str, params: Optional[Dict] = None):
+        """GET 요청 (연결 오류/429/5xx는 지수 백오프로 재시도), 200이 아니면 None"""
+        url = f"{self.base_url}{path}"
+        cache_key = url if not params else f"{url}?{sorted(params.items())}"
+        headers = {}
+        cached = self.cache.get(cache_key) if self.cache is not None else None
+        if cached:
+            headers["If-None-Match"] = cached[0]
+
+        session = self._get_session()
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with session.get(url, params=params, headers=headers) as response:
+                    if response.status == 304 and cached:
+                        return cached[1]
+                    if response.status == 200:
+                        data = await response.json()
+                        etag = response.headers.get("ETag")
+                        if self.cache is not None and etag:
+                            self.cache[cache_key] = (etag, data)
+                        return data
+                    if response.status not in RETRY_STATUS or attempt == self.max_retries:
+                        print(f"Error {response.status}: {await response.text()}")
+                        return None
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+            await asyncio.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+        return None
+
+    async def get_all_recipes(self, fields: Optional[List[str]] = None) -> List[Dict]:
+        """모든 레시피 목록을 가져오기 (fields를 주면 그 컬럼만)"""
+        params = {"fields": ",".join(fields)} if fields else None
+        return await self._get_json("/recipes/", params) or []
 
     async def get_recipe_by_id(self, recipe_id: int) -> Optional[Dict]:
         """특정 ID의 레시피 상세 정보 가져오기"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"{self.base_url}/recipes/{recipe_id}") as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    print(f"Error {response.status}: {await response.text()}")
-                    return None
+        return await self._get_json(f"/recipes/{recipe_id}")
 
-    async def search_recipes_by_name(self, keyword: str) -> List[Dict]:
-        """레시피 이름으로 검색"""
-        all_recipes = await self.get_all_recipes()
+    async def get_many(self, ids: List[int], concurrency: int = 10) -> List[Optional[Dict]]:
+        """여러 ID를 동시에 concurrency개까지 조회 (ids 순서대로, 없는 ID는 None)"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(recipe_id):
+            async with semaphore:
+                return await self.get_recipe_by_id(recipe_id)
+
+        return await asyncio.gather(*(fetch(recipe_id) for recipe_id in ids))
+
+    async def get_recipes_batch(self, ids: List[int], chunk_size: int = 1000) -> List[Dict]:
+        """GET /recipes/batch 로 chunk_size개씩 일괄 조회 (없는 ID는 제외)"""
+        results = []
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            results.extend(await self._get_json("/recipes/batch", {"ids": ",".join(map(str, chunk))}) or [])
+        return results
+
+    async def search_recipes_by_name(self, keyword: str, recipes: Optional[List[Dict]] = None) -> List[Dict]:
+        """레시피 이름으로 검색 (recipes를 주면 다시 요청하지 않음)"""
+        all_recipes = recipes if recipes is not None else await self.get_all_recipes()
         return [
             recipe for recipe in all_recipes
             if keyword.lower() in recipe['rcp_nm'].lower()
         ]
 
-    async def filter_recipes_by_method(self, method: str) -> List[Dict]:
+    async def filter_recipes_by_method(self, method: str, recipes: Optional[List[Dict]] = None) -> List[Dict]:
         """요리 방법으로 필터링"""
-        all_recipes = await self.get_all_recipes()
+        all_recipes = recipes if recipes is not None else await self.get_all_recipes()
         return [
             recipe for recipe in all_recipes
             if recipe['rcp_way2'] == method
         ]
 
-    async def filter_recipes_by_category(self, category: str) -> List[Dict]:
+    async def filter_recipes_by_category(self, category: str, recipes: Optional[List[Dict]] = None) -> List[Dict]:
         """요리 종류로 필터링"""
-        all_recipes = await self.get_all_recipes()
+        all_recipes = recipes if recipes is not None else await self.get_all_recipes()
         return [
             recipe for recipe in all_recipes
             if recipe['rcp_pat2'] == category
@@ -71,10 +169,11 @@ class RecipeAPIClient:
     async def get_recipes_by_nutrition_range(
         self,
         min_calories: Optional[float] = None,
-        max_calories: Optional[float] = None
+        max_calories: Optional[float] = None,
+        recipes: Optional[List[Dict]] = None
     ) -> List[Dict]:
         """칼로리 범위로 레시피 필터링"""
-        all_recipes = await self.get_all_recipes()
+        all_recipes = recipes if recipes is not None else await self.get_all_recipes()
         filtered = []
 
         for recipe in all_recipes:
@@ -89,15 +188,13 @@ class RecipeAPIClient:
 
         return filtered
 
-async def demo_queries():
+async def demo_queries(client: RecipeAPIClient):
     """다양한 쿼리 예시 실행"""
-    client = RecipeAPIClient()
-
     print("=" * 60)
     print("레시피 API 클라이언트 데모")
     print("=" * 60)
 
-    # 1. 전체 레시피 수 확인
+    # 1. 전체 레시피 수 확인 (목록은 한 번만 받아서 4~7번 필터에 재사용)
     print("\n1. 전체 레시피 수 확인")
     all_recipes = await client.get_all_recipes()
     print(f"   총 {len(all_recipes)}개의 레시피가 있습니다.")
@@ -121,39 +218,39 @@ async def demo_queries():
 
     # 4. 이름으로 검색
     print("\n4. '찌개' 키워드로 레시피 검색")
-    stew_recipes = await client.search_recipes_by_name("찌개")
+    stew_recipes = await client.search_recipes_by_name("찌개", all_recipes)
     print(f"   '{len(stew_recipes)}개의 찌개 레시피를 찾았습니다:")
     for recipe in stew_recipes[:3]:  # 첫 3개만 표시
         print(f"   - {recipe['rcp_nm']}")
 
     # 5. 요리 방법으로 필터링
     print("\n5. '볶기' 방법으로 요리 필터링")
-    stir_fry_recipes = await client.filter_recipes_by_method("볶기")
+    stir_fry_recipes = await client.filter_recipes_by_method("볶기", all_recipes)
     print(f"   {len(stir_fry_recipes)}개의 볶음 요리를 찾았습니다:")
     for recipe in stir_fry_recipes[:3]:  # 첫 3개만 표시
         print(f"   - {recipe['rcp_nm']}")
 
     # 6. 요리 종류로 필터링
     print("\n6. '반찬' 종류로 필터링")
-    side_dish_recipes = await client.filter_recipes_by_category("반찬")
+    side_dish_recipes = await client.filter_recipes_by_category("반찬", all_recipes)
     print(f"   {len(side_dish_recipes)}개의 반찬 레시피를 찾았습니다:")
     for recipe in side_dish_recipes[:3]:  # 첫 3개만 표시
         print(f"   - {recipe['rcp_nm']}")
 
     # 7. 칼로리 범위로 필터링
     print("\n7. 200-300kcal 범위의 레시피 검색")
-    low_cal_recipes = await client.get_recipes_by_nutrition_range(200, 300)
+    low_cal_recipes = await client.get_recipes_by_nutrition_range(200, 300, all_recipes)
     print(f"   {len(low_cal_recipes)}개의 레시피를 찾았습니다:")
     for recipe in low_cal_recipes[:3]:  # 첫 3개만 표시
         print(f"   - {recipe['rcp_nm']} ({recipe['info_eng']}kcal)")
 
-async def export_to_csv():
-    """API에서 가져온 데이터를 CSV로 내보내기"""
-    client = RecipeAPIClient()
+    return all_recipes
 
+async def export_to_csv(client: RecipeAPIClient):
+    """API에서 본문까지 포함한 전체 레시피를 가져와 CSV로 내보내기"""
     print("\n8. 데이터를 CSV로 내보내기")
-    recipes = await client.get_all_recipes()
 
+    recipes = await client.get_all_recipes(fields=ALL_FIELDS)
     if recipes:
         df = pd.DataFrame(recipes)
         csv_path = "exported_recipes.csv"
@@ -161,21 +258,77 @@ async def export_to_csv():
         print(f"   {len(recipes)}개의 레시피를 '{csv_path}'로 내보냈습니다.")
         print(f"   컬럼: {list(df.columns)}")
 
+async def benchmark(base_url: str = BASE_URL, n_requests: int = 2000, concurrency: int = 50):
+    """
+    같은 id 목록을 세 가지 방식으로 조회해 요청/초 비교
+
+    - per_call_session: 요청마다 ClientSession을 새로 열고 닫음 (이전 클라이언트 방식)
+    - pooled: 하나의 세션 + keep-alive 연결 재사용 (get_many)
+    - batch: GET /recipes/batch 로 1000개씩 일괄 조회 (초당 레시피 수)
+    """
+    async with RecipeAPIClient(base_url, limit=concurrency, limit_per_host=concurrency) as client:
+        all_ids = [recipe['id'] for recipe in await client.get_all_recipes(fields=["id"])]
+    if not all_ids:
+        print("레시피가 없습니다. 먼저 데이터를 넣어주세요.")
+        return {}
+    ids = [all_ids[i % len(all_ids)] for i in range(n_requests)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def per_call_session(recipe_id):
+        async with semaphore:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"{base_url}/recipes/{recipe_id}") as response:
+                    return await response.json()
+
+    results = {}
+
+    start = time.perf_counter()
+    await asyncio.gather(*(per_call_session(recipe_id) for recipe_id in ids))
+    results["per_call_session"] = n_requests / (time.perf_counter() - start)
+
+    async with RecipeAPIClient(base_url, limit=concurrency, limit_per_host=concurrency) as client:
+        await client.get_many(ids[:concurrency], concurrency)  # 연결 미리 열기
+        start = time.perf_counter()
+        await client.get_many(ids, concurrency)
+        results["pooled"] = n_requests / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await client.get_recipes_batch(ids)
+        results["batch"] = n_requests / (time.perf_counter() - start)
+
+    print(f"\n벤치마크: {n_requests}건, 동시 {concurrency}개 ({base_url})")
+    for name, rate in results.items():
+        unit = "레시피/초" if name == "batch" else "요청/초"
+        print(f"   {name:<18} {rate:>10.1f} {unit}")
+    return results
+
 async def main():
     """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="레시피 API 클라이언트")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--bench", action="store_true", help="요청/초 벤치마크 실행")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
     try:
-        # 데모 쿼리 실행
-        await demo_queries()
+        if args.bench:
+            await benchmark(args.base_url, args.requests, args.concurrency)
+            return
+
+        async with RecipeAPIClient(args.base_url) as client:
+            # 데모 쿼리 실행
+            await demo_queries(client)
 
-        # CSV 내보내기
-        await export_to_csv()
+            # CSV 내보내기
+            await export_to_csv(client)
 
         print("\n" + "=" * 60)
         print("모든 쿼리가 완료되었습니다!")
 
     except Exception as e:
         print(f"오류 발생: {e}")
-        print("FastAPI 서버가 실행 중인지 확인해주세요 (http://localhost:8000)")
+        print(f"FastAPI 서버가 실행 중인지 확인해주세요 ({args.base_url})")
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,226 @@
+"""
+대량 생성(bulk) 공통 처리
+
+- 본문: JSON 배열 또는 NDJSON(Content-Type: application/x-ndjson, 한 줄에 객체 하나, 스트리밍으로 읽음)
+- 항목마다 Pydantic 모델로 검증하고 실패한 항목은 index와 함께 error로 보고
+- 검증된 행은 chunk 단위로 하나의 트랜잭션 안에서 INSERT ... RETURNING
+    Postgres : 컬럼별 배열 파라미터 하나씩 INSERT ... SELECT FROM unnest(...)
+               (행 수와 상관없이 파라미터가 컬럼 수만큼이라 SQL 컴파일 비용이 거의 없음)
+    그 외    : multi-row VALUES (SQLite, on_conflict=error만 지원)
+  RETURNING은 행 순서를 보장하지 않으므로 conflict_column이 있으면 그 값으로 결과를 짝짓고,
+  없으면 id를 시퀀스에서 미리 받아 넣음 (Postgres 외에는 행 단위 INSERT)
+- 행 dict에 테이블에 없는 키(recipes 본문 필드 등)가 있어도 테이블 컬럼만 INSERT 하고,
+  after_insert(생성/갱신된 (id, 행) 목록)로 같은 트랜잭션 안에서 나머지를 저장
+- conflict_column(recipes의 rcp_seq)이 있으면 on_conflict로 충돌 처리 선택
+    error  : ON CONFLICT DO NOTHING 후 RETURNING에 없는 행(이미 있는 키)을 항목 오류로 보고
+             (미리 SELECT 하지 않으므로 동시에 같은 키를 넣는 요청이 있어도 트랜잭션 전체가 실패하지 않음)
+    skip   : ON CONFLICT DO NOTHING
+    update : ON CONFLICT DO UPDATE (upsert)
+"""
+
+import json
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import bindparam, cast, func, literal_column, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from .database import database
+
+# VALUES 방식은 바인드 파라미터 한도(32767)를 넘지 않도록 chunk 행 수 결정
+MAX_PARAMS = 30000
+UNNEST_CHUNK_ROWS = 5000
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def _error_message(e):
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+    return str(e)
+
+
+async def iter_items(request, model):
+    """(index, 검증된 dict 또는 None, 오류 메시지 또는 None)을 순서대로 생성"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type in NDJSON_TYPES:
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield _validate_line(model, index, line)
+                    index += 1
+        if buffer.strip():
+            yield _validate_line(model, index, buffer)
+        return
+
+    try:
+        payload = json.loads(await request.body())
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"JSON 파싱 실패: {e}")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="본문은 JSON 배열 또는 NDJSON이어야 합니다")
+    for index, obj in enumerate(payload):
+        try:
+            yield index, model.model_validate(obj).model_dump(), None
+        except ValidationError as e:
+            yield index, None, _error_message(e)
+
+
+def _validate_line(model, index, line):
+    try:
+        return index, model.model_validate_json(line).model_dump(), None
+    except ValidationError as e:
+        return index, None, _error_message(e)
+
+
+def array_param(name, values, column_type):
+    return cast(bindparam(name, value=values, type_=ARRAY(column_type)), ARRAY(column_type))
+
+
+def _unnest_select(table, rows, include_id=False):
+    """행 목록 → SELECT * FROM unnest(:col1, :col2, ...) AS t(col1, col2, ...)"""
+    columns = [c for c in table.columns if include_id or c.name != "id"]
+    arrays = [array_param(f"bulk_{c.name}", [row[c.name] for row in rows], c.type) for c in columns]
+    source = func.unnest(*arrays).table_valued(*[c.name for c in columns]).render_derived()
+    return [c.name for c in columns], select(source)
+
+
+async def _allocate_ids(table, count):
+    """table.id 시퀀스에서 id를 count개 미리 받음 (Postgres)"""
+    sequence = func.pg_get_serial_sequence(table.name, "id")
+    query = select(func.nextval(sequence)).select_from(func.generate_series(1, count))
+    return [record[0] for record in await database.fetch_all(query)]
+
+
+async def _insert_chunk(table, chunk, conflict_column, on_conflict):
+    """chunk: [(index, row)] → [(index, status, id)]"""
+    postgres = database.url.dialect == "postgresql"
+    if not postgres and on_conflict != "error":
+        raise HTTPException(status_code=400, detail=f"on_conflict={on_conflict}는 PostgreSQL에서만 지원합니다")
+
+    names = [c.name for c in table.columns if c.name != "id"]
+    rows = [{name: row[name] for name in names} for _, row in chunk]
+    if conflict_column is None:
+        # RETURNING 순서는 입력 순서와 같다는 보장이 없으므로, id를 미리 받아 행에 넣어서 짝을 맞춤
+        # (Postgres 외에는 행마다 INSERT 해서 각 행의 id를 받음)
+        if postgres:
+            ids = await _allocate_ids(table, len(rows))
+            columns, source = _unnest_select(
+                table, [{**row, "id": row_id} for row, row_id in zip(rows, ids)], include_id=True)
+            await database.execute(pg_insert(table).from_select(columns, source))
+        else:
+            ids = [await database.execute(table.insert().values(**row)) for row in rows]
+        return [(index, "created", row_id) for (index, _), row_id in zip(chunk, ids)]
+
+    if postgres:
+        columns, source = _unnest_select(table, rows)
+        query = pg_insert(table).from_select(columns, source)
+    else:
+        query = sqlite_insert(table).values(rows)
+    if on_conflict == "update":
+        update_columns = {
+            c.name: query.excluded[c.name] for c in table.columns if c.name not in ("id", conflict_column)
+        }
+        query = query.on_conflict_do_update(index_elements=[conflict_column], set_=update_columns)
+    else:
+        query = query.on_conflict_do_nothing(index_elements=[conflict_column])
+
+    # RETURNING 순서와 상관없이 conflict_column 값으로 입력 행과 짝을 맞춤
+    # xmax = 0 이면 새로 삽입된 행, 아니면 ON CONFLICT DO UPDATE로 갱신된 행
+    inserted = literal_column("(xmax = 0)" if postgres else "1").label("inserted")
+    query = query.returning(table.c.id, table.c[conflict_column], inserted)
+    returned = {record[conflict_column]: record for record in await database.fetch_all(query)}
+    results = []
+    for index, row in chunk:
+        record = returned.get(row[conflict_column])
+        if record is None:
+            # 이미 있던 키 (요청 전부터 있었거나 동시에 다른 요청이 먼저 넣음)
+            results.append((index, "error" if on_conflict == "error" else "skipped", None))
+        else:
+            results.append((index, "created" if record["inserted"] else "updated", record["id"]))
+    return results
+
+
+async def upsert_rows(table, rows, key_column):
+    """rows를 key_column 기준으로 덮어쓰기 (Postgres: unnest + ON CONFLICT DO UPDATE, 그 외: DELETE 후 INSERT)"""
+    postgres = database.url.dialect == "postgresql"
+    for start in range(0, len(rows), UNNEST_CHUNK_ROWS):
+        chunk = rows[start:start + UNNEST_CHUNK_ROWS]
+        if postgres:
+            columns, source = _unnest_select(table, chunk)
+            query = pg_insert(table).from_select(columns, source)
+            query = query.on_conflict_do_update(
+                index_elements=[key_column],
+                set_={name: query.excluded[name] for name in columns if name != key_column},
+            )
+            await database.execute(query)
+        else:
+            keys = [row[key_column] for row in chunk]
+            await database.execute(table.delete().where(table.c[key_column].in_(keys)))
+            await database.execute(table.insert().values(chunk))
+
+
+async def bulk_create(
+    request, model, table, conflict_column=None, on_conflict="error", chunk_size=None, after_insert=None,
+):
+    """
+    요청 본문의 항목들을 검증 후 하나의 트랜잭션으로 삽입
+
+    Returns:
+        dict: BulkOut 형식 (created/updated/skipped/failed 건수, 항목별 결과)
+    """
+    if on_conflict not in ("error", "skip", "update"):
+        raise HTTPException(status_code=400, detail=f"알 수 없는 on_conflict: {on_conflict}")
+    if chunk_size is None:
+        if database.url.dialect == "postgresql":
+            chunk_size = UNNEST_CHUNK_ROWS
+        else:
+            chunk_size = max(1, MAX_PARAMS // (len(table.columns) - 1))
+
+    items = {}
+    seen_keys = set()
+    chunk = []
+
+    async def flush():
+        rows = dict(chunk)
+        written = []
+        for index, status, row_id in await _insert_chunk(table, chunk, conflict_column, on_conflict):
+            error = "이미 존재하는 키" if status == "error" else None
+            items[index] = {"index": index, "status": status, "id": row_id, "error": error}
+            if status in ("created", "updated"):
+                written.append((row_id, rows[index]))
+        if after_insert is not None:
+            await after_insert(written)
+        chunk.clear()
+
+    async with database.transaction():
+        async for index, row, error in iter_items(request, model):
+            if row is not None and conflict_column is not None:
+                if row[conflict_column] in seen_keys:
+                    row, error = None, f"요청 안에서 중복된 {conflict_column}"
+                else:
+                    seen_keys.add(row[conflict_column])
+            if row is None:
+                items[index] = {"index": index, "status": "error", "id": None, "error": error}
+                continue
+            chunk.append((index, row))
+            if len(chunk) >= chunk_size:
+                await flush()
+        if chunk:
+            await flush()
+
+    results = [items[index] for index in sorted(items)]
+    counts = {"created": 0, "updated": 0, "skipped": 0, "error": 0}
+    for item in results:
+        counts[item["status"]] += 1
+    return {
+        "created": counts["created"],
+        "updated": counts["updated"],
+        "skipped": counts["skipped"],
+        "failed": counts["error"],
+        "items": results,
+    }
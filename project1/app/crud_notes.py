@@ -1,15 +1,26 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from .bulk import bulk_create
 from .database import database
 from .models import notes
-from .schemas import NoteIn, NoteOut
+from .schemas import BulkOut, NoteIn, NoteOut
+from .write_batcher import get_batcher
 
 router = APIRouter(prefix="/notes", tags=["notes"])
 
 @router.post("/", response_model=NoteOut)
 async def create_note(note: NoteIn):
-    note_id = await database.execute(notes.insert().values(**note.model_dump()))
+    batcher = get_batcher(notes)
+    if batcher is not None:
+        note_id = await batcher.insert(note.model_dump())
+    else:
+        note_id = await database.execute(notes.insert().values(**note.model_dump()))
     return {**note.model_dump(), "id": note_id}
 
+@router.post("/bulk", response_model=BulkOut)
+async def create_notes_bulk(request: Request):
+    """본문: NoteIn의 JSON 배열 또는 NDJSON (Content-Type: application/x-ndjson)"""
+    return await bulk_create(request, NoteIn, notes)
+
 @router.get("/{note_id}", response_model=NoteOut)
 async def read_note(note_id: int):
     query = notes.select().where(notes.c.id == note_id)
@@ -1,20 +1,183 @@
-from fastapi import APIRouter
+import hashlib
+import json
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import Integer, any_
+from .bulk import array_param, bulk_create
 from .database import database
+from .encoding import encode_rows, select_columns
+from .facets import HASH_TAG_FACET_LIMIT, facet_index
+from .filters import RecipeFilters
+from .body_codec import split_row
 from .models import recipes
-from .schemas import RecipeIn, RecipeOut
+from .recipe_bodies import BODY_COLUMNS, fetch_recipe, fetch_recipes, store_bodies
+from .recipe_stats import get_stats, summary_refresher
+from .schemas import (
+    BulkOut, FacetsOut, RecipeIn, RecipeOut, RecipeStatsOut, RecipeSummaryOut, SemanticSearchOut, SimilarRecipeOut,
+)
+from .semantic_search import semantic_search
+from .similar import similar_index
+from .single_flight import SingleFlight
+from .write_batcher import get_batcher
 
 router = APIRouter(prefix="/recipes", tags=["recipes"])
 
+MAX_BATCH_IDS = 1000
+recipe_lookups = SingleFlight("read_recipe")
+
+async def after_insert(pairs):
+    """생성/upsert 된 [(id, RecipeIn 형식 dict)]의 본문과 재료 서명 저장 (INSERT와 같은 트랜잭션)"""
+    await store_bodies(pairs)
+    await similar_index.store(pairs)
+
+def _etag(row):
+    body = json.dumps(row, sort_keys=True, ensure_ascii=False, default=str)
+    return '"' + hashlib.blake2b(body.encode(), digest_size=16).hexdigest() + '"'
+
 @router.post("/", response_model=RecipeOut)
 async def create_recipe(recipe: RecipeIn):
-    recipe_id = await database.execute(recipes.insert().values(**recipe.model_dump()))
+    batcher = get_batcher(recipes)
+    if batcher is not None:
+        # 본문과 재료 서명은 배처가 같은 트랜잭션에서 after_insert로 저장
+        recipe_id = await batcher.insert(recipe.model_dump())
+    else:
+        summary, _ = split_row(recipe.model_dump())
+        async with database.transaction():
+            recipe_id = await database.execute(recipes.insert().values(**summary))
+            await after_insert([(recipe_id, recipe.model_dump())])
+    summary_refresher.mark_dirty()
+    facet_index.add({**recipe.model_dump(), "id": recipe_id})
     return {**recipe.model_dump(), "id": recipe_id}
 
+@router.post("/bulk", response_model=BulkOut)
+async def create_recipes_bulk(request: Request, on_conflict: Literal["error", "skip", "update"] = "error"):
+    """
+    본문: RecipeIn의 JSON 배열 또는 NDJSON (Content-Type: application/x-ndjson)
+    on_conflict: 이미 있는 rcp_seq 처리 (error: 항목 오류, skip: 건너뜀, update: upsert)
+    """
+    result = await bulk_create(
+        request, RecipeIn, recipes, conflict_column="rcp_seq", on_conflict=on_conflict, after_insert=after_insert)
+    if result["created"] or result["updated"]:
+        summary_refresher.mark_dirty()
+        await facet_index.refresh_ids([item["id"] for item in result["items"] if item["status"] in ("created", "updated")])
+    return result
+
+@router.get("/stats", response_model=RecipeStatsOut)
+async def read_recipe_stats(
+    filters: RecipeFilters = Depends(),
+    group_by: Literal["rcp_way2", "rcp_pat2"] | None = None,
+):
+    """
+    info_* 컬럼별 count/mean/min/max/stddev/백분위수 (목록과 같은 필터, group_by로 그룹별 집계)
+    필터가 없거나 rcp_way2/rcp_pat2 하나만 지정하면 미리 계산된 요약 테이블에서 응답 (source=summary)
+    """
+    return await get_stats(filters, group_by)
+
+@router.get("/facets", response_model=FacetsOut)
+async def read_recipe_facets(
+    rcp_pat2: list[str] = Query([]),
+    rcp_way2: list[str] = Query([]),
+    hash_tag: list[str] = Query([]),
+    info_eng: list[str] = Query([], description="칼로리 구간 (예: 100~200)"),
+    info_car: list[str] = Query([]),
+    info_pro: list[str] = Query([]),
+    info_fat: list[str] = Query([]),
+    info_na: list[str] = Query([]),
+    hash_tag_limit: int = Query(HASH_TAG_FACET_LIMIT, ge=1, le=1000, description="개수를 셀 해시태그 수 (전체 개수 상위)"),
+):
+    """
+    현재 필터에서 패싯 값별 레시피 수 (같은 패싯은 OR, 패싯끼리는 AND, 예: ?rcp_pat2=반찬&rcp_pat2=밥&rcp_way2=볶기)
+    각 패싯의 개수는 자기 패싯 필터를 뺀 나머지 필터 기준
+    """
+    return facet_index.counts({
+        "rcp_pat2": rcp_pat2, "rcp_way2": rcp_way2, "hash_tag": hash_tag, "info_eng": info_eng,
+        "info_car": info_car, "info_pro": info_pro, "info_fat": info_fat, "info_na": info_na,
+    }, hash_tag_limit)
+
+@router.get("/semantic-search", response_model=list[SemanticSearchOut])
+async def semantic_search_recipes(
+    q: str = Query(..., min_length=1, description="자연어 검색어 (예: 다이어트용 매콤한 반찬)"),
+    filters: RecipeFilters = Depends(),
+    limit: int = Query(10, ge=1, le=100),
+    alpha: float = Query(0.8, ge=0.0, le=1.0, description="의미 유사도 가중치 (나머지는 키워드 점수)"),
+    nprobe: int | None = Query(None, ge=1, description="IVF에서 볼 클러스터 수 (클수록 정확하고 느림)"),
+):
+    """
+    레시피 이름+재료+해시태그 임베딩으로 검색하고 키워드 점수와 섞어 다시 정렬
+    목록과 같은 필터(rcp_way2, rcp_pat2, min_eng, max_eng)를 함께 걸 수 있음
+    """
+    # q는 검색어라 목록 필터의 "이름에 포함" 조건으로는 쓰지 않음
+    filters.q = None
+    return await semantic_search.search(q, filters, limit, alpha, nprobe)
+
+@router.get("/batch", response_model=list[RecipeOut])
+async def read_recipes_batch(
+    request: Request,
+    ids: str = Query(..., description="쉼표로 구분한 id 목록 (예: 1,2,3)"),
+    fields: str | None = Query(None, description="가져올 컬럼 (예: id,rcp_nm,info_eng), 없으면 본문까지 전체"),
+):
+    """
+    여러 id를 쿼리 한 번(id = ANY(...))으로 조회, 요청한 순서대로 반환하며 없는 id는 제외
+    Accept: application/msgpack 또는 application/vnd.apache.arrow.stream 으로 형식 선택 가능
+    """
+    columns = select_columns(recipes, fields, extra=BODY_COLUMNS)
+    try:
+        recipe_ids = list(dict.fromkeys(int(x) for x in ids.split(",") if x.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids는 쉼표로 구분한 정수여야 합니다")
+    if len(recipe_ids) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"id는 한 번에 {MAX_BATCH_IDS}개까지 조회할 수 있습니다")
+    if not recipe_ids:
+        return encode_rows([], columns, request.headers.get("accept"))
+
+    if database.url.dialect == "postgresql":
+        condition = recipes.c.id == any_(array_param("ids", recipe_ids, Integer()))
+    else:
+        condition = recipes.c.id.in_(recipe_ids)
+    # 순서를 맞추려면 id가 필요하므로 fetch_recipes는 fields에 없어도 id를 같이 조회
+    rows = {row["id"]: row for row in await fetch_recipes(columns, [condition])}
+    ordered = [rows[recipe_id] for recipe_id in recipe_ids if recipe_id in rows]
+    return encode_rows(ordered, columns, request.headers.get("accept"))
+
 @router.get("/{recipe_id}", response_model=RecipeOut)
-async def read_recipe(recipe_id: int):
-    query = recipes.select().where(recipes.c.id == recipe_id)
-    return await database.fetch_one(query)
+async def read_recipe(recipe_id: int, request: Request, response: Response):
+    # 같은 id에 대한 동시 요청은 쿼리(+ 본문 압축 해제) 한 번으로 처리
+    row = await recipe_lookups.do(recipe_id, lambda: fetch_recipe(recipe_id))
+    if row is None:
+        raise HTTPException(status_code=404, detail="레시피를 찾을 수 없습니다")
+    # 클라이언트가 가진 본문과 같으면 본문 없이 304
+    etag = _etag(row)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return row
+
+@router.get("/{recipe_id}/similar", response_model=list[SimilarRecipeOut])
+async def read_similar_recipes(
+    recipe_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    min_jaccard: float = Query(0.0, ge=0.0, le=1.0),
+):
+    """재료가 비슷한 레시피 (MinHash LSH 후보를 재료 집합 Jaccard로 정렬)"""
+    results = await similar_index.similar(recipe_id, limit, min_jaccard)
+    if results is None:
+        raise HTTPException(status_code=404, detail="레시피를 찾을 수 없습니다")
+    return results
 
-@router.get("/", response_model=list[RecipeOut])
-async def list_recipes():
-    return await database.fetch_all(recipes.select())
+@router.get("/", response_model=list[RecipeSummaryOut])
+async def list_recipes(
+    request: Request,
+    filters: RecipeFilters = Depends(),
+    fields: str | None = Query(
+        None,
+        description="가져올 컬럼 (예: id,rcp_nm,info_eng), 없으면 요약 컬럼만 "
+                    "(본문 rcp_parts_dtls, recipe_steps, rcp_na_tip은 직접 지정해야 포함)",
+    ),
+):
+    """
+    기본은 요약 컬럼만 (recipes 테이블만 읽음), 본문은 fields에 rcp_parts_dtls 등을 넣으면 압축 해제해서 포함
+    Accept: application/msgpack 또는 application/vnd.apache.arrow.stream 으로 형식 선택 가능
+    """
+    columns = select_columns(recipes, fields, extra=BODY_COLUMNS, default=recipes.columns)
+    records = await fetch_recipes(columns, filters.conditions())
+    return encode_rows(records, columns, request.headers.get("accept"))
@@ -1,28 +1,26 @@
 import time
-from databases import Database
 from sqlalchemy import create_engine, MetaData
 import os
 import psycopg2
+from .metrics import InstrumentedDatabase
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://myuser:mypassword@db:5432/mydb")
 
-database = Database(DATABASE_URL)
+# 쿼리 수/시간을 요청별로 기록 (app/metrics.py)
+database = InstrumentedDatabase(DATABASE_URL)
 metadata = MetaData()
 engine = create_engine(DATABASE_URL)
 
 def wait_for_db(retries=10, delay=3):
     """
-    DB가 준비될 때까지 재시도
+    DB가 준비될 때까지 재시도 (DATABASE_URL이 PostgreSQL일 때만, 테스트용 SQLite는 바로 통과)
     """
+    if engine.dialect.name != "postgresql":
+        return
+    dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
     for i in range(retries):
         try:
-            conn = psycopg2.connect(
-                dbname="mydb",
-                user="myuser",
-                password="mypassword",
-                host="db",
-                port="5432",
-            )
+            conn = psycopg2.connect(dsn)
             conn.close()
             print("Database is ready!")
             return
@@ -0,0 +1,110 @@
+"""
+목록 응답의 필드 선택(fields=)과 응답 형식 협상
+
+- fields=id,rcp_nm,info_eng : 지정한 컬럼만 SELECT 해서 큰 텍스트 컬럼(recipe_steps 등)을 읽지도 보내지도 않음
+- Accept 헤더로 형식 선택
+    application/json (기본)                  : 행 객체 배열
+    application/msgpack, application/x-msgpack : 같은 구조를 MessagePack으로
+    application/vnd.apache.arrow.stream       : 컬럼 단위 Arrow IPC 스트림 (pandas/pyarrow로 바로 읽음)
+
+행은 Pydantic 모델을 거치지 않고 DB 레코드에서 바로 직렬화합니다. (컬럼 타입은 테이블 정의가 보장)
+msgpack, pyarrow는 해당 형식을 요청할 때만 import 합니다.
+"""
+
+import json
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+from sqlalchemy import Float, Integer
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+MEDIA_TYPES = {
+    "application/json": JSON,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.apache.arrow.stream": ARROW,
+}
+# 같은 URL이 Accept에 따라 다른 본문을 주므로 모든 응답에 붙임
+VARY = {"Vary": "Accept"}
+
+
+def select_columns(table, fields, extra=(), default=None):
+    """
+    fields="a,b" → 컬럼 목록, 모르는 이름은 400
+    extra: 테이블 밖에서 채우는 컬럼 (column(name, type)), default: fields가 없을 때 (기본은 전체)
+    """
+    available = {c.name: c for c in table.columns}
+    available.update((c.name, c) for c in extra)
+    names = list(dict.fromkeys(name.strip() for name in (fields or "").split(",") if name.strip()))
+    if not names:
+        return list(default) if default is not None else list(available.values())
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"알 수 없는 필드: {', '.join(unknown)} (가능: {', '.join(available)})",
+        )
+    return [available[name] for name in names]
+
+
+def negotiate(accept):
+    """
+    Accept 헤더에서 q가 가장 높은 지원 형식 (같으면 먼저 나온 것), q=0 은 "받지 않음"이라 제외
+    */*, application/* 는 JSON으로 보고, 지원하는 형식이 없으면 JSON
+    """
+    best, best_q = JSON, 0.0
+    for part in (accept or "").split(","):
+        media_type, *params = (item.strip().lower() for item in part.split(";"))
+        if media_type in ("*/*", "application/*"):
+            candidate = JSON
+        elif media_type in MEDIA_TYPES:
+            candidate = MEDIA_TYPES[media_type]
+        else:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = candidate, q
+    return best
+
+
+def _arrow_type(column):
+    import pyarrow as pa
+
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    return pa.string()
+
+
+def encode_rows(records, columns, accept):
+    """DB 레코드 목록 → 협상한 형식의 Response (캐시가 형식별로 따로 저장하도록 Vary: Accept)"""
+    names = [column.name for column in columns]
+    media_type = negotiate(accept)
+
+    if media_type == ARROW:
+        import pyarrow as pa
+
+        schema = pa.schema([(column.name, _arrow_type(column)) for column in columns])
+        table = pa.table({name: [record[name] for record in records] for name in names}, schema=schema)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            writer.write_table(table)
+        return Response(sink.getvalue().to_pybytes(), media_type=ARROW, headers=VARY)
+
+    rows = [{name: record[name] for name in names} for record in records]
+    if media_type == MSGPACK:
+        import msgpack
+
+        return Response(msgpack.packb(rows, use_bin_type=True), media_type=MSGPACK, headers=VARY)
+    body = json.dumps(rows, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    return Response(body.encode("utf-8"), media_type=JSON, headers=VARY)
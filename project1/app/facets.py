@@ -0,0 +1,185 @@
+"""
+패싯 개수 (GET /recipes/facets) - 프로세스 내 비트맵 인덱스
+
+패싯 값마다 "그 값을 가진 레시피 id" 비트맵을 하나씩 둡니다 (pyroaring.BitMap, 압축 비트맵).
+    rcp_pat2, rcp_way2, hash_tag : 값 그대로 (hash_tag는 쉼표/#/공백으로 나눈 태그 각각)
+    info_* : NUTRITION_BUCKETS 구간 (예: info_eng=100~200)
+
+필터는 같은 패싯 안에서는 OR, 패싯끼리는 AND 입니다.
+각 패싯의 개수는 "자기 패싯을 뺀 나머지 필터"를 적용한 결과로 세므로,
+rcp_pat2=반찬 을 골라도 다른 rcp_pat2 값의 개수가 함께 나옵니다.
+DB를 거치지 않고 비트맵 교집합 개수(intersection_cardinality)만 세므로 필터 조합과 상관없이 빠릅니다.
+비트맵은 제자리에서 갱신하므로 레시피 하나를 추가/upsert 할 때 비트맵 전체를 복사하지 않습니다.
+
+hash_tag는 값 종류가 레시피 수만큼 많아질 수 있으므로 전체 개수 상위 HASH_TAG_FACET_LIMIT개 태그
+(+ 필터로 고른 태그)만 셉니다. 상위 태그 목록은 쓰기가 있을 때만 다시 계산합니다.
+인덱스는 서버 시작 시 한 번 만들고, 이 프로세스의 API로 생성/upsert 된 레시피만 바로 반영합니다.
+(여러 워커로 띄우면 다른 워커의 쓰기와 DB 직접 적재분은 재시작 때 반영)
+"""
+
+import heapq
+import os
+import re
+import time
+from bisect import bisect_right
+
+from pyroaring import BitMap
+from sqlalchemy import Integer, any_, select
+
+from .bulk import array_param
+from .database import database
+from .metrics import LATENCY_BUCKETS, registry
+from .models import recipes
+
+CATEGORY_FACETS = ("rcp_pat2", "rcp_way2", "hash_tag")
+# 구간 경계 (info_eng=kcal, info_na=mg, 나머지=g)
+NUTRITION_BUCKETS = {
+    "info_eng": (100, 200, 300, 500),
+    "info_car": (10, 30, 60),
+    "info_pro": (5, 15, 30),
+    "info_fat": (5, 15, 30),
+    "info_na": (200, 500, 1000),
+}
+FACETS = CATEGORY_FACETS + tuple(NUTRITION_BUCKETS)
+TAG_SEPARATORS = re.compile(r"[,#\s]+")
+# hash_tag 패싯에서 개수를 셀 태그 수 (전체 레시피 수 기준 상위)
+HASH_TAG_FACET_LIMIT = int(os.getenv("HASH_TAG_FACET_LIMIT", "100"))
+
+index_build = registry.histogram(
+    "facet_index_build_seconds", "패싯 비트맵 인덱스 전체 생성 시간", (), LATENCY_BUCKETS)
+
+
+def bucket_label(edges, value):
+    """edges=(100, 200) 이면 ~100 / 100~200 / 200~"""
+    position = bisect_right(edges, value)
+    if position == 0:
+        return f"~{edges[0]:g}"
+    if position == len(edges):
+        return f"{edges[-1]:g}~"
+    return f"{edges[position - 1]:g}~{edges[position]:g}"
+
+
+def facet_values(row):
+    """레시피 행 → {패싯: 값 목록}"""
+    values = {
+        "rcp_pat2": [row["rcp_pat2"]],
+        "rcp_way2": [row["rcp_way2"]],
+        "hash_tag": [tag for tag in TAG_SEPARATORS.split(row["hash_tag"] or "") if tag],
+    }
+    for name, edges in NUTRITION_BUCKETS.items():
+        values[name] = [bucket_label(edges, row[name])]
+    return values
+
+
+class FacetIndex:
+    def __init__(self):
+        self.bitmaps = {facet: {} for facet in FACETS}
+        self.all = BitMap()
+        # upsert로 값이 바뀌면 이전 값의 비트를 지우기 위해 id별 값을 보관
+        self.row_values = {}
+        self._pending = None
+        # 전체 개수 순 hash_tag 목록 (hash_tag 비트맵이 바뀌면 None으로 비우고 다음 counts에서 다시 계산)
+        self._top_tags = None
+
+    def _set(self, row_id, values):
+        old = self.row_values.get(row_id)
+        if old is not None:
+            for facet, old_values in old.items():
+                bitmaps = self.bitmaps[facet]
+                for value in old_values:
+                    bitmap = bitmaps[value]
+                    bitmap.discard(row_id)
+                    if not bitmap:
+                        del bitmaps[value]
+        for facet, new_values in values.items():
+            bitmaps = self.bitmaps[facet]
+            for value in new_values:
+                bitmap = bitmaps.get(value)
+                if bitmap is None:
+                    bitmap = bitmaps[value] = BitMap()
+                bitmap.add(row_id)
+        self.row_values[row_id] = values
+        self.all.add(row_id)
+        if old is None or old.get("hash_tag") != values.get("hash_tag"):
+            self._top_tags = None
+
+    def add(self, row):
+        """row: id와 패싯 컬럼을 가진 dict/Record"""
+        values = facet_values(row)
+        self._set(row["id"], values)
+        if self._pending is not None:
+            self._pending.append((row["id"], values))
+
+    async def build(self):
+        """DB 전체로 다시 생성 (조회 중 들어온 add는 끝난 뒤 다시 적용)"""
+        start = time.perf_counter()
+        self._pending = []
+        columns = [recipes.c.id] + [recipes.c[facet] for facet in FACETS]
+        rows = await database.fetch_all(select(*columns))
+        fresh = FacetIndex()
+        for row in rows:
+            fresh._set(row["id"], facet_values(row))
+        for row_id, values in self._pending:
+            fresh._set(row_id, values)
+        for bitmaps in fresh.bitmaps.values():
+            for bitmap in bitmaps.values():
+                bitmap.run_optimize()
+        self.bitmaps, self.all, self.row_values = fresh.bitmaps, fresh.all, fresh.row_values
+        self._top_tags = None
+        self._pending = None
+        index_build.observe((), time.perf_counter() - start)
+
+    async def refresh_ids(self, ids):
+        """bulk 생성/upsert 된 id들을 DB에서 읽어 반영"""
+        if not ids:
+            return
+        columns = [recipes.c.id] + [recipes.c[facet] for facet in FACETS]
+        if database.url.dialect == "postgresql":
+            condition = recipes.c.id == any_(array_param("ids", list(ids), Integer()))
+        else:
+            condition = recipes.c.id.in_(list(ids))
+        for row in await database.fetch_all(select(*columns).where(condition)):
+            self.add(row)
+
+    def _mask(self, filters, skip=None):
+        """필터를 적용한 id 비트맵, 적용할 필터가 없으면 None (전체)"""
+        mask = None
+        for facet, selected in filters.items():
+            if facet == skip or not selected:
+                continue
+            bitmaps = self.bitmaps[facet]
+            union = BitMap.union(BitMap(), *(bitmaps[value] for value in selected if value in bitmaps))
+            mask = union if mask is None else mask & union
+        return mask
+
+    def _candidates(self, facet, filters, limit):
+        """개수를 셀 (값, 비트맵) 목록 (hash_tag는 전체 개수 상위 limit개 + 필터로 고른 값)"""
+        bitmaps = self.bitmaps[facet]
+        if facet != "hash_tag" or len(bitmaps) <= limit:
+            return bitmaps.items()
+        if self._top_tags is None or len(self._top_tags) < min(limit, len(bitmaps)):
+            self._top_tags = heapq.nlargest(
+                max(limit, HASH_TAG_FACET_LIMIT), bitmaps, key=lambda tag: len(bitmaps[tag]))
+        tags = dict.fromkeys(self._top_tags[:limit])
+        tags.update(dict.fromkeys(value for value in filters.get(facet, ()) if value in bitmaps))
+        return [(tag, bitmaps[tag]) for tag in tags]
+
+    def counts(self, filters, hash_tag_limit=HASH_TAG_FACET_LIMIT):
+        """
+        filters: {패싯: [값, ...]} → {"total": 필터 전체 적용 개수, "facets": {패싯: {값: 개수}}}
+        개수가 0인 값은 빠집니다. hash_tag는 전체 개수 상위 hash_tag_limit개 태그(+ 고른 태그)만 셉니다.
+        """
+        facets = {}
+        for facet in FACETS:
+            mask = self._mask(filters, skip=facet)
+            counts = {}
+            for value, bitmap in self._candidates(facet, filters, hash_tag_limit):
+                count = len(bitmap) if mask is None else bitmap.intersection_cardinality(mask)
+                if count:
+                    counts[value] = count
+            facets[facet] = dict(sorted(counts.items(), key=lambda item: -item[1]))
+        mask = self._mask(filters)
+        return {"total": len(self.all if mask is None else mask), "facets": facets}
+
+
+facet_index = FacetIndex()
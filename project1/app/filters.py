@@ -0,0 +1,53 @@
+"""
+레시피 목록/통계 조회에서 같이 쓰는 필터 (FastAPI 의존성)
+
+GET /recipes/, GET /recipes/stats 가 같은 쿼리 파라미터를 받고
+SQLAlchemy 조건 목록으로 바꿔 WHERE 절에 그대로 넣습니다.
+"""
+
+from fastapi import Query
+
+from .models import recipes
+
+
+class RecipeFilters:
+    def __init__(
+        self,
+        rcp_way2: str | None = Query(None, description="요리 방법 (예: 볶기)"),
+        rcp_pat2: str | None = Query(None, description="요리 종류 (예: 반찬)"),
+        q: str | None = Query(None, description="레시피 이름에 포함된 문자열"),
+        min_eng: float | None = Query(None, description="최소 칼로리"),
+        max_eng: float | None = Query(None, description="최대 칼로리"),
+    ):
+        self.rcp_way2 = rcp_way2
+        self.rcp_pat2 = rcp_pat2
+        self.q = q
+        self.min_eng = min_eng
+        self.max_eng = max_eng
+
+    def conditions(self):
+        conditions = []
+        if self.rcp_way2 is not None:
+            conditions.append(recipes.c.rcp_way2 == self.rcp_way2)
+        if self.rcp_pat2 is not None:
+            conditions.append(recipes.c.rcp_pat2 == self.rcp_pat2)
+        if self.q:
+            conditions.append(recipes.c.rcp_nm.contains(self.q, autoescape=True))
+        if self.min_eng is not None:
+            conditions.append(recipes.c.info_eng >= self.min_eng)
+        if self.max_eng is not None:
+            conditions.append(recipes.c.info_eng <= self.max_eng)
+        return conditions
+
+    def only_category(self):
+        """rcp_way2 / rcp_pat2 중 하나의 값만 지정된 경우 (컬럼, 값), 아니면 None"""
+        if self.q or self.min_eng is not None or self.max_eng is not None:
+            return None
+        if self.rcp_way2 is not None and self.rcp_pat2 is None:
+            return "rcp_way2", self.rcp_way2
+        if self.rcp_pat2 is not None and self.rcp_way2 is None:
+            return "rcp_pat2", self.rcp_pat2
+        return None
+
+    def is_empty(self):
+        return not self.conditions()
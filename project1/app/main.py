@@ -1,21 +1,44 @@
 from fastapi import FastAPI
 from .database import database, metadata, engine
+from .facets import facet_index
 from .crud_notes import router as notes_router
-from .crud_recipes import router as recipes_router
+from .crud_recipes import after_insert as after_recipe_insert, router as recipes_router
+from .metrics import MetricsMiddleware, router as metrics_router
+from .models import notes, recipes
+from .recipe_bodies import migrate_legacy_columns, prepare_dictionaries
+from .recipe_stats import summary_refresher
+from .semantic_search import semantic_search
+from .similar import similar_index
+from .write_batcher import start_batchers, stop_batchers
 
 # 테이블 생성
 metadata.create_all(engine)
+# 본문 컬럼이 recipes에 있던 기존 DB는 recipe_bodies로 옮김 (advisory lock으로 한 워커만 실행)
+# 배포 전에 python migrate_recipe_bodies.py 로 옮기고 VACUUM 까지 해 두는 것을 권장
+migrate_legacy_columns(engine)
 
 app = FastAPI(title="FastAPI + PostgreSQL Modular Example (Pydantic v2)")
+app.add_middleware(MetricsMiddleware)
 
 @app.on_event("startup")
 async def startup():
     await database.connect()
+    await prepare_dictionaries()
+    # WRITE_COALESCING=1 일 때만 동작
+    start_batchers([notes, recipes], after_insert={"recipes": after_recipe_insert})
+    summary_refresher.start()
+    await facet_index.build()
+    await similar_index.build()
+    # 의미 검색 인덱스는 semantic_index.py로 만들어 두면 열기만 함 (임베딩 모델은 첫 검색 때 로드)
+    semantic_search.load()
 
 @app.on_event("shutdown")
 async def shutdown():
+    await summary_refresher.stop()
+    await stop_batchers()
     await database.disconnect()
 
 # 라우터 등록
 app.include_router(notes_router)
-app.include_router(recipes_router)
\ No newline at end of file
+app.include_router(recipes_router)
+app.include_router(metrics_router)
\ No newline at end of file
@@ -0,0 +1,250 @@
+"""
+요청/DB 쿼리 계측과 Prometheus 텍스트 출력
+
+- MetricsMiddleware: 라우트별 지연 히스토그램, 응답 크기, 요청당 DB 쿼리 수/시간 기록 (순수 ASGI 미들웨어)
+- InstrumentedDatabase: databases.Database의 execute/fetch_* 호출 시간을 현재 요청(contextvar)에 누적
+- 느린 요청(SLOW_REQUEST_MS 초과)은 SLOW_TRACE_SAMPLE_RATE 비율로 쿼리별 trace를 남김
+- GET /metrics (Prometheus), GET /metrics/slow (최근 느린 요청 trace JSON)
+
+hot path에서는 카운터/버킷 증가와 쿼리 객체 참조 저장만 하고,
+SQL 문자열 변환은 trace를 남길 때만 합니다.
+"""
+
+import os
+import random
+import time
+from bisect import bisect_left
+from collections import deque
+from contextvars import ContextVar
+
+from databases import Database
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_TRACE_SAMPLE_RATE = float(os.getenv("SLOW_TRACE_SAMPLE_RATE", "0.1"))
+SLOW_TRACE_LIMIT = int(os.getenv("SLOW_TRACE_LIMIT", "100"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self, label_names):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in self.series.items():
+            base = ",".join(f'{k}="{v}"' for k, v in zip(label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound:g}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{base}}} {total:g}")
+            lines.append(f"{self.name}_count{{{base}}} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.series = {}
+
+    def inc(self, labels, value=1):
+        self.series[labels] = self.series.get(labels, 0) + value
+
+    def render(self, label_names):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in self.series.items():
+            base = ",".join(f'{k}="{v}"' for k, v in zip(label_names, labels))
+            lines.append(f"{self.name}{{{base}}} {value:g}")
+        return lines
+
+
+class Registry:
+    """(메트릭, 라벨 이름) 목록, 다른 모듈(배처 등)도 여기에 등록"""
+
+    def __init__(self):
+        self.metrics = []
+
+    def histogram(self, name, help_text, label_names, buckets):
+        metric = Histogram(name, help_text, buckets)
+        self.metrics.append((metric, label_names))
+        return metric
+
+    def counter(self, name, help_text, label_names):
+        metric = Counter(name, help_text)
+        self.metrics.append((metric, label_names))
+        return metric
+
+    def render(self):
+        lines = []
+        for metric, label_names in self.metrics:
+            lines.extend(metric.render(label_names))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+request_latency = registry.histogram(
+    "http_request_duration_seconds", "요청 처리 시간", ("method", "route", "status"), LATENCY_BUCKETS)
+request_app_time = registry.histogram(
+    "http_request_non_db_seconds", "요청 처리 시간 중 DB 외 시간 (행 변환, 직렬화 등)", ("method", "route"),
+    LATENCY_BUCKETS)
+response_size = registry.histogram(
+    "http_response_size_bytes", "응답 본문 크기", ("method", "route"), SIZE_BUCKETS)
+db_queries = registry.histogram(
+    "db_queries_per_request", "요청당 DB 쿼리 수", ("method", "route"), COUNT_BUCKETS)
+db_time = registry.histogram(
+    "db_query_duration_seconds", "요청당 DB 쿼리 시간 합", ("method", "route"), LATENCY_BUCKETS)
+slow_requests = registry.counter(
+    "http_slow_requests_total", f"{SLOW_REQUEST_MS:g}ms를 넘긴 요청 수", ("method", "route"))
+
+slow_traces = deque(maxlen=SLOW_TRACE_LIMIT)
+
+
+class RequestStats:
+    __slots__ = ("query_count", "query_time", "queries")
+
+    def __init__(self):
+        self.query_count = 0
+        self.query_time = 0.0
+        self.queries = []
+
+
+_current = ContextVar("request_stats", default=None)
+
+
+def _track(query, elapsed):
+    stats = _current.get()
+    if stats is not None:
+        stats.query_count += 1
+        stats.query_time += elapsed
+        stats.queries.append((query, elapsed))
+
+
+class InstrumentedDatabase(Database):
+    """쿼리 호출 시간을 현재 요청의 RequestStats에 누적하는 Database"""
+
+    async def execute(self, query, values=None):
+        start = time.perf_counter()
+        try:
+            return await super().execute(query, values)
+        finally:
+            _track(query, time.perf_counter() - start)
+
+    async def execute_many(self, query, values):
+        start = time.perf_counter()
+        try:
+            return await super().execute_many(query, values)
+        finally:
+            _track(query, time.perf_counter() - start)
+
+    async def fetch_one(self, query, values=None):
+        start = time.perf_counter()
+        try:
+            return await super().fetch_one(query, values)
+        finally:
+            _track(query, time.perf_counter() - start)
+
+    async def fetch_all(self, query, values=None):
+        start = time.perf_counter()
+        try:
+            return await super().fetch_all(query, values)
+        finally:
+            _track(query, time.perf_counter() - start)
+
+    async def fetch_val(self, query, values=None, column=0):
+        start = time.perf_counter()
+        try:
+            return await super().fetch_val(query, values, column)
+        finally:
+            _track(query, time.perf_counter() - start)
+
+
+def _sql_summary(query, limit=300):
+    sql = " ".join(str(query).split())
+    return sql if len(sql) <= limit else sql[:limit] + "..."
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        status = [500]
+        size = [0]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                size[0] += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _current.reset(token)
+            route = scope.get("route")
+            # 경로 파라미터 값마다 시계열이 생기지 않도록 라우트 템플릿 사용
+            route = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            request_latency.observe((method, route, status[0]), elapsed)
+            request_app_time.observe((method, route), max(elapsed - stats.query_time, 0.0))
+            response_size.observe((method, route), size[0])
+            db_queries.observe((method, route), stats.query_count)
+            db_time.observe((method, route), stats.query_time)
+
+            if elapsed * 1000 > SLOW_REQUEST_MS:
+                slow_requests.inc((method, route))
+                if random.random() < SLOW_TRACE_SAMPLE_RATE:
+                    slow_traces.append({
+                        "timestamp": time.time(),
+                        "method": method,
+                        "path": scope["path"],
+                        "route": route,
+                        "status": status[0],
+                        "duration_ms": elapsed * 1000,
+                        "db_ms": stats.query_time * 1000,
+                        "response_bytes": size[0],
+                        "queries": [
+                            {"sql": _sql_summary(query), "duration_ms": duration * 1000}
+                            for query, duration in stats.queries
+                        ],
+                    })
+
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/metrics/slow")
+async def slow_request_traces():
+    return list(slow_traces)
@@ -1,4 +1,4 @@
-from sqlalchemy import Table, Column, Integer, String, Float, Text
+from sqlalchemy import Table, Column, ForeignKey, Integer, LargeBinary, String, Float, Text
 from .database import metadata
 
 # notes 테이블
@@ -10,7 +10,7 @@ notes = Table(
     Column("content", String, nullable=False),
 )
 
-# recipes 테이블
+# recipes 테이블 (목록 조회용 요약 컬럼만, 큰 텍스트는 recipe_bodies)
 recipes = Table(
     "recipes",
     metadata,
@@ -24,8 +24,45 @@ recipes = Table(
     Column("info_pro", Float, nullable=False),
     Column("info_fat", Float, nullable=False),
     Column("info_na", Float, nullable=False),
-    Column("rcp_parts_dtls", Text, nullable=False),
-    Column("recipe_steps", Text, nullable=False),
-    Column("rcp_na_tip", Text, nullable=True),
     Column("hash_tag", Text, nullable=True),
-)
\ No newline at end of file
+)
+
+# recipes 본문 (rcp_parts_dtls, recipe_steps, rcp_na_tip을 JSON으로 묶어 zstd 압축, app/body_codec.py)
+recipe_bodies = Table(
+    "recipe_bodies",
+    metadata,
+    Column("recipe_id", Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True),
+    Column("dict_id", Integer, nullable=False),  # compression_dicts.id, 0이면 사전 없이 압축
+    Column("body", LargeBinary, nullable=False),
+)
+
+# 본문 압축용 zstd 공유 사전
+compression_dicts = Table(
+    "compression_dicts",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("data", LargeBinary, nullable=False),
+    Column("sample_count", Integer, nullable=False),
+    Column("created_at", Float, nullable=False),
+)
+
+# recipes 영양 통계 요약 (app/recipe_stats.py가 쓰기 후 갱신)
+recipe_stats_summary = Table(
+    "recipe_stats_summary",
+    metadata,
+    Column("group_by", String, primary_key=True),  # all / rcp_way2 / rcp_pat2
+    Column("group_value", String, primary_key=True),  # all이면 ""
+    Column("count", Integer, nullable=False),
+    Column("stats", Text, nullable=False),  # {info_*: {mean, min, max, stddev, percentiles}} JSON
+    Column("refreshed_at", Float, nullable=False),
+)
+
+
+# 레시피별 재료 MinHash 서명 (app/similar.py)
+recipe_minhash = Table(
+    "recipe_minhash",
+    metadata,
+    Column("recipe_id", Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True),
+    Column("ingredients", Text, nullable=False),  # 정규화된 재료 이름, 줄바꿈으로 구분
+    Column("signature", LargeBinary, nullable=False),  # uint32 x NUM_PERM, 재료가 없으면 빈 값
+)
@@ -0,0 +1,162 @@
+"""
+레시피 본문 저장/조회 (recipe_bodies 테이블)
+
+recipes에는 목록 조회에 필요한 요약 컬럼만 두고, 큰 텍스트(BODY_FIELDS)는
+zstd 사전으로 압축해 recipe_bodies에 따로 저장합니다. (압축은 app/body_codec.py)
+
+- store_bodies: 생성/upsert 된 레시피의 본문 저장 (요약 행과 같은 트랜잭션 안에서 호출)
+- fetch_recipes: 요청한 컬럼에 본문 필드가 있을 때만 recipe_bodies를 JOIN 하고 압축 해제
+- prepare_dictionaries: 시작 시 사전을 읽고, 아직 없으면 쌓인 본문으로 학습해 전체를 다시 압축
+- migrate_legacy_columns: recipes에 본문 컬럼이 남아 있는 기존 DB를 한 번 옮김
+  (동기, 시작 시 advisory lock을 잡고 한 워커만 실행, VACUUM FULL은 migrate_recipe_bodies.py에서만)
+"""
+
+import time
+
+from sqlalchemy import Text, column, func, inspect, select, text
+
+from .body_codec import BODY_FIELDS, BodyCodec, encode_body, split_row, train_dictionary
+from .bulk import upsert_rows
+from .database import database
+from .models import compression_dicts, recipe_bodies, recipes
+
+# fields= 로 고를 수 있는 본문 "컬럼" (테이블 컬럼이 아니라 압축 해제 후 채워짐)
+BODY_COLUMNS = [column(name, Text) for name in BODY_FIELDS]
+ALL_COLUMNS = list(recipes.columns) + BODY_COLUMNS
+# 여러 워커가 동시에 사전을 학습하지 않도록 잡는 advisory lock 키
+DICT_LOCK_KEY = 7_000_048
+# 여러 워커가 시작하면서 동시에 본문 컬럼을 옮기지 않도록 잡는 advisory lock 키
+MIGRATION_LOCK_KEY = 7_000_148
+
+codec = BodyCodec()
+
+
+async def load_dictionaries():
+    for record in await database.fetch_all(select(compression_dicts.c.id, compression_dicts.c.data)):
+        if not codec.has_dictionary(record["id"]):
+            codec.add_dictionary(record["id"], record["data"])
+
+
+async def _write_bodies(pairs):
+    """pairs: [(recipe_id, 본문 dict)] → 압축해서 recipe_bodies에 upsert"""
+    rows = []
+    for recipe_id, body in pairs:
+        dict_id, blob = codec.compress(body)
+        rows.append({"recipe_id": recipe_id, "dict_id": dict_id, "body": blob})
+    await upsert_rows(recipe_bodies, rows, "recipe_id")
+
+
+async def store_bodies(pairs):
+    """pairs: [(recipe_id, RecipeIn 형식 dict)]"""
+    if pairs:
+        await _write_bodies([(recipe_id, split_row(row)[1]) for recipe_id, row in pairs])
+
+
+async def prepare_dictionaries():
+    await load_dictionaries()
+    if codec.current_id:
+        return
+    async with database.transaction():
+        if database.url.dialect == "postgresql":
+            await database.execute(select(func.pg_advisory_xact_lock(DICT_LOCK_KEY)))
+            await load_dictionaries()
+            if codec.current_id:
+                return
+        records = await database.fetch_all(recipe_bodies.select())
+        bodies = [(record["recipe_id"], codec.decompress(record["dict_id"], record["body"])) for record in records]
+        data = train_dictionary([encode_body(body) for _, body in bodies])
+        if data is None:
+            return
+        dict_id = await database.execute(
+            compression_dicts.insert().values(data=data, sample_count=len(bodies), created_at=time.time()))
+        codec.add_dictionary(dict_id, data)
+        await _write_bodies(bodies)
+        print(f"recipe bodies: trained zstd dictionary {dict_id} on {len(bodies)} rows and recompressed")
+
+
+async def fetch_recipes(columns, conditions=()):
+    """
+    columns(ALL_COLUMNS 중 일부)에 해당하는 행 dict 목록, 순서 조회용으로 id는 항상 포함
+    본문 필드를 요청하지 않으면 recipes만 읽음
+    """
+    names = {c.name for c in columns}
+    selected = [c for c in recipes.columns if c.name in names or c.name == "id"]
+    if names.isdisjoint(BODY_FIELDS):
+        return await database.fetch_all(select(*selected).where(*conditions))
+
+    query = (
+        select(*selected, recipe_bodies.c.dict_id, recipe_bodies.c.body)
+        .select_from(recipes.outerjoin(recipe_bodies, recipes.c.id == recipe_bodies.c.recipe_id))
+        .where(*conditions)
+    )
+    records = await database.fetch_all(query)
+    # 다른 워커가 학습한 사전으로 압축된 본문이 있으면 사전 다시 읽기
+    if any(record["body"] is not None and not codec.has_dictionary(record["dict_id"]) for record in records):
+        await load_dictionaries()
+    rows = []
+    for record in records:
+        row = {c.name: record[c.name] for c in selected}
+        if record["body"] is not None:
+            row.update(codec.decompress(record["dict_id"], record["body"]))
+        else:
+            row.update(dict.fromkeys(BODY_FIELDS))
+        rows.append(row)
+    return rows
+
+
+async def fetch_recipe(recipe_id):
+    """본문까지 포함한 레시피 하나 (없으면 None)"""
+    rows = await fetch_recipes(ALL_COLUMNS, [recipes.c.id == recipe_id])
+    return rows[0] if rows else None
+
+
+def _legacy_columns(conn):
+    existing = {c["name"] for c in inspect(conn).get_columns("recipes")}
+    return [name for name in BODY_FIELDS if name in existing]
+
+
+def migrate_legacy_columns(engine):
+    """
+    recipes에 본문 컬럼이 있으면 압축해서 recipe_bodies로 옮기고 컬럼 삭제 → 옮긴 행 수 (없으면 0)
+
+    Postgres에서는 트랜잭션 advisory lock을 잡은 뒤 컬럼을 다시 확인하므로,
+    여러 워커가 동시에 시작해도 한 워커만 옮기고 나머지는 끝날 때까지 기다렸다가 그냥 지나갑니다.
+    공간 회수(vacuum_recipes)는 테이블 전체를 잠그므로 여기서 하지 않습니다.
+    """
+    with engine.connect() as conn:
+        if not _legacy_columns(conn):
+            return 0
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(select(func.pg_advisory_xact_lock(MIGRATION_LOCK_KEY)))
+        legacy = _legacy_columns(conn)
+        if not legacy:
+            # 다른 워커가 먼저 옮김
+            return 0
+        records = conn.execute(text(f"SELECT id, {', '.join(legacy)} FROM recipes")).mappings().all()
+        bodies = [(record["id"], {field: record.get(field) for field in BODY_FIELDS}) for record in records]
+        migration_codec = BodyCodec()
+        data = train_dictionary([encode_body(body) for _, body in bodies])
+        if data is not None:
+            dict_id = conn.execute(
+                compression_dicts.insert().values(data=data, sample_count=len(bodies), created_at=time.time())
+            ).inserted_primary_key[0]
+            migration_codec.add_dictionary(dict_id, data)
+        rows = []
+        for recipe_id, body in bodies:
+            dict_id, blob = migration_codec.compress(body)
+            rows.append({"recipe_id": recipe_id, "dict_id": dict_id, "body": blob})
+        if rows:
+            conn.execute(recipe_bodies.insert(), rows)
+        for name in legacy:
+            conn.execute(text(f"ALTER TABLE recipes DROP COLUMN {name}"))
+    print(f"recipes: moved {len(legacy)} text columns of {len(bodies)} rows to recipe_bodies")
+    return len(bodies)
+
+
+def vacuum_recipes(engine):
+    """DROP COLUMN은 공간을 돌려주지 않으므로 테이블을 다시 씀 (Postgres, ACCESS EXCLUSIVE 잠금)"""
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM FULL ANALYZE recipes"))
@@ -0,0 +1,200 @@
+"""
+영양 정보 통계 (GET /recipes/stats)
+
+info_* 컬럼별 count/mean/min/max/stddev/백분위수를 SQL 집계 한 번으로 계산합니다.
+(stddev, 백분위수는 PostgreSQL에서만 계산하고 다른 DB에서는 null)
+
+필터가 없거나 rcp_way2/rcp_pat2 값 하나만 지정한 요청은 recipe_stats_summary 테이블에
+미리 계산해 둔 행을 읽어 응답합니다. 요약 테이블은 서버 시작 시, 그리고 API로 recipes에
+쓸 때마다 갱신되는데, 쓰기가 몰려도 STATS_REFRESH_DELAY_MS 동안 모아 한 번만 다시 계산하므로
+요약 값은 마지막 쓰기보다 최대 그만큼 늦을 수 있습니다.
+load_recipes_data_clean.py처럼 DB에 직접 넣은 데이터는 다음 API 쓰기나 재시작 때 반영됩니다.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+from sqlalchemy import Float, func, select
+
+from .bulk import array_param
+from .database import database
+from .metrics import LATENCY_BUCKETS, registry
+from .models import recipe_stats_summary, recipes
+
+NUTRITION_COLUMNS = ("info_eng", "info_car", "info_pro", "info_fat", "info_na")
+GROUP_COLUMNS = ("rcp_way2", "rcp_pat2")
+PERCENTILES = (0.25, 0.5, 0.75, 0.9, 0.99)
+STATS_REFRESH_DELAY_MS = float(os.getenv("STATS_REFRESH_DELAY_MS", "500"))
+# 여러 워커가 동시에 요약 테이블을 다시 쓰지 않도록 잡는 advisory lock 키
+SUMMARY_LOCK_KEY = 7_000_045
+
+stats_requests = registry.counter(
+    "recipe_stats_requests_total", "통계 요청 수 (summary: 요약 테이블, query: 직접 집계)", ("source",))
+summary_refresh = registry.histogram(
+    "recipe_stats_summary_refresh_seconds", "요약 테이블 갱신 시간", (), LATENCY_BUCKETS)
+
+
+def _aggregates(postgres):
+    columns = [func.count().label("count")]
+    percentiles = array_param("percentiles", list(PERCENTILES), Float())
+    for name in NUTRITION_COLUMNS:
+        column = recipes.c[name]
+        columns += [
+            func.avg(column).label(f"{name}__mean"),
+            func.min(column).label(f"{name}__min"),
+            func.max(column).label(f"{name}__max"),
+        ]
+        if postgres:
+            columns += [
+                func.stddev_samp(column).label(f"{name}__stddev"),
+                func.percentile_cont(percentiles).within_group(column).label(f"{name}__percentiles"),
+            ]
+    return columns
+
+
+def _column_stats(record, postgres):
+    stats = {}
+    for name in NUTRITION_COLUMNS:
+        percentiles = record[f"{name}__percentiles"] if postgres else None
+        stats[name] = {
+            "mean": record[f"{name}__mean"],
+            "min": record[f"{name}__min"],
+            "max": record[f"{name}__max"],
+            "stddev": record[f"{name}__stddev"] if postgres else None,
+            "percentiles": (
+                {f"p{round(p * 100)}": value for p, value in zip(PERCENTILES, percentiles)}
+                if percentiles is not None else None
+            ),
+        }
+    return stats
+
+
+async def compute_stats(conditions, group_by=None):
+    """conditions로 거른 recipes를 group_by별로 집계 → [{"value", "count", "columns"}]"""
+    postgres = database.url.dialect == "postgresql"
+    query = select(*_aggregates(postgres)).select_from(recipes).where(*conditions)
+    if group_by is not None:
+        group_column = recipes.c[group_by]
+        query = query.add_columns(group_column.label("group_value")).group_by(group_column).order_by(group_column)
+    return [
+        {
+            "value": record["group_value"] if group_by is not None else None,
+            "count": record["count"],
+            "columns": _column_stats(record, postgres),
+        }
+        for record in await database.fetch_all(query)
+    ]
+
+
+async def refresh_summary():
+    """전체 / rcp_way2별 / rcp_pat2별 통계를 다시 계산해 요약 테이블을 교체"""
+    start = time.perf_counter()
+    now = time.time()
+    rows = []
+    for group_by in (None,) + GROUP_COLUMNS:
+        for group in await compute_stats([], group_by):
+            rows.append({
+                "group_by": group_by or "all",
+                "group_value": group["value"] or "",
+                "count": group["count"],
+                "stats": json.dumps(group["columns"]),
+                "refreshed_at": now,
+            })
+    async with database.transaction():
+        if database.url.dialect == "postgresql":
+            await database.execute(select(func.pg_advisory_xact_lock(SUMMARY_LOCK_KEY)))
+        await database.execute(recipe_stats_summary.delete())
+        if rows:
+            await database.execute(recipe_stats_summary.insert().values(rows))
+    summary_refresh.observe((), time.perf_counter() - start)
+
+
+async def read_summary(group_by, value=None):
+    """요약 테이블에서 group_by("all" / rcp_way2 / rcp_pat2) 행 조회, 아직 없으면 None"""
+    query = recipe_stats_summary.select().where(recipe_stats_summary.c.group_by == group_by)
+    if value is not None:
+        query = query.where(recipe_stats_summary.c.group_value == value)
+    records = await database.fetch_all(query.order_by(recipe_stats_summary.c.group_value))
+    if not records:
+        return None
+    groups = [
+        {"value": record["group_value"], "count": record["count"], "columns": json.loads(record["stats"])}
+        for record in records
+    ]
+    return groups, records[0]["refreshed_at"]
+
+
+async def get_stats(filters, group_by=None):
+    """요약 테이블로 답할 수 있으면 요약 테이블, 아니면 SQL 집계 결과 (RecipeStatsOut 형식)"""
+    summary = None
+    if filters.is_empty():
+        summary = await read_summary(group_by or "all")
+        if summary is not None and group_by is None:
+            summary[0][0]["value"] = None
+    else:
+        category = filters.only_category()
+        if category is not None and group_by in (None, category[0]):
+            summary = await read_summary(*category)
+            if summary is not None and group_by is None:
+                summary[0][0]["value"] = None
+
+    if summary is not None:
+        stats_requests.inc(("summary",))
+        groups, refreshed_at = summary
+        return {"group_by": group_by, "source": "summary", "refreshed_at": refreshed_at, "groups": groups}
+
+    stats_requests.inc(("query",))
+    groups = await compute_stats(filters.conditions(), group_by)
+    return {"group_by": group_by, "source": "query", "refreshed_at": None, "groups": groups}
+
+
+class SummaryRefresher:
+    """쓰기 후 mark_dirty()가 불리면 delay 뒤에 요약 테이블을 한 번 갱신"""
+
+    def __init__(self, delay_ms=STATS_REFRESH_DELAY_MS):
+        self.delay = delay_ms / 1000
+        self._dirty = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._task = None
+
+    def mark_dirty(self):
+        self._dirty.set()
+
+    def start(self):
+        # 서버가 재시작되면 이벤트 루프가 바뀌므로 이벤트도 새로 만듦
+        self._dirty = asyncio.Event()
+        self._stopping = asyncio.Event()
+        # 서버가 꺼져 있는 동안 DB에 직접 들어간 데이터도 반영되도록 시작하자마자 한 번 갱신
+        self._dirty.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        루프에 종료를 알리고 진행 중인 갱신이 끝날 때까지 기다림 (갱신 도중 취소하면 트랜잭션이 중간에 끊기므로 cancel 하지 않음)
+        delay 동안 기다리던 갱신은 건너뜀 (다음 시작 때 한 번 갱신)
+        """
+        if self._task:
+            self._stopping.set()
+            self._dirty.set()
+            await self._task
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self._dirty.wait()
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.delay)
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping.is_set():
+                return
+            self._dirty.clear()
+            try:
+                await refresh_summary()
+            except Exception as e:
+                print(f"recipe stats summary refresh failed: {e}")
+
+
+summary_refresher = SummaryRefresher()
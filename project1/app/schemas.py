@@ -25,4 +25,69 @@ class RecipeIn(BaseModel):
     hash_tag: str | None = None
 
 class RecipeOut(RecipeIn):
-    id: int
\ No newline at end of file
+    id: int
+
+class RecipeSummaryOut(BaseModel):
+    """목록 기본 응답 (본문 rcp_parts_dtls, recipe_steps, rcp_na_tip 제외)"""
+    id: int
+    rcp_seq: str
+    rcp_nm: str
+    rcp_way2: str
+    rcp_pat2: str
+    info_eng: float
+    info_car: float
+    info_pro: float
+    info_fat: float
+    info_na: float
+    hash_tag: str | None = None
+
+# bulk
+class BulkItemResult(BaseModel):
+    index: int
+    status: str  # created / updated / skipped / error
+    id: int | None = None
+    error: str | None = None
+
+class BulkOut(BaseModel):
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    failed: int = 0
+    items: list[BulkItemResult] = []
+
+# stats
+class NutritionStats(BaseModel):
+    mean: float | None = None
+    min: float | None = None
+    max: float | None = None
+    stddev: float | None = None
+    percentiles: dict[str, float] | None = None  # p25, p50, p75, p90, p99
+
+class StatsGroup(BaseModel):
+    value: str | None = None  # group_by 값 (group_by가 없으면 None)
+    count: int
+    columns: dict[str, NutritionStats]
+
+class RecipeStatsOut(BaseModel):
+    group_by: str | None = None
+    source: str  # summary / query
+    refreshed_at: float | None = None
+    groups: list[StatsGroup]
+
+# facets
+class FacetsOut(BaseModel):
+    total: int
+    facets: dict[str, dict[str, int]]  # 패싯 → {값: 레시피 수}
+
+# similar
+class SimilarRecipeOut(BaseModel):
+    id: int
+    rcp_nm: str
+    jaccard: float  # 재료 집합 Jaccard 유사도
+    shared_ingredients: list[str]
+
+# semantic search
+class SemanticSearchOut(RecipeSummaryOut):
+    score: float  # alpha * semantic_score + (1 - alpha) * keyword_score
+    semantic_score: float  # 질의와 레시피 임베딩의 코사인 유사도
+    keyword_score: float  # 질의 단어가 이름/분류/해시태그/재료에 들어 있는 비율
@@ -0,0 +1,211 @@
+"""
+의미 검색 (GET /recipes/semantic-search?q=)
+
+1. 질의를 인덱스를 만든 것과 같은 임베딩 모델로 인코딩 (app/vector_index.py)
+2. 영양/분류 필터(RecipeFilters)가 있으면 통과한 레시피 id를 먼저 SQL로 구해 그 안에서 검색
+   검색 대상이 EXACT_SEARCH_MAX 이하면 전부 내적하는 정확 검색, 그보다 많으면 IVF 검색
+   (IVF도 통과한 행만 후보로 보고, 후보가 모자라면 클러스터를 더 봄)
+3. 후보를 하이브리드 점수로 다시 정렬
+       score = alpha * 코사인 유사도 + (1 - alpha) * 키워드 점수
+   키워드 점수: 질의 단어 중 이름/분류/해시태그/재료에 들어 있는 단어의 비율
+
+인덱스는 semantic_index.py rebuild / append 로 만들고 (서버는 만들지 않음),
+서버는 검색할 때 meta.json이 바뀌었으면 다시 열어서 append 결과를 재시작 없이 반영합니다.
+API로 새로 넣은 레시피는 append 하기 전까지 검색되지 않습니다.
+"""
+
+import asyncio
+import os
+import time
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import Integer, any_, select
+
+from .bulk import array_param
+from .database import database
+from .metrics import LATENCY_BUCKETS, registry
+from .models import recipes
+from .recipe_bodies import BODY_COLUMNS, fetch_recipes
+from .similar import similar_index
+from .vector_index import (
+    DEFAULT_NPROBE, INDEX_DIR, HashingEmbedder, IVFIndex, SentenceEmbedder, append_index, build_index, load_embedder,
+    recipe_text,
+)
+
+# 검색 대상(필터를 통과한 레시피, 필터가 없으면 전체)이 이 수 이하면 IVF 대신 정확 검색
+EXACT_SEARCH_MAX = int(os.getenv("SEMANTIC_EXACT_SEARCH_MAX", "5000"))
+# 필터가 많이 걸러내는 경우를 대비해 IVF에서는 limit보다 넉넉히 후보를 뽑음
+CANDIDATE_FACTOR = 5
+MIN_CANDIDATES = 50
+QUERY_CACHE_SIZE = 1024
+EMBED_CHUNK_ROWS = 1024
+
+search_latency = registry.histogram(
+    "semantic_search_seconds", "의미 검색 단계별 시간", ("stage",), LATENCY_BUCKETS)
+
+
+def keyword_score(tokens, text):
+    """질의 단어 중 text에 들어 있는 비율 (3글자 이상이면 끝 글자를 뗀 형태도 인정: 다이어트용 → 다이어트)"""
+    if not tokens:
+        return 0.0
+    hits = sum(1 for token in tokens if token in text or (len(token) >= 3 and token[:-1] in text))
+    return hits / len(tokens)
+
+
+class SemanticSearch:
+    def __init__(self, index_dir=INDEX_DIR):
+        self.index_dir = index_dir
+        self.index = None
+        self._mtime = None
+        self._embedder = None
+        self._query_cache = {}
+
+    def load(self):
+        """인덱스가 있고 바뀌었으면 다시 열기, 없으면 None"""
+        try:
+            mtime = os.stat(os.path.join(self.index_dir, "meta.json")).st_mtime_ns
+        except FileNotFoundError:
+            self.index = None
+            return None
+        if mtime != self._mtime:
+            self.index = IVFIndex(self.index_dir)
+            self._mtime = mtime
+            if self._embedder is not None and self._embedder.name != self.index.model:
+                self._embedder = None
+                self._query_cache.clear()
+        return self.index
+
+    def embedder(self):
+        """인덱스를 만든 모델과 같은 임베딩 (처음 질의할 때 로드)"""
+        if self._embedder is None:
+            if self.index.model == HashingEmbedder.name:
+                self._embedder = HashingEmbedder()
+            else:
+                try:
+                    self._embedder = SentenceEmbedder(self.index.model)
+                except ImportError:
+                    raise HTTPException(
+                        status_code=503,
+                        detail=f"인덱스 모델({self.index.model})을 쓰려면 sentence-transformers가 필요합니다",
+                    )
+        return self._embedder
+
+    async def embed_query(self, q):
+        vector = self._query_cache.get(q)
+        if vector is None:
+            embedder = await asyncio.to_thread(self.embedder)
+            vector = (await asyncio.to_thread(embedder.encode, [q], True))[0]
+            if len(self._query_cache) >= QUERY_CACHE_SIZE:
+                self._query_cache.pop(next(iter(self._query_cache)))
+            self._query_cache[q] = vector
+        return vector
+
+    async def search(self, q, filters, limit=10, alpha=0.8, nprobe=None):
+        """하이브리드 점수 순 레시피 요약 행 목록 (SemanticSearchOut)"""
+        if self.load() is None:
+            raise HTTPException(
+                status_code=503, detail="의미 검색 인덱스가 없습니다 (python semantic_index.py rebuild)")
+        index = self.index
+
+        start = time.perf_counter()
+        query = await self.embed_query(q)
+        search_latency.observe(("embed",), time.perf_counter() - start)
+
+        start = time.perf_counter()
+        conditions = filters.conditions()
+        candidates = max(limit * CANDIDATE_FACTOR, MIN_CANDIDATES)
+        allowed = None
+        if conditions:
+            allowed = [record["id"] for record in await database.fetch_all(select(recipes.c.id).where(*conditions))]
+        if allowed is not None and len(allowed) <= EXACT_SEARCH_MAX:
+            ids, scores = index.search_ids(query, allowed, candidates)
+        elif allowed is None and nprobe is None and len(index) <= EXACT_SEARCH_MAX:
+            ids, scores = index.exact_search(query, candidates)
+        else:
+            mask = None if allowed is None else index.row_mask(allowed)
+            ids, scores = index.search(query, candidates, nprobe or DEFAULT_NPROBE, allowed=mask)
+        search_latency.observe(("search",), time.perf_counter() - start)
+        if not ids:
+            return []
+
+        start = time.perf_counter()
+        if database.url.dialect == "postgresql":
+            condition = recipes.c.id == any_(array_param("ids", ids, Integer()))
+        else:
+            condition = recipes.c.id.in_(ids)
+        # 필터를 다시 걸어 IVF 후보 중 필터에 안 맞는 것과 지워진 레시피를 제외
+        rows = {record["id"]: record for record in await database.fetch_all(
+            select(*recipes.columns).where(condition, *conditions))}
+
+        tokens = q.split()
+        results = []
+        for recipe_id, semantic in zip(ids, np.asarray(scores).tolist()):
+            record = rows.get(recipe_id)
+            if record is None:
+                continue
+            text = " ".join([
+                record["rcp_nm"], record["rcp_pat2"], record["rcp_way2"], record["hash_tag"] or "",
+                *similar_index.ingredients.get(recipe_id, ()),
+            ])
+            keyword = keyword_score(tokens, text)
+            results.append({
+                **{column.name: record[column.name] for column in recipes.columns},
+                "score": alpha * semantic + (1 - alpha) * keyword,
+                "semantic_score": semantic,
+                "keyword_score": keyword,
+            })
+        results.sort(key=lambda row: -row["score"])
+        search_latency.observe(("rerank",), time.perf_counter() - start)
+        return results[:limit]
+
+
+semantic_search = SemanticSearch()
+
+
+async def recipe_texts(conditions=()):
+    """[(id, 임베딩할 문장)] id 순"""
+    columns = [recipes.c.rcp_nm, recipes.c.hash_tag] + [c for c in BODY_COLUMNS if c.name == "rcp_parts_dtls"]
+    rows = await fetch_recipes(columns, conditions)
+    return sorted(
+        (row["id"], recipe_text(row["rcp_nm"], row["rcp_parts_dtls"], row["hash_tag"])) for row in rows)
+
+
+def embed_texts(embedder, texts, show_progress=False):
+    chunks = []
+    for offset in range(0, len(texts), EMBED_CHUNK_ROWS):
+        chunks.append(embedder.encode(texts[offset:offset + EMBED_CHUNK_ROWS]))
+        if show_progress:
+            print(f"embedded {min(offset + EMBED_CHUNK_ROWS, len(texts))}/{len(texts)}")
+    return np.vstack(chunks) if chunks else np.zeros((0, embedder.dim), dtype=np.float32)
+
+
+async def rebuild(index_dir=INDEX_DIR, embedder=None, nlist=None):
+    """모든 레시피를 인코딩해서 인덱스를 새로 만듦 → 레시피 수"""
+    embedder = embedder or load_embedder()
+    pairs = await recipe_texts()
+    vectors = embed_texts(embedder, [text for _, text in pairs], show_progress=True)
+    build_index(index_dir, [recipe_id for recipe_id, _ in pairs], vectors, embedder.name, nlist)
+    return len(pairs)
+
+
+async def append(index_dir=INDEX_DIR, embedder=None, recipe_ids=None):
+    """
+    인덱스에 없는 레시피(recipe_ids를 주면 그 레시피들, 내용이 바뀐 경우)만 인코딩해서 추가 → 추가한 수
+    인덱스가 없으면 rebuild
+    """
+    if not os.path.exists(os.path.join(index_dir, "meta.json")):
+        return await rebuild(index_dir, embedder)
+    index = IVFIndex(index_dir)
+    embedder = embedder or (HashingEmbedder() if index.model == HashingEmbedder.name else load_embedder(index.model))
+    if recipe_ids is not None:
+        if database.url.dialect == "postgresql":
+            conditions = [recipes.c.id == any_(array_param("ids", list(recipe_ids), Integer()))]
+        else:
+            conditions = [recipes.c.id.in_(list(recipe_ids))]
+        pairs = await recipe_texts(conditions)
+    else:
+        pairs = [(recipe_id, text) for recipe_id, text in await recipe_texts() if recipe_id not in index.row_of_id]
+    vectors = embed_texts(embedder, [text for _, text in pairs], show_progress=True)
+    append_index(index_dir, [recipe_id for recipe_id, _ in pairs], vectors, embedder.name)
+    return len(pairs)
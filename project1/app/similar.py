@@ -0,0 +1,214 @@
+"""
+비슷한 레시피 (GET /recipes/{id}/similar) - 재료 집합 MinHash LSH
+
+1. rcp_parts_dtls를 fix_json_formatting.structure_ingredients로 파싱하고 재료 이름을 정규화
+   ("[1인분]" 같은 머리말, "양념장 :" 같은 분류, "약간" 같은 분량 표현, 공백 제거)
+2. 재료 집합 → NUM_PERM개 해시의 MinHash 서명 (재료 집합의 Jaccard 유사도를 근사)
+3. 서명을 BANDS개 밴드로 나눠 밴드마다 같은 값을 가진 레시피끼리 버킷에 묶음
+   → 조회할 때는 같은 버킷에 있는 레시피만 후보로 보고, 실제 재료 집합 Jaccard로 다시 정렬
+   (BANDS=32, ROWS=4 이면 Jaccard 0.42 근처부터 후보로 잡힐 확률이 빠르게 올라감)
+
+서명과 정규화된 재료는 recipe_minhash 테이블에 저장해 재시작 때 다시 파싱하지 않고,
+레시피 생성/upsert 시 같은 트랜잭션에서 함께 기록합니다.
+메모리 인덱스는 서버 시작 시 만들고 이 프로세스의 쓰기를 바로 반영하며,
+다른 워커가 넣은 레시피는 조회할 때 DB에서 서명을 읽어 채웁니다.
+"""
+
+import hashlib
+import re
+import time
+
+import numpy as np
+from sqlalchemy import Integer, any_, select
+
+from fix_json_formatting import structure_ingredients
+
+from .bulk import array_param, upsert_rows
+from .database import database
+from .metrics import LATENCY_BUCKETS, registry
+from .models import recipe_minhash, recipes
+from .recipe_bodies import BODY_COLUMNS, fetch_recipes
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+BUILD_CHUNK_ROWS = 5000
+
+# 고정 시드라 프로세스/워커가 달라도 같은 재료 집합은 같은 서명
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+_HEADER = re.compile(r"\[[^\]]*\]")
+_BULLETS = re.compile(r"^[●•·\-*▶◆■]+")
+_QUANTITY_WORDS = re.compile(r"(약간|적당량|조금|소량|적당히|한줌)$")
+
+index_build = registry.histogram(
+    "similar_index_build_seconds", "MinHash LSH 인덱스 생성 시간", (), LATENCY_BUCKETS)
+
+
+def normalize_ingredient(name):
+    """재료 이름 정규화, 남는 게 없으면 빈 문자열"""
+    if ":" in name:
+        name = name.rsplit(":", 1)[1]
+    name = _BULLETS.sub("", name.strip())
+    name = re.sub(r"\s+", "", name)
+    name = _QUANTITY_WORDS.sub("", name)
+    return name
+
+
+def ingredient_set(rcp_parts_dtls):
+    """재료 원문 → 정규화된 재료 이름 집합"""
+    text = _HEADER.sub(" ", rcp_parts_dtls or "")
+    names = set()
+    for category in structure_ingredients(text)["categories"]:
+        for ingredient in category["ingredients"]:
+            name = normalize_ingredient(ingredient["name"])
+            if name:
+                names.add(name)
+    return names
+
+
+def minhash(ingredients):
+    """재료 집합 → uint32 NUM_PERM개 서명 (빈 집합이면 None)"""
+    if not ingredients:
+        return None
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(name.encode(), digest_size=4).digest(), "little") for name in ingredients],
+        dtype=np.uint64,
+    )
+    # (a * x + b) mod p 를 재료별로 계산해 순열마다 최솟값
+    with np.errstate(over="ignore"):
+        permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % MERSENNE_PRIME & MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def jaccard(a, b):
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+class SimilarIndex:
+    def __init__(self):
+        self.buckets = [{} for _ in range(BANDS)]
+        self.signatures = {}
+        self.ingredients = {}
+
+    def _band_keys(self, signature):
+        return [signature[band * ROWS:(band + 1) * ROWS].tobytes() for band in range(BANDS)]
+
+    def _remove(self, recipe_id):
+        signature = self.signatures.pop(recipe_id, None)
+        self.ingredients.pop(recipe_id, None)
+        if signature is None:
+            return
+        for bucket, key in zip(self.buckets, self._band_keys(signature)):
+            members = bucket.get(key)
+            if members is not None:
+                members.discard(recipe_id)
+                if not members:
+                    del bucket[key]
+
+    def _set(self, recipe_id, ingredients, signature):
+        self._remove(recipe_id)
+        if signature is None:
+            return
+        self.signatures[recipe_id] = signature
+        self.ingredients[recipe_id] = frozenset(ingredients)
+        for bucket, key in zip(self.buckets, self._band_keys(signature)):
+            bucket.setdefault(key, set()).add(recipe_id)
+
+    async def store(self, pairs):
+        """pairs: [(recipe_id, rcp_parts_dtls가 있는 행)] → 서명 계산 후 DB와 메모리에 반영"""
+        rows = []
+        for recipe_id, row in pairs:
+            ingredients = ingredient_set(row.get("rcp_parts_dtls"))
+            signature = minhash(ingredients)
+            self._set(recipe_id, ingredients, signature)
+            rows.append({
+                "recipe_id": recipe_id,
+                "ingredients": "\n".join(sorted(ingredients)),
+                "signature": signature.tobytes() if signature is not None else b"",
+            })
+        if rows:
+            await upsert_rows(recipe_minhash, rows, "recipe_id")
+
+    def _load_record(self, record):
+        ingredients = record["ingredients"].split("\n") if record["ingredients"] else []
+        signature = np.frombuffer(record["signature"], dtype=np.uint32) if record["signature"] else None
+        self._set(record["recipe_id"], ingredients, signature)
+
+    async def build(self):
+        """저장된 서명으로 인덱스 생성, 서명이 없는 레시피(스크립트로 적재 등)는 계산해서 저장"""
+        start = time.perf_counter()
+        self.__init__()
+        for record in await database.fetch_all(recipe_minhash.select()):
+            self._load_record(record)
+
+        missing = recipes.c.id.notin_(select(recipe_minhash.c.recipe_id))
+        parts_column = [c for c in BODY_COLUMNS if c.name == "rcp_parts_dtls"]
+        rows = await fetch_recipes(parts_column, [missing])
+        for offset in range(0, len(rows), BUILD_CHUNK_ROWS):
+            async with database.transaction():
+                await self.store([(row["id"], row) for row in rows[offset:offset + BUILD_CHUNK_ROWS]])
+        index_build.observe((), time.perf_counter() - start)
+
+    async def _ensure(self, recipe_id):
+        """다른 워커가 넣은 레시피면 DB에서 서명을 읽어 채움"""
+        if recipe_id in self.signatures:
+            return True
+        record = await database.fetch_one(recipe_minhash.select().where(recipe_minhash.c.recipe_id == recipe_id))
+        if record is None:
+            return False
+        self._load_record(record)
+        return True
+
+    def query(self, recipe_id, limit=10, min_jaccard=0.0):
+        """같은 버킷 후보를 실제 Jaccard로 정렬 → [(id, jaccard, 공통 재료)]"""
+        signature = self.signatures.get(recipe_id)
+        if signature is None:
+            return []
+        candidates = set()
+        for bucket, key in zip(self.buckets, self._band_keys(signature)):
+            candidates.update(bucket.get(key, ()))
+        candidates.discard(recipe_id)
+
+        target = self.ingredients[recipe_id]
+        scored = []
+        for candidate in candidates:
+            score = jaccard(target, self.ingredients[candidate])
+            if score >= min_jaccard:
+                scored.append((score, candidate))
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [
+            (candidate, score, sorted(target & self.ingredients[candidate]))
+            for score, candidate in scored[:limit]
+        ]
+
+    async def similar(self, recipe_id, limit=10, min_jaccard=0.0):
+        """query 결과에 레시피 이름을 붙여 반환 (SimilarRecipeOut 목록), 레시피가 없으면 None"""
+        if not await self._ensure(recipe_id):
+            exists = await database.fetch_val(select(recipes.c.id).where(recipes.c.id == recipe_id))
+            return None if exists is None else []
+        results = self.query(recipe_id, limit, min_jaccard)
+        if not results:
+            return []
+        ids = [candidate for candidate, _, _ in results]
+        if database.url.dialect == "postgresql":
+            condition = recipes.c.id == any_(array_param("ids", ids, Integer()))
+        else:
+            condition = recipes.c.id.in_(ids)
+        names = {
+            record["id"]: record["rcp_nm"]
+            for record in await database.fetch_all(select(recipes.c.id, recipes.c.rcp_nm).where(condition))
+        }
+        return [
+            {"id": candidate, "rcp_nm": names[candidate], "jaccard": score, "shared_ingredients": shared}
+            for candidate, score, shared in results
+            if candidate in names
+        ]
+
+
+similar_index = SimilarIndex()
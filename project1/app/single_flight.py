@@ -0,0 +1,31 @@
+"""
+같은 키에 대한 동시 조회 합치기 (single-flight)
+
+인기 레시피 id로 요청이 몰려도 진행 중인 조회가 있으면 새 쿼리를 만들지 않고 그 결과를 같이 기다립니다.
+결과는 캐시하지 않으며 조회가 끝나는 즉시 키가 비워집니다.
+"""
+
+import asyncio
+
+from .metrics import registry
+
+shared_calls = registry.counter(
+    "single_flight_shared_total", "진행 중인 조회에 합류해 쿼리를 생략한 요청 수", ("name",))
+
+
+class SingleFlight:
+    def __init__(self, name):
+        self.name = name
+        self._inflight = {}
+
+    async def do(self, key, fn):
+        """key에 대한 fn()이 진행 중이면 그 결과를, 아니면 새로 실행한 결과를 반환"""
+        future = self._inflight.get(key)
+        if future is None:
+            # 처음 요청한 쪽이 취소돼도 합류한 요청은 결과를 받도록 별도 task로 실행
+            future = asyncio.ensure_future(fn())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            shared_calls.inc((self.name,))
+        return await asyncio.shield(future)
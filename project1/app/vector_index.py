@@ -0,0 +1,293 @@
+"""
+레시피 임베딩 + IVF 벡터 인덱스 (의미 검색용, app/semantic_search.py)
+
+- 임베딩: 레시피 이름 + 재료 이름 + 해시태그 문장을 sentence-transformers 모델(SEMANTIC_MODEL)로 인코딩
+  sentence-transformers가 설치돼 있지 않거나 SEMANTIC_EMBEDDER=hashing 이면
+  글자 n-gram 해싱 임베딩으로 대신합니다. (모델 없이 동작하지만 철자가 겹치는 정도만 반영)
+- 인덱스: 정규화한 벡터를 float16으로 디스크에 두고 np.memmap으로 읽는 IVF
+    1. 벡터를 k-means(코사인)로 nlist개 클러스터로 나누고 각 벡터의 클러스터 번호를 저장
+    2. 검색할 때는 질의와 가까운 nprobe개 클러스터의 벡터만 내적해서 상위 k개
+  새 레시피는 다시 학습하지 않고 가장 가까운 클러스터에 붙여 파일 끝에 추가합니다. (append)
+
+index_dir/
+    meta.json      : {"model", "dim", "count", "nlist", "trained_count", "updated_at"}
+    centroids.npy  : (nlist, dim) float32
+    vectors.f16    : (count, dim) float16, 행 순서는 추가한 순서
+    ids.i64        : (count,) 레시피 id, 같은 id가 다시 추가되면 마지막 행만 사용
+    lists.i32      : (count,) 클러스터 번호
+
+DB에 의존하지 않아 load_recipes_data_clean.py 같은 스크립트에서도 그대로 씁니다.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+
+import numpy as np
+
+from fix_json_formatting import structure_ingredients
+
+MODEL_NAME = os.getenv("SEMANTIC_MODEL", "dragonkue/snowflake-arctic-embed-l-v2.0-ko")
+INDEX_DIR = os.getenv("SEMANTIC_INDEX_DIR", "data/semantic_index")
+HASHING_DIM = 512
+# nlist 기본값은 4 * sqrt(벡터 수), k-means는 클러스터당 이만큼 뽑은 표본으로 학습
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+DEFAULT_NPROBE = int(os.getenv("SEMANTIC_NPROBE", "8"))
+EXACT_CHUNK_ROWS = 16384
+
+_HEADER = re.compile(r"\[[^\]]*\]")
+
+
+def recipe_text(rcp_nm, rcp_parts_dtls, hash_tag):
+    """임베딩할 문장: "이름. 재료: a, b, c. 해시태그" """
+    names = []
+    for category in structure_ingredients(_HEADER.sub(" ", rcp_parts_dtls or ""))["categories"]:
+        for ingredient in category["ingredients"]:
+            name = ingredient["name"].rsplit(":", 1)[-1].strip()
+            if name and name not in names:
+                names.append(name)
+    parts = [rcp_nm]
+    if names:
+        parts.append("재료: " + ", ".join(names))
+    if hash_tag:
+        parts.append(hash_tag)
+    return ". ".join(parts)
+
+
+class HashingEmbedder:
+    """글자 2~3-gram을 부호 있는 해시로 HASHING_DIM 차원에 모은 벡터 (모델이 없을 때)"""
+
+    name = f"hashing-char-ngram-{HASHING_DIM}"
+    dim = HASHING_DIM
+
+    def _vector(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        text = re.sub(r"\s+", " ", text.strip())
+        for n in (2, 3):
+            for i in range(len(text) - n + 1):
+                digest = hashlib.blake2b(text[i:i + n].encode(), digest_size=8).digest()
+                value = int.from_bytes(digest, "little")
+                vector[value % self.dim] += 1.0 if value >> 63 else -1.0
+        return vector
+
+    def encode(self, texts, query=False):
+        return normalize(np.vstack([self._vector(text) for text in texts]) if texts else
+                         np.zeros((0, self.dim), dtype=np.float32))
+
+
+class SentenceEmbedder:
+    """sentence-transformers 모델 (생성할 때 import 하고 모델을 로드)"""
+
+    def __init__(self, model_name=MODEL_NAME, batch_size=64):
+        from sentence_transformers import SentenceTransformer
+
+        self.name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts, query=False):
+        # arctic-embed 계열은 질의에 "query" 프롬프트를 붙여야 문서 벡터와 맞음
+        prompt_name = "query" if query and "query" in getattr(self.model, "prompts", {}) else None
+        vectors = self.model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            prompt_name=prompt_name,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
+        return vectors.astype(np.float32, copy=False)
+
+
+def load_embedder(model_name=MODEL_NAME):
+    """SentenceEmbedder, sentence-transformers가 없으면 HashingEmbedder"""
+    if os.getenv("SEMANTIC_EMBEDDER") == "hashing":
+        return HashingEmbedder()
+    try:
+        return SentenceEmbedder(model_name)
+    except ImportError:
+        print("semantic search: sentence-transformers is not installed, using hashing embeddings")
+        return HashingEmbedder()
+
+
+def normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def kmeans(vectors, nlist, iterations=KMEANS_ITERATIONS, seed=0):
+    """정규화된 벡터의 spherical k-means → (nlist, dim) 중심"""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * KMEANS_SAMPLE_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        # 클러스터 번호순으로 정렬해 클러스터별 합을 한 번에 계산
+        counts = np.bincount(assignment, minlength=nlist)
+        nonempty = np.flatnonzero(counts)
+        starts = (np.cumsum(counts) - counts)[nonempty]
+        centroids[nonempty] = np.add.reduceat(sample[np.argsort(assignment, kind="stable")], starts, axis=0)
+        # 빈 클러스터는 임의의 벡터로 다시 시작
+        empty = np.flatnonzero(counts == 0)
+        centroids[empty] = sample[rng.integers(sample_size, size=len(empty))]
+        centroids = normalize(centroids)
+    return centroids
+
+
+def _write_meta(index_dir, meta):
+    tmp_path = os.path.join(index_dir, "meta.json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(index_dir, "meta.json"))
+
+
+def build_index(index_dir, ids, vectors, model, nlist=None):
+    """전체 벡터로 새 인덱스를 만들어 index_dir을 교체"""
+    vectors = normalize(vectors)
+    if nlist is None:
+        nlist = int(4 * np.sqrt(len(vectors)))
+    nlist = max(1, min(nlist, len(vectors)))
+    centroids = kmeans(vectors, nlist) if len(vectors) else np.zeros((0, vectors.shape[1]), dtype=np.float32)
+
+    tmp_dir = index_dir.rstrip("/") + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, "centroids.npy"), centroids)
+    vectors.astype(np.float16).tofile(os.path.join(tmp_dir, "vectors.f16"))
+    np.asarray(ids, dtype=np.int64).tofile(os.path.join(tmp_dir, "ids.i64"))
+    assignment = np.argmax(vectors @ centroids.T, axis=1) if len(vectors) else np.zeros(0)
+    assignment.astype(np.int32).tofile(os.path.join(tmp_dir, "lists.i32"))
+    _write_meta(tmp_dir, {
+        "model": model, "dim": int(vectors.shape[1]), "count": len(vectors), "nlist": nlist,
+        "trained_count": len(vectors), "updated_at": time.time(),
+    })
+
+    old_dir = index_dir.rstrip("/") + ".old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(index_dir):
+        os.replace(index_dir, old_dir)
+    os.replace(tmp_dir, index_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+class IVFIndex:
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.model = self.meta["model"]
+        self.dim = self.meta["dim"]
+        count = self.meta["count"]
+        self.centroids = np.load(os.path.join(index_dir, "centroids.npy"))
+        # meta.json의 count까지만 읽으므로 append 도중인 파일도 안전하게 열 수 있음
+        self.vectors = np.memmap(os.path.join(index_dir, "vectors.f16"), dtype=np.float16, mode="r",
+                                 shape=(count, self.dim)) if count else np.zeros((0, self.dim), dtype=np.float16)
+        self.ids = np.fromfile(os.path.join(index_dir, "ids.i64"), dtype=np.int64, count=count)
+        lists = np.fromfile(os.path.join(index_dir, "lists.i32"), dtype=np.int32, count=count)
+
+        # 같은 id가 여러 번 추가됐으면 마지막 행만 살림
+        self.row_of_id = {int(recipe_id): row for row, recipe_id in enumerate(self.ids)}
+        self.live = np.zeros(count, dtype=bool)
+        self.live[list(self.row_of_id.values())] = True
+        order = np.argsort(lists, kind="stable")
+        order = order[self.live[order]]
+        bounds = np.searchsorted(lists[order], np.arange(len(self.centroids) + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self.centroids))]
+
+    def __len__(self):
+        return len(self.row_of_id)
+
+    def _top(self, rows, query, k):
+        if len(rows) == 0:
+            return [], np.zeros(0, dtype=np.float32)
+        rows = np.sort(rows)  # memmap은 순서대로 읽을 때 빠름
+        scores = self.vectors[rows].astype(np.float32) @ query
+        if len(rows) > k:
+            top = np.argpartition(-scores, k)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return self.ids[rows[order]].tolist(), scores[order]
+
+    def row_mask(self, recipe_ids):
+        """recipe_ids의 (살아 있는) 행만 True인 불리언 배열"""
+        mask = np.zeros(len(self.ids), dtype=bool)
+        rows = [self.row_of_id[i] for i in recipe_ids if i in self.row_of_id]
+        mask[rows] = True
+        return mask
+
+    def search(self, query, k=10, nprobe=DEFAULT_NPROBE, allowed=None):
+        """
+        질의 벡터와 가까운 nprobe개 클러스터에서 코사인 상위 k개 → (id 목록, 점수)
+
+        allowed(row_mask 결과)를 주면 그 행만 후보로 보고, nprobe개 클러스터에서 k개가 안 모이면
+        다음으로 가까운 클러스터를 k개가 모이거나 클러스터가 다 떨어질 때까지 더 봅니다.
+        """
+        query = normalize(query.reshape(1, -1))[0]
+        order = np.argsort(-(self.centroids @ query))
+        chunks = []
+        found = 0
+        for probed, list_no in enumerate(order):
+            if probed >= nprobe and (allowed is None or found >= k):
+                break
+            rows = self.lists[list_no]
+            if allowed is not None:
+                rows = rows[allowed[rows]]
+            chunks.append(rows)
+            found += len(rows)
+        rows = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+        return self._top(rows, query, k)
+
+    def search_ids(self, query, recipe_ids, k=10):
+        """recipe_ids(필터를 통과한 레시피) 중에서만 정확 검색"""
+        query = normalize(query.reshape(1, -1))[0]
+        rows = np.array([self.row_of_id[i] for i in recipe_ids if i in self.row_of_id], dtype=np.int64)
+        return self._top(rows, query, k)
+
+    def exact_search(self, query, k=10):
+        """전체 벡터와 내적 (연속된 구간 단위로 읽음)"""
+        query = normalize(query.reshape(1, -1))[0]
+        scores = np.full(len(self.ids), -np.inf, dtype=np.float32)
+        for offset in range(0, len(self.ids), EXACT_CHUNK_ROWS):
+            chunk = self.vectors[offset:offset + EXACT_CHUNK_ROWS]
+            scores[offset:offset + len(chunk)] = chunk.astype(np.float32) @ query
+        scores[~self.live] = -np.inf
+        k = min(k, len(self))
+        if k == 0:
+            return [], np.zeros(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return self.ids[top].tolist(), scores[top]
+
+
+def append_index(index_dir, ids, vectors, model):
+    """새 벡터를 가장 가까운 클러스터에 붙여 파일 끝에 추가 (이미 있는 id는 새 행으로 대체)"""
+    with open(os.path.join(index_dir, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    if meta["model"] != model:
+        raise ValueError(f"인덱스 모델({meta['model']})과 임베딩 모델({model})이 다릅니다. rebuild 하세요")
+    if not len(ids):
+        return meta
+    vectors = normalize(vectors)
+    centroids = np.load(os.path.join(index_dir, "centroids.npy"))
+    assignment = np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+
+    # 이전 append가 중간에 멈췄으면 meta.json의 count 뒤에 남은 부분을 잘라냄
+    count = meta["count"]
+    for filename, itemsize in (("vectors.f16", 2 * meta["dim"]), ("ids.i64", 8), ("lists.i32", 4)):
+        with open(os.path.join(index_dir, filename), "r+b") as f:
+            f.truncate(count * itemsize)
+            f.seek(0, os.SEEK_END)
+            data = {"vectors.f16": vectors.astype(np.float16),
+                    "ids.i64": np.asarray(ids, dtype=np.int64),
+                    "lists.i32": assignment}[filename]
+            f.write(data.tobytes())
+    meta.update(count=count + len(ids), updated_at=time.time())
+    _write_meta(index_dir, meta)
+    return meta
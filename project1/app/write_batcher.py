@@ -0,0 +1,156 @@
+"""
+단건 POST 쓰기 합치기 (opt-in)
+
+WRITE_COALESCING=1 이면 POST /recipes/, POST /notes/ 의 INSERT를 테이블별 WriteBatcher로 보냅니다.
+WRITE_BATCH_WINDOW_MS 동안 또는 WRITE_BATCH_MAX_SIZE개까지 모인 행을 INSERT 한 번으로 기록하고,
+각 행에 배정된 id를 기다리던 요청에 돌려줍니다. (id 배정은 bulk._insert_chunk 참고)
+after_insert가 있으면 (id, 행) 목록으로 같은 트랜잭션 안에서 호출합니다. (recipes 본문 저장)
+배치 중 한 행이라도 실패하면(예: rcp_seq 중복) 그 배치만 행 단위로 다시 넣어 각 요청이 자기 오류를 받습니다.
+
+배치 크기, 첫 행의 대기 시간, flush 시간은 /metrics 에 기록됩니다.
+"""
+
+import asyncio
+import os
+import time
+
+from .bulk import _insert_chunk
+from .database import database
+from .metrics import COUNT_BUCKETS, LATENCY_BUCKETS, registry
+
+WRITE_COALESCING = os.getenv("WRITE_COALESCING", "0") == "1"
+WRITE_BATCH_WINDOW_MS = float(os.getenv("WRITE_BATCH_WINDOW_MS", "2"))
+WRITE_BATCH_MAX_SIZE = int(os.getenv("WRITE_BATCH_MAX_SIZE", "256"))
+
+batch_size = registry.histogram(
+    "write_batch_size", "flush 한 번에 INSERT 한 행 수", ("table",), COUNT_BUCKETS + (200, 500, 1000))
+batch_wait = registry.histogram(
+    "write_batch_wait_seconds", "배치 첫 행이 flush 될 때까지 기다린 시간", ("table",), LATENCY_BUCKETS)
+batch_flush = registry.histogram(
+    "write_batch_flush_seconds", "배치 INSERT 실행 시간", ("table",), LATENCY_BUCKETS)
+batch_fallbacks = registry.counter(
+    "write_batch_fallbacks_total", "실패해서 행 단위로 다시 넣은 배치 수", ("table",))
+
+# stop()이 큐에 넣는 종료 표시
+_STOP = object()
+
+
+class WriteBatcher:
+    def __init__(self, table, window_ms=WRITE_BATCH_WINDOW_MS, max_size=WRITE_BATCH_MAX_SIZE, after_insert=None):
+        self.table = table
+        self.after_insert = after_insert
+        self.window = window_ms / 1000
+        self.max_size = max_size
+        self.queue = asyncio.Queue()
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        루프에 종료 표시를 넣고 진행 중인 flush가 끝날 때까지 기다린 뒤,
+        그 사이 큐에 남은 행을 모두 기록 (flush 도중 취소하면 트랜잭션이 중간에 끊기므로 cancel 하지 않음)
+        """
+        if self._task:
+            await self.queue.put(_STOP)
+            await self._task
+            self._task = None
+            while not self.queue.empty():
+                await self._flush([item for item in self._drain(self.max_size) if item is not _STOP])
+
+    async def insert(self, row):
+        """row를 다음 배치에 넣고 생성된 id 반환"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((row, future, time.perf_counter()))
+        return await future
+
+    def _drain(self, limit):
+        """큐에서 기다리지 않고 최대 limit개를 꺼냄 (limit을 넘는 행은 큐에 그대로 남김)"""
+        items = []
+        while not self.queue.empty() and len(items) < limit:
+            items.append(self.queue.get_nowait())
+        return items
+
+    async def _collect(self):
+        items = [await self.queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window
+        while len(items) < self.max_size and items[-1] is not _STOP:
+            items.extend(self._drain(self.max_size - len(items)))
+            timeout = deadline - loop.time()
+            if len(items) >= self.max_size or timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def _flush(self, items):
+        if not items:
+            return
+        labels = (self.table.name,)
+        start = time.perf_counter()
+        batch_size.observe(labels, len(items))
+        batch_wait.observe(labels, start - items[0][2])
+        try:
+            async with database.transaction():
+                results = await _insert_chunk(
+                    self.table, [(i, row) for i, (row, _, _) in enumerate(items)], None, "error")
+                # _insert_chunk 결과의 index(items 위치)로 id를 기다리는 요청과 짝지음
+                ids = {index: row_id for index, _, row_id in results}
+                if self.after_insert is not None:
+                    await self.after_insert([(ids[i], row) for i, (row, _, _) in enumerate(items)])
+            for i, (_, future, _) in enumerate(items):
+                if not future.done():
+                    future.set_result(ids[i])
+        except Exception:
+            # 한 행 때문에 배치 전체가 롤백됨 → 행 단위로 다시 넣어 오류를 해당 요청에만 전달
+            batch_fallbacks.inc(labels)
+            names = [c.name for c in self.table.columns if c.name != "id"]
+            for row, future, _ in items:
+                try:
+                    async with database.transaction():
+                        row_id = await database.execute(
+                            self.table.insert().values(**{name: row[name] for name in names if name in row}))
+                        if self.after_insert is not None:
+                            await self.after_insert([(row_id, row)])
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(row_id)
+        batch_flush.observe(labels, time.perf_counter() - start)
+
+    async def _run(self):
+        while True:
+            items = await self._collect()
+            await self._flush([item for item in items if item is not _STOP])
+            if any(item is _STOP for item in items):
+                return
+
+
+batchers = {}
+
+
+def get_batcher(table):
+    """쓰기 합치기가 켜져 있으면 table의 WriteBatcher, 아니면 None"""
+    return batchers.get(table.name)
+
+
+def start_batchers(tables, after_insert=None):
+    """after_insert: {테이블 이름: 콜백}"""
+    if not WRITE_COALESCING:
+        return
+    for table in tables:
+        batcher = WriteBatcher(table, after_insert=(after_insert or {}).get(table.name))
+        batcher.start()
+        batchers[table.name] = batcher
+
+
+async def stop_batchers():
+    for batcher in batchers.values():
+        await batcher.stop()
+    batchers.clear()
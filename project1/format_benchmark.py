@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GET /recipes/ 응답 형식/필드 선택별 크기와 지연 비교
+
+사용법:
+    python format_benchmark.py
+    python format_benchmark.py --base-url http://localhost:8000 --repeat 20 --fields id,rcp_nm,info_eng
+
+(전체 컬럼, fields 지정) x (JSON, MessagePack, Arrow IPC) 조합마다
+응답 바이트 수, 요청~본문 수신까지의 지연(중앙값), 클라이언트 디코딩 시간(중앙값)을 출력합니다.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import statistics
+import time
+
+import aiohttp
+
+BASE_URL = "http://localhost:8000"
+FORMATS = {
+    "json": "application/json",
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def decode(name, body):
+    if name == "msgpack":
+        import msgpack
+        return msgpack.unpackb(body, raw=False)
+    if name == "arrow":
+        import pyarrow as pa
+        return pa.ipc.open_stream(io.BytesIO(body)).read_all()
+    return json.loads(body)
+
+
+async def run(base_url=BASE_URL, repeat=20, fields="id,rcp_nm,info_eng"):
+    results = []
+    async with aiohttp.ClientSession() as session:
+        for label, params in (("all", {}), (fields, {"fields": fields})):
+            for name, media_type in FORMATS.items():
+                latencies, decode_times = [], []
+                size = 0
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    async with session.get(f"{base_url}/recipes/", params=params, headers={"Accept": media_type}) as response:
+                        response.raise_for_status()
+                        body = await response.read()
+                    latencies.append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    decode(name, body)
+                    decode_times.append(time.perf_counter() - start)
+                    size = len(body)
+                results.append({
+                    "fields": label,
+                    "format": name,
+                    "bytes": size,
+                    "latency_ms": statistics.median(latencies) * 1000,
+                    "decode_ms": statistics.median(decode_times) * 1000,
+                })
+
+    print(f"{'fields':<22} {'format':<8} {'bytes':>12} {'latency(ms)':>12} {'decode(ms)':>11}")
+    for row in results:
+        print(f"{row['fields']:<22} {row['format']:<8} {row['bytes']:>12,} {row['latency_ms']:>12.2f} {row['decode_ms']:>11.2f}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="응답 형식/필드 선택 벤치마크")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--fields", default="id,rcp_nm,info_eng")
+    args = parser.parse_args()
+    asyncio.run(run(args.base_url, args.repeat, args.fields))
+
+
+if __name__ == "__main__":
+    main()
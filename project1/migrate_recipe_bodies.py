@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+recipes의 본문 컬럼을 recipe_bodies로 옮기는 마이그레이션 (서버를 띄우기 전에 한 번 실행)
+
+사용법:
+    python migrate_recipe_bodies.py              # 옮긴 뒤 VACUUM FULL ANALYZE recipes
+    python migrate_recipe_bodies.py --no-vacuum
+
+서버도 시작할 때 같은 마이그레이션을 advisory lock을 잡고 실행하지만,
+테이블 전체를 잠그는 VACUUM FULL은 이 명령에서만 합니다.
+"""
+
+import argparse
+
+from app.database import engine, metadata
+from app.recipe_bodies import migrate_legacy_columns, vacuum_recipes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="recipes 본문 컬럼 → recipe_bodies 마이그레이션")
+    parser.add_argument("--no-vacuum", action="store_true", help="VACUUM FULL 생략")
+    args = parser.parse_args()
+
+    metadata.create_all(engine)
+    count = migrate_legacy_columns(engine)
+    if count:
+        print(f"[OK] {count}개 레시피 본문 이동")
+    else:
+        print("[OK] 옮길 본문 컬럼이 없습니다")
+    if not args.no_vacuum:
+        vacuum_recipes(engine)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+의미 검색 인덱스 생성/추가/벤치마크 (GET /recipes/semantic-search)
+
+사용법:
+    python semantic_index.py rebuild                 # 전체 레시피 인코딩 후 인덱스 새로 생성
+    python semantic_index.py rebuild --nlist 32
+    python semantic_index.py append                  # 인덱스에 없는 레시피만 추가
+    python semantic_index.py append --ids 12,13      # 내용이 바뀐 레시피 다시 인코딩
+    python semantic_index.py bench --queries 200 --k 10 --nprobe 1,2,4,8,16
+
+bench는 레시피 이름(과 예시 자연어 질의)을 질의로 써서 nprobe별로
+정확 검색(전체 내적) 대비 recall@k와 검색 지연(중앙값/p95), 질의 인코딩 시간을 출력합니다.
+임베딩 모델은 SEMANTIC_MODEL (기본 dragonkue/snowflake-arctic-embed-l-v2.0-ko),
+sentence-transformers가 없으면 해싱 임베딩으로 만듭니다. (app/vector_index.py)
+서버는 인덱스 파일이 바뀌면 다음 검색 때 다시 읽으므로 재시작하지 않아도 됩니다.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from app.database import database
+from app.semantic_search import INDEX_DIR, append, rebuild, recipe_texts
+from app.vector_index import HashingEmbedder, IVFIndex, load_embedder
+
+EXAMPLE_QUERIES = [
+    "다이어트용 매콤한 반찬",
+    "아이 간식으로 좋은 달콤한 디저트",
+    "저염 국물 요리",
+    "단백질 많은 닭가슴살 요리",
+    "두부를 활용한 채식 반찬",
+]
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def bench(index_dir=INDEX_DIR, n_queries=200, k=10, nprobes=(1, 2, 4, 8, 16)):
+    index = IVFIndex(index_dir)
+    embedder = HashingEmbedder() if index.model == HashingEmbedder.name else load_embedder(index.model)
+    names = [text.split(". ", 1)[0] for _, text in await recipe_texts()]
+    random.seed(0)
+    queries = EXAMPLE_QUERIES + random.sample(names, min(n_queries, len(names)))
+
+    embed_times = []
+    vectors = []
+    for query in queries:
+        start = time.perf_counter()
+        vectors.append(embedder.encode([query], True)[0])
+        embed_times.append(time.perf_counter() - start)
+
+    exact_times = []
+    truth = []
+    for vector in vectors:
+        start = time.perf_counter()
+        truth.append(set(index.exact_search(vector, k)[0]))
+        exact_times.append(time.perf_counter() - start)
+
+    print(f"index: {len(index)} recipes, nlist={len(index.lists)}, dim={index.dim}, model={index.model}")
+    print(f"queries: {len(queries)}, query encoding median {statistics.median(embed_times) * 1000:.2f}ms")
+    print(f"{'nprobe':>8} {'recall@' + str(k):>10} {'p50(ms)':>9} {'p95(ms)':>9}")
+    print(f"{'exact':>8} {1.0:>10.3f} {statistics.median(exact_times) * 1000:>9.3f} "
+          f"{_percentile(exact_times, 0.95) * 1000:>9.3f}")
+    results = []
+    for nprobe in nprobes:
+        times, recalls = [], []
+        for vector, expected in zip(vectors, truth):
+            start = time.perf_counter()
+            ids, _ = index.search(vector, k, nprobe)
+            times.append(time.perf_counter() - start)
+            recalls.append(len(expected & set(ids)) / max(len(expected), 1))
+        results.append({
+            "nprobe": nprobe,
+            "recall": statistics.mean(recalls),
+            "p50_ms": statistics.median(times) * 1000,
+            "p95_ms": _percentile(times, 0.95) * 1000,
+        })
+        row = results[-1]
+        print(f"{nprobe:>8} {row['recall']:>10.3f} {row['p50_ms']:>9.3f} {row['p95_ms']:>9.3f}")
+    return results
+
+
+async def run(args):
+    await database.connect()
+    try:
+        if args.command == "rebuild":
+            count = await rebuild(args.index_dir, nlist=args.nlist)
+            print(f"[OK] 인덱스 생성: {count}개 레시피 → {args.index_dir}")
+        elif args.command == "append":
+            ids = [int(x) for x in args.ids.split(",") if x.strip()] if args.ids else None
+            count = await append(args.index_dir, recipe_ids=ids)
+            print(f"[OK] 인덱스에 {count}개 레시피 추가 → {args.index_dir}")
+        else:
+            nprobes = [int(x) for x in args.nprobe.split(",")]
+            await bench(args.index_dir, args.queries, args.k, nprobes)
+    finally:
+        await database.disconnect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="의미 검색 인덱스 관리")
+    parser.add_argument("command", choices=["rebuild", "append", "bench"])
+    parser.add_argument("--index-dir", default=INDEX_DIR)
+    parser.add_argument("--nlist", type=int, default=None, help="rebuild: IVF 클러스터 수 (기본: 4 * sqrt(레시피 수))")
+    parser.add_argument("--ids", default=None, help="append: 다시 인코딩할 레시피 id (쉼표 구분)")
+    parser.add_argument("--queries", type=int, default=200, help="bench: 질의로 쓸 레시피 이름 수")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", default="1,2,4,8,16")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -24,7 +24,7 @@ async def simple_query_examples():
 
         # 1. 모든 레시피 가져오기 (첫 5개만)
         print("\n1. 전체 레시피 목록 (첫 5개)")
-        async with session.get(f"{BASE_URL}/recipes/") as response:
+        async with session.get(f"{BASE_URL}/recipes/", params={"fields": "id,rcp_nm"}) as response:
             if response.status == 200:
                 recipes = await response.json()
                 print(f"   총 {len(recipes)}개 레시피 중 첫 5개:")
@@ -46,22 +46,28 @@ async def simple_query_examples():
             else:
                 print(f"   오류: {response.status}")
 
-        # 3. 영양 정보 분석
+        # 3. 영양 정보 분석 (서버에서 집계, 전체 목록을 내려받지 않음)
         print("\n3. 영양 정보 통계")
-        async with session.get(f"{BASE_URL}/recipes/") as response:
+        async with session.get(f"{BASE_URL}/recipes/stats") as response:
             if response.status == 200:
-                recipes = await response.json()
-
-                calories = [r['info_eng'] for r in recipes]
-                carbs = [r['info_car'] for r in recipes]
-                proteins = [r['info_pro'] for r in recipes]
-
-                print(f"   평균 칼로리: {sum(calories)/len(calories):.1f}kcal")
-                print(f"   평균 탄수화물: {sum(carbs)/len(carbs):.1f}g")
-                print(f"   평균 단백질: {sum(proteins)/len(proteins):.1f}g")
-
-                print(f"   최고 칼로리 레시피: {max(recipes, key=lambda x: x['info_eng'])['rcp_nm']} ({max(calories)}kcal)")
-                print(f"   최저 칼로리 레시피: {min(recipes, key=lambda x: x['info_eng'])['rcp_nm']} ({min(calories)}kcal)")
+                stats = (await response.json())['groups'][0]['columns']
+                calories = stats['info_eng']
+
+                print(f"   평균 칼로리: {calories['mean']:.1f}kcal")
+                print(f"   평균 탄수화물: {stats['info_car']['mean']:.1f}g")
+                print(f"   평균 단백질: {stats['info_pro']['mean']:.1f}g")
+
+                # 최고/최저 칼로리 레시피 이름은 칼로리 필터로 해당 레시피만 조회
+                async with session.get(f"{BASE_URL}/recipes/", params={"min_eng": calories['max'], "fields": "rcp_nm"}) as top:
+                    top_recipes = await top.json()
+                async with session.get(f"{BASE_URL}/recipes/", params={"max_eng": calories['min'], "fields": "rcp_nm"}) as bottom:
+                    bottom_recipes = await bottom.json()
+                if top_recipes:
+                    print(f"   최고 칼로리 레시피: {top_recipes[0]['rcp_nm']} ({calories['max']}kcal)")
+                if bottom_recipes:
+                    print(f"   최저 칼로리 레시피: {bottom_recipes[0]['rcp_nm']} ({calories['min']}kcal)")
+            else:
+                print(f"   오류: {response.status}")
 
 async def custom_search():
     """사용자 정의 검색"""
@@ -95,8 +101,9 @@ async def test_specific_queries():
     print("=" * 60)
 
     async with aiohttp.ClientSession() as session:
-        # 모든 레시피 데이터 가져오기
-        async with session.get(f"{BASE_URL}/recipes/") as response:
+        # 모든 레시피 데이터 가져오기 (목록 기본 응답에는 본문이 없으므로 필요한 본문 필드를 지정)
+        fields = "id,rcp_nm,rcp_way2,rcp_pat2,info_eng,info_pro,info_na,rcp_parts_dtls,rcp_na_tip"
+        async with session.get(f"{BASE_URL}/recipes/", params={"fields": fields}) as response:
             if response.status != 200:
                 print("레시피 데이터를 가져올 수 없습니다.")
                 return
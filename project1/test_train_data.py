@@ -14,6 +14,11 @@ import re
 from typing import List, Dict, Any
 
 BASE_URL = "http://localhost:8000"
+# GET /recipes/ 는 기본으로 요약 컬럼만 주므로 쿼리에 쓰이는 본문 컬럼까지 명시해서 요청
+RECIPE_FIELDS = (
+    "rcp_seq,rcp_nm,rcp_way2,rcp_pat2,info_eng,info_car,info_pro,info_fat,info_na,"
+    "rcp_parts_dtls,recipe_steps,rcp_na_tip,hash_tag"
+)
 
 def load_train_data(file_path: str) -> List[Dict]:
     """JSONL 파일에서 학습 데이터 로드 (다중 라인 JSON 지원)"""
@@ -117,7 +122,7 @@ async def test_train_data():
 
     # API에서 레시피 데이터 가져오기
     async with aiohttp.ClientSession() as session:
-        async with session.get(f"{BASE_URL}/recipes/") as response:
+        async with session.get(f"{BASE_URL}/recipes/", params={"fields": RECIPE_FIELDS}) as response:
             if response.status != 200:
                 print("FastAPI 서버에서 레시피 데이터를 가져올 수 없습니다.")
                 print("서버가 실행 중인지 확인해주세요.")
@@ -0,0 +1,157 @@
+import json
+
+import pytest
+
+from conftest import POSTGRES, make_recipe, requires_postgres
+
+
+def _post_bulk(client, items, on_conflict=None):
+    params = {"on_conflict": on_conflict} if on_conflict else {}
+    response = client.post("/recipes/bulk", json=items, params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_json_array_creates_items_in_order(client):
+    result = _post_bulk(client, [make_recipe(i) for i in range(5)])
+
+    assert result["created"] == 5
+    assert result["failed"] == 0
+    assert [item["index"] for item in result["items"]] == list(range(5))
+    for item in result["items"]:
+        recipe = client.get(f"/recipes/{item['id']}").json()
+        assert recipe["rcp_seq"] == str(item["index"])
+
+
+def test_ndjson_body(client):
+    lines = [json.dumps(make_recipe(i), ensure_ascii=False) for i in range(3)]
+    # 마지막 줄에 개행이 없어도, 중간에 빈 줄이 있어도 됨
+    body = "\n".join(lines[:2]) + "\n\n" + lines[2]
+    response = client.post("/recipes/bulk", content=body.encode(), headers={"content-type": "application/x-ndjson"})
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["created"] == 3
+    assert [item["status"] for item in result["items"]] == ["created"] * 3
+
+
+def test_per_item_validation_errors(client):
+    items = [make_recipe(1), {"rcp_seq": "missing-fields"}, make_recipe(2, info_eng="not a number")]
+    result = _post_bulk(client, items)
+
+    assert result["created"] == 1
+    assert result["failed"] == 2
+    statuses = {item["index"]: item for item in result["items"]}
+    assert statuses[0]["status"] == "created"
+    assert statuses[1]["status"] == "error" and "rcp_nm" in statuses[1]["error"]
+    assert statuses[2]["status"] == "error" and "info_eng" in statuses[2]["error"]
+
+
+def test_ndjson_invalid_line_is_item_error(client):
+    body = json.dumps(make_recipe(1)) + "\n{not json}\n" + json.dumps(make_recipe(2))
+    result = client.post("/recipes/bulk", content=body, headers={"content-type": "application/x-ndjson"}).json()
+
+    assert [item["status"] for item in result["items"]] == ["created", "error", "created"]
+
+
+def test_malformed_json_body_is_400(client):
+    response = client.post("/recipes/bulk", content=b"[{", headers={"content-type": "application/json"})
+    assert response.status_code == 400
+    response = client.post("/recipes/bulk", json={"rcp_seq": "1"})
+    assert response.status_code == 400
+
+
+def test_duplicate_key_within_request(client):
+    result = _post_bulk(client, [make_recipe(1), make_recipe(1, rcp_nm="다른 이름")])
+
+    assert [item["status"] for item in result["items"]] == ["created", "error"]
+    assert "rcp_seq" in result["items"][1]["error"]
+
+
+def test_on_conflict_error_reports_existing_keys(client):
+    _post_bulk(client, [make_recipe(1), make_recipe(2)])
+    result = _post_bulk(client, [make_recipe(2, rcp_nm="바뀐 이름"), make_recipe(3)])
+
+    assert [item["status"] for item in result["items"]] == ["error", "created"]
+    assert result["items"][0]["error"] == "이미 존재하는 키"
+    names = {recipe["rcp_seq"]: recipe["rcp_nm"] for recipe in client.get("/recipes/").json()}
+    assert names == {"1": "레시피1", "2": "레시피2", "3": "레시피3"}
+
+
+def test_unknown_on_conflict_is_rejected(client):
+    response = client.post("/recipes/bulk", json=[make_recipe(1)], params={"on_conflict": "merge"})
+    assert response.status_code == 422
+
+
+@requires_postgres
+def test_on_conflict_skip(client):
+    first = _post_bulk(client, [make_recipe(1)])
+    result = _post_bulk(client, [make_recipe(1, rcp_nm="무시됨"), make_recipe(2)], on_conflict="skip")
+
+    assert [item["status"] for item in result["items"]] == ["skipped", "created"]
+    assert result["items"][0]["id"] is None
+    recipe = client.get(f"/recipes/{first['items'][0]['id']}").json()
+    assert recipe["rcp_nm"] == "레시피1"
+
+
+@requires_postgres
+def test_on_conflict_update(client):
+    first = _post_bulk(client, [make_recipe(1)])
+    result = _post_bulk(client, [make_recipe(1, rcp_nm="바뀐 이름", recipe_steps="새 조리법"), make_recipe(2)],
+                        on_conflict="update")
+
+    assert [item["status"] for item in result["items"]] == ["updated", "created"]
+    assert result["items"][0]["id"] == first["items"][0]["id"]
+    recipe = client.get(f"/recipes/{first['items'][0]['id']}").json()
+    assert recipe["rcp_nm"] == "바뀐 이름"
+    assert recipe["recipe_steps"] == "새 조리법"
+
+
+@pytest.mark.skipif(POSTGRES, reason="SQLite 전용 동작")
+def test_skip_and_update_need_postgres(client):
+    for on_conflict in ("skip", "update"):
+        response = client.post("/recipes/bulk", json=[make_recipe(1)], params={"on_conflict": on_conflict})
+        assert response.status_code == 400
+
+
+@requires_postgres
+def test_on_conflict_error_with_concurrent_insert(reset_db):
+    """다른 트랜잭션이 같은 키를 넣고 나중에 커밋해도 배치 전체가 실패하지 않고 그 항목만 오류"""
+    import asyncio
+
+    import asyncpg
+
+    from app.bulk import _insert_chunk
+    from app.database import database, engine
+    from app.models import recipes
+
+    dsn = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    row = {k: v for k, v in make_recipe(1).items() if k in recipes.c}
+
+    async def scenario():
+        await database.connect()
+        other = await asyncpg.connect(dsn)
+        try:
+            # 다른 연결에서 키 1을 넣고 커밋하지 않은 상태 (미리 SELECT 해도 보이지 않음)
+            transaction = other.transaction()
+            await transaction.start()
+            columns = ", ".join(row)
+            placeholders = ", ".join(f"${i + 1}" for i in range(len(row)))
+            await other.execute(f"INSERT INTO recipes ({columns}) VALUES ({placeholders})", *row.values())
+
+            async def insert():
+                async with database.transaction():
+                    return await _insert_chunk(
+                        recipes, [(0, make_recipe(1)), (1, make_recipe(2))], "rcp_seq", "error")
+
+            task = asyncio.create_task(insert())
+            await asyncio.sleep(0.3)
+            assert not task.done()  # 키 1의 커밋을 기다리는 중
+            await transaction.commit()
+            return await task
+        finally:
+            await other.close()
+            await database.disconnect()
+
+    results = asyncio.run(scenario())
+    assert [(index, status) for index, status, _ in results] == [(0, "error"), (1, "created")]
@@ -0,0 +1,44 @@
+import msgpack
+import pytest
+
+from conftest import make_recipe
+
+from app.encoding import ARROW, JSON, MSGPACK, negotiate
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, JSON),
+    ("", JSON),
+    ("*/*", JSON),
+    ("text/html", JSON),
+    ("application/msgpack", MSGPACK),
+    ("text/html, application/x-msgpack;charset=utf-8", MSGPACK),
+    # q가 높은 쪽이 먼저 나온 쪽보다 우선
+    ("application/json;q=0.5, application/vnd.apache.arrow.stream", ARROW),
+    ("application/msgpack;q=0.4, */*;q=0.9", JSON),
+    # q가 같으면 먼저 나온 형식
+    ("application/msgpack;q=0.8, application/vnd.apache.arrow.stream;q=0.8", MSGPACK),
+    # q=0은 받지 않겠다는 뜻
+    ("application/msgpack;q=0, application/vnd.apache.arrow.stream;q=0.1", ARROW),
+    ("application/msgpack; q=0.0", JSON),
+    ("application/msgpack;q=abc", JSON),
+])
+def test_negotiate_respects_q_values(accept, expected):
+    assert negotiate(accept) == expected
+
+
+def test_every_encoded_response_varies_on_accept(client):
+    recipe_id = client.post("/recipes/", json=make_recipe(1)).json()["id"]
+
+    for accept in ("application/json", "application/msgpack", "application/vnd.apache.arrow.stream"):
+        for path, params in [("/recipes/", {}), ("/recipes/batch", {"ids": str(recipe_id)}),
+                             ("/recipes/batch", {"ids": "999999"})]:
+            response = client.get(path, params=params, headers={"accept": accept})
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith(accept)
+            assert response.headers["vary"] == "Accept"
+
+    response = client.get("/recipes/", headers={"accept": "application/msgpack;q=0, application/json"})
+    assert response.headers["content-type"].startswith(JSON)
+    response = client.get("/recipes/", params={"fields": "id,rcp_nm"}, headers={"accept": "application/msgpack"})
+    assert msgpack.unpackb(response.content) == [{"id": recipe_id, "rcp_nm": "레시피1"}]
@@ -0,0 +1,141 @@
+import random
+
+from conftest import make_recipe
+
+from app.facets import FACETS, FacetIndex, bucket_label, facet_values
+
+PATTERNS = ["반찬", "국&찌개", "후식", "일품"]
+WAYS = ["끓이기", "볶기", "굽기", "찌기"]
+TAGS = ["다이어트", "저염", "고단백", "간편", "아이", "채식"]
+
+
+def _random_rows(n, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(1, n + 1):
+        rows.append({
+            "id": i,
+            "rcp_pat2": rng.choice(PATTERNS),
+            "rcp_way2": rng.choice(WAYS),
+            "hash_tag": ", ".join(rng.sample(TAGS, rng.randint(0, 3))) or None,
+            "info_eng": rng.uniform(0, 700),
+            "info_car": rng.uniform(0, 80),
+            "info_pro": rng.uniform(0, 40),
+            "info_fat": rng.uniform(0, 40),
+            "info_na": rng.uniform(0, 1500),
+        })
+    return rows
+
+
+def _naive_counts(rows, filters):
+    """행마다 facet_values를 보고 직접 센 결과 (같은 패싯 OR, 패싯끼리 AND, 자기 패싯 제외)"""
+    values = [facet_values(row) for row in rows]
+
+    def matches(row_values, skip=None):
+        return all(
+            set(selected) & set(row_values[facet])
+            for facet, selected in filters.items() if selected and facet != skip)
+
+    facets = {}
+    for facet in FACETS:
+        counts = {}
+        for row_values in values:
+            if matches(row_values, skip=facet):
+                for value in row_values[facet]:
+                    counts[value] = counts.get(value, 0) + 1
+        facets[facet] = counts
+    return {"total": sum(1 for row_values in values if matches(row_values)), "facets": facets}
+
+
+def _index(rows):
+    index = FacetIndex()
+    for row in rows:
+        index.add(row)
+    return index
+
+
+def test_counts_match_naive_count():
+    rows = _random_rows(500)
+    index = _index(rows)
+    cases = [
+        {},
+        {"rcp_pat2": ["반찬"]},
+        {"rcp_pat2": ["반찬", "후식"], "rcp_way2": ["볶기"]},
+        {"hash_tag": ["저염", "채식"], "info_eng": ["100~200", "~100"]},
+        {"info_na": ["1000~"], "rcp_way2": ["굽기", "찌기"], "hash_tag": ["간편"]},
+        {"rcp_pat2": ["없는값"]},
+    ]
+    for filters in cases:
+        assert index.counts(filters) == _naive_counts(rows, filters), filters
+
+
+def test_own_facet_filter_is_not_applied_to_its_counts():
+    index = _index(_random_rows(200))
+
+    result = index.counts({"rcp_pat2": ["반찬"]})
+
+    assert set(result["facets"]["rcp_pat2"]) == set(PATTERNS)
+    assert result["total"] == result["facets"]["rcp_pat2"]["반찬"]
+
+
+def test_upsert_moves_row_between_values():
+    rows = _random_rows(50)
+    index = _index(rows)
+    changed = {**rows[0], "rcp_pat2": "새분류", "hash_tag": "새태그", "info_eng": 50.0}
+    rows[0] = changed
+
+    index.add(changed)
+
+    assert index.counts({}) == _naive_counts(rows, {})
+    assert index.counts({"hash_tag": ["새태그"]})["total"] == 1
+
+
+def test_hash_tag_limit_keeps_top_and_selected_tags():
+    rows = [{**make_recipe(i), "id": i, "hash_tag": f"공통, 태그{i % 5}, 희귀{i}"} for i in range(1, 51)]
+    index = _index(rows)
+
+    tags = index.counts({}, hash_tag_limit=3)["facets"]["hash_tag"]
+    assert list(tags)[0] == "공통" and tags["공통"] == 50
+    assert len(tags) == 3
+
+    # 고른 태그는 상위가 아니어도 개수가 나옴
+    tags = index.counts({"hash_tag": ["희귀7"]}, hash_tag_limit=3)["facets"]["hash_tag"]
+    assert tags["희귀7"] == 1
+    assert len(tags) == 4
+
+
+def test_top_tags_follow_writes():
+    rows = [{**make_recipe(i), "id": i, "hash_tag": "가"} for i in range(1, 4)]
+    rows += [{**make_recipe(i), "id": i, "hash_tag": f"나, 다{i}"} for i in range(4, 6)]
+    index = _index(rows)
+    assert list(index.counts({}, hash_tag_limit=1)["facets"]["hash_tag"]) == ["가"]
+
+    for i in range(6, 10):
+        index.add({**make_recipe(i), "id": i, "hash_tag": "나"})
+
+    assert list(index.counts({}, hash_tag_limit=1)["facets"]["hash_tag"]) == ["나"]
+
+
+def test_bucket_label():
+    edges = (100, 200, 300)
+    assert [bucket_label(edges, value) for value in (0, 100, 150, 299.9, 300, 1000)] == [
+        "~100", "100~200", "100~200", "200~300", "300~", "300~"]
+
+
+def test_facets_endpoint_reflects_writes(client):
+    client.post("/recipes/bulk", json=[
+        make_recipe(1, rcp_pat2="반찬", hash_tag="저염, 다이어트", info_eng=80.0),
+        make_recipe(2, rcp_pat2="반찬", rcp_way2="볶기", hash_tag="저염", info_eng=250.0),
+    ])
+    client.post("/recipes/", json=make_recipe(3, rcp_pat2="후식", hash_tag="다이어트", info_eng=120.0))
+
+    result = client.get("/recipes/facets", params={"hash_tag": "저염"}).json()
+
+    assert result["total"] == 2
+    assert result["facets"]["rcp_pat2"] == {"반찬": 2}
+    assert result["facets"]["hash_tag"] == {"다이어트": 2, "저염": 2}
+    assert result["facets"]["info_eng"] == {"~100": 1, "200~300": 1}
+
+    result = client.get("/recipes/facets", params=[("rcp_pat2", "반찬"), ("rcp_pat2", "후식")]).json()
+    assert result["total"] == 3
+    assert client.get("/recipes/facets", params={"hash_tag_limit": 0}).status_code == 422
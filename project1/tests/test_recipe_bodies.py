@@ -0,0 +1,199 @@
+import asyncio
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, Text, inspect, select
+
+from conftest import make_recipe
+
+from app.body_codec import BODY_FIELDS, DICT_MIN_SAMPLES, BodyCodec, encode_body, split_row, train_dictionary
+from app.database import database, engine, metadata
+from app.main import app
+from app.models import compression_dicts, recipe_bodies, recipes
+from app.recipe_bodies import ALL_COLUMNS, fetch_recipe, fetch_recipes, migrate_legacy_columns
+
+INGREDIENTS = ["두부", "애호박", "양파", "된장", "대파", "마늘", "감자", "당근", "돼지고기", "고추장", "간장", "달걀"]
+UNITS = ["1모", "1/2개", "2큰술", "1작은술", "100g", "3쪽", "약간"]
+
+
+@pytest.fixture(autouse=True)
+def fresh_codec(monkeypatch):
+    """테스트마다 DB를 새로 만들므로 이전 테스트에서 읽은 사전이 남지 않게 코덱도 새로"""
+    codec = BodyCodec()
+    monkeypatch.setattr("app.recipe_bodies.codec", codec)
+    return codec
+
+
+def _run(scenario):
+    async def wrapped():
+        await database.connect()
+        try:
+            return await scenario()
+        finally:
+            await database.disconnect()
+    return asyncio.run(wrapped())
+
+
+def _body(rng, seq):
+    parts = ", ".join(f"{name} {rng.choice(UNITS)}" for name in rng.sample(INGREDIENTS, rng.randint(3, 7)))
+    steps = "\n".join(f"{i}. {rng.choice(INGREDIENTS)}를 손질해 냄비에 넣고 {rng.randint(1, 20)}분 끓인다."
+                      for i in range(1, rng.randint(2, 6)))
+    tip = None if seq % 3 == 0 else f"{rng.choice(INGREDIENTS)} 대신 {rng.choice(INGREDIENTS)}를 쓰면 나트륨이 줄어요."
+    return {"rcp_parts_dtls": parts, "recipe_steps": steps, "rcp_na_tip": tip}
+
+
+def _recipes(n, seed=0):
+    rng = random.Random(seed)
+    return [make_recipe(seq, **_body(rng, seq)) for seq in range(n)]
+
+
+def test_codec_round_trip_without_dictionary():
+    codec = BodyCodec()
+    body = {"rcp_parts_dtls": "두부 1모, 🌶 고추 약간 ", "recipe_steps": "1. 썬다.\r\n2. 끓인다.", "rcp_na_tip": None}
+
+    dict_id, blob = codec.compress(body)
+
+    assert dict_id == 0
+    assert codec.decompress(dict_id, blob) == body
+
+
+def test_codec_round_trip_with_dictionary():
+    bodies = [split_row(row)[1] for row in _recipes(300)]
+    data = train_dictionary([encode_body(body) for body in bodies])
+    assert data is not None
+    plain = BodyCodec()
+    codec = BodyCodec()
+    old_blob = codec.compress(bodies[0])[1]
+    codec.add_dictionary(5, data)
+
+    compressed = [codec.compress(body) for body in bodies]
+
+    assert {dict_id for dict_id, _ in compressed} == {5}
+    assert [codec.decompress(dict_id, blob) for dict_id, blob in compressed] == bodies
+    # 사전을 추가해도 사전 없이 압축한 예전 본문은 그대로 풀림
+    assert codec.decompress(0, old_blob) == bodies[0]
+    assert sum(len(blob) for _, blob in compressed) < sum(len(plain.compress(body)[1]) for body in bodies)
+
+
+def test_train_dictionary_needs_enough_samples():
+    samples = [encode_body(split_row(row)[1]) for row in _recipes(DICT_MIN_SAMPLES - 1)]
+
+    assert train_dictionary(samples) is None
+
+
+def test_list_defaults_to_summary_and_body_fields_are_opt_in(client):
+    recipe = make_recipe(1, rcp_na_tip="소금 대신 레몬즙")
+    created = client.post("/recipes/", json=recipe).json()
+
+    listed = client.get("/recipes/").json()
+    assert len(listed) == 1
+    assert BODY_FIELDS[0] not in listed[0] and listed[0]["rcp_nm"] == "레시피1"
+
+    listed = client.get("/recipes/", params={"fields": "id,recipe_steps,rcp_na_tip"}).json()
+    assert listed == [{"id": created["id"], "recipe_steps": recipe["recipe_steps"], "rcp_na_tip": "소금 대신 레몬즙"}]
+
+    batch = client.get("/recipes/batch", params={"ids": str(created["id"])}).json()
+    assert batch[0]["rcp_parts_dtls"] == recipe["rcp_parts_dtls"]
+
+    assert client.get("/recipes/", params={"fields": "id,nope"}).status_code == 400
+
+
+def test_fetch_recipes_joins_bodies_only_when_requested(reset_db):
+    items = _recipes(3)
+    with TestClient(app) as client:
+        result = client.post("/recipes/bulk", json=items).json()
+    ids = [item["id"] for item in result["items"]]
+
+    async def scenario():
+        summary = await fetch_recipes([recipes.c.rcp_nm])
+        full = await fetch_recipes(ALL_COLUMNS, [recipes.c.id == ids[1]])
+        one = await fetch_recipe(ids[2])
+        missing = await fetch_recipe(999999)
+        return summary, full, one, missing
+
+    summary, full, one, missing = _run(scenario)
+
+    # 순서 조회용 id는 요청하지 않아도 포함, 본문은 읽지 않음
+    assert sorted((row["id"], row["rcp_nm"]) for row in summary) == [(i, item["rcp_nm"]) for i, item in zip(ids, items)]
+    assert all(set(row.keys()) == {"id", "rcp_nm"} for row in summary)
+    assert len(full) == 1
+    assert {field: full[0][field] for field in BODY_FIELDS} == split_row(items[1])[1]
+    assert one["rcp_seq"] == items[2]["rcp_seq"] and one["recipe_steps"] == items[2]["recipe_steps"]
+    assert missing is None
+
+
+def test_prepare_dictionaries_trains_once_and_recompresses(reset_db, fresh_codec):
+    items = _recipes(150)
+    with TestClient(app) as client:
+        # 시작 시점에는 본문이 없어 사전 없이 압축
+        ids = [item["id"] for item in client.post("/recipes/bulk", json=items).json()["items"]]
+    with engine.connect() as conn:
+        assert {row.dict_id for row in conn.execute(select(recipe_bodies.c.dict_id))} == {0}
+
+    # 재시작 → 쌓인 본문으로 사전 학습 후 전체를 다시 압축
+    with TestClient(app) as client:
+        assert fresh_codec.current_id != 0
+        recipe = client.get(f"/recipes/{ids[10]}").json()
+    assert {field: recipe[field] for field in BODY_FIELDS} == split_row(items[10])[1]
+    with engine.connect() as conn:
+        dict_ids = [row.id for row in conn.execute(select(compression_dicts.c.id))]
+        assert {row.dict_id for row in conn.execute(select(recipe_bodies.c.dict_id))} == set(dict_ids)
+
+    # 사전이 이미 있으면 다시 학습하지 않음
+    with TestClient(app):
+        pass
+    with engine.connect() as conn:
+        assert [row.id for row in conn.execute(select(compression_dicts.c.id))] == dict_ids
+
+
+def _create_legacy_recipes():
+    """본문 컬럼이 recipes에 그대로 있던 예전 스키마"""
+    legacy = Table(
+        "recipes",
+        MetaData(),
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("rcp_seq", String, unique=True, nullable=False),
+        Column("rcp_nm", String, nullable=False),
+        Column("rcp_way2", String, nullable=False),
+        Column("rcp_pat2", String, nullable=False),
+        Column("info_eng", Float, nullable=False),
+        Column("info_car", Float, nullable=False),
+        Column("info_pro", Float, nullable=False),
+        Column("info_fat", Float, nullable=False),
+        Column("info_na", Float, nullable=False),
+        Column("rcp_parts_dtls", Text, nullable=False),
+        Column("recipe_steps", Text, nullable=False),
+        Column("rcp_na_tip", Text, nullable=True),
+        Column("hash_tag", Text, nullable=True),
+    )
+    metadata.drop_all(engine)
+    legacy.create(engine)
+    metadata.create_all(engine)
+    return legacy
+
+
+@pytest.mark.parametrize("count", [5, 150], ids=["no-dictionary", "dictionary"])
+def test_migrate_legacy_columns_keeps_bodies_byte_identical(count):
+    legacy = _create_legacy_recipes()
+    items = _recipes(count)
+    # 공백/개행/이모지/빈 문자열도 바이트 그대로 남아야 함
+    items[0].update(rcp_parts_dtls=" 두부 1모 ,\t🌶 약간 ", recipe_steps="1. 썬다.\r\n2. 끓인다.\n", rcp_na_tip="")
+    with engine.begin() as conn:
+        conn.execute(legacy.insert(), items)
+
+    assert migrate_legacy_columns(engine) == count
+    assert migrate_legacy_columns(engine) == 0
+    with engine.connect() as conn:
+        assert set(BODY_FIELDS).isdisjoint(c["name"] for c in inspect(conn).get_columns("recipes"))
+        assert len(conn.execute(select(compression_dicts.c.id)).fetchall()) == (count >= DICT_MIN_SAMPLES)
+        ids = {row.rcp_seq: row.id for row in conn.execute(select(recipes.c.id, recipes.c.rcp_seq))}
+
+    with TestClient(app) as client:
+        for item in items:
+            recipe = client.get(f"/recipes/{ids[item['rcp_seq']]}").json()
+            for field in BODY_FIELDS:
+                original = item[field]
+                assert (recipe[field] is None) == (original is None)
+                if original is not None:
+                    assert recipe[field].encode("utf-8") == original.encode("utf-8")
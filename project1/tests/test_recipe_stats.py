@@ -0,0 +1,56 @@
+import asyncio
+
+from app import recipe_stats
+from app.recipe_stats import SummaryRefresher
+
+
+def test_stop_waits_for_in_flight_refresh(monkeypatch):
+    events = []
+
+    async def slow_refresh():
+        events.append("start")
+        await asyncio.sleep(0.05)
+        events.append("done")
+
+    monkeypatch.setattr(recipe_stats, "refresh_summary", slow_refresh)
+
+    async def scenario():
+        refresher = SummaryRefresher(delay_ms=0)
+        refresher.start()
+        while not events:
+            await asyncio.sleep(0.001)
+        # 갱신 도중에 stop → 취소하지 않고 끝날 때까지 기다림
+        await refresher.stop()
+
+    asyncio.run(scenario())
+    assert events == ["start", "done"]
+
+
+def test_stop_during_delay_skips_pending_refresh(monkeypatch):
+    calls = []
+
+    async def refresh():
+        calls.append(1)
+
+    monkeypatch.setattr(recipe_stats, "refresh_summary", refresh)
+
+    refresher = SummaryRefresher(delay_ms=10_000)
+
+    async def stop_during_delay():
+        refresher.start()
+        await asyncio.sleep(0.01)
+        # delay가 끝나길 기다리지 않고 바로 종료
+        await asyncio.wait_for(refresher.stop(), 1)
+
+    async def restart():
+        refresher.delay = 0
+        refresher.start()
+        while not calls:
+            await asyncio.sleep(0.001)
+        await refresher.stop()
+
+    asyncio.run(stop_during_delay())
+    assert calls == []
+    # 재시작하면 (새 이벤트 루프에서도) 시작하자마자 갱신
+    asyncio.run(restart())
+    assert calls == [1]
@@ -0,0 +1,129 @@
+import itertools
+import random
+
+from fastapi.testclient import TestClient
+
+from conftest import make_recipe
+
+from app.database import engine
+from app.main import app
+from app.models import recipe_minhash
+from app.similar import NUM_PERM, SimilarIndex, ingredient_set, jaccard, minhash, similar_index
+
+POOL = [f"재료{i}" for i in range(200)]
+
+
+def test_ingredient_set_normalizes_names():
+    text = "[1인분] 두부 1모, 애호박 1/2개\n양념장 : 간장 1큰술, 소금 약간, 두부 1모"
+
+    assert ingredient_set(text) == {"두부", "애호박", "간장", "소금"}
+    assert ingredient_set("") == set()
+    assert ingredient_set(None) == set()
+
+
+def test_minhash_is_deterministic_and_estimates_jaccard():
+    rng = random.Random(0)
+    for _ in range(20):
+        shared = rng.sample(POOL, 10)
+        a = set(shared + rng.sample(POOL, rng.randint(0, 10)))
+        b = set(shared + rng.sample(POOL, rng.randint(0, 10)))
+
+        estimate = (minhash(a) == minhash(b)).mean()
+
+        assert abs(estimate - jaccard(a, b)) < 0.2
+    assert (minhash({"두부", "간장"}) == minhash({"간장", "두부"})).all()
+    assert minhash({"두부"}).shape == (NUM_PERM,)
+    assert minhash(set()) is None
+
+
+def _index(sets):
+    index = SimilarIndex()
+    for recipe_id, ingredients in sets.items():
+        index._set(recipe_id, ingredients, minhash(ingredients))
+    return index
+
+
+def test_query_finds_similar_sets_in_jaccard_order():
+    rng = random.Random(1)
+    base = set(rng.sample(POOL, 20))
+    sets = {1: base}
+    # 재료를 하나씩 바꿔 가며 점점 덜 비슷한 레시피 + 무관한 레시피
+    for recipe_id, changed in enumerate(range(1, 5), start=2):
+        sets[recipe_id] = set(list(base)[changed:]) | {f"다른{recipe_id}_{i}" for i in range(changed)}
+    for recipe_id in range(10, 60):
+        sets[recipe_id] = set(rng.sample(POOL, 20))
+    index = _index(sets)
+
+    # Jaccard 0.67 이상은 BANDS=32, ROWS=4 에서 후보로 잡힐 확률이 0.999 이상
+    results = index.query(1, limit=5, min_jaccard=0.6)
+
+    expected = sorted(
+        ((recipe_id, jaccard(base, other)) for recipe_id, other in sets.items()
+         if recipe_id != 1 and jaccard(base, other) >= 0.6),
+        key=lambda item: (-item[1], item[0]))
+    assert [(recipe_id, score) for recipe_id, score, _ in results] == expected[:5]
+    assert [recipe_id for recipe_id, _, _ in results] == [2, 3, 4, 5]
+    assert results[0][2] == sorted(base & sets[2])
+
+
+def test_lsh_recall_for_high_jaccard_pairs():
+    rng = random.Random(2)
+    sets = {}
+    for group in range(30):
+        core = rng.sample(POOL, 15)
+        for member in range(3):
+            sets[group * 3 + member] = set(core + rng.sample(POOL, 2))
+    index = _index(sets)
+
+    pairs = [
+        (a, b) for a, b in itertools.permutations(sets, 2) if jaccard(sets[a], sets[b]) >= 0.7]
+    found = sum(1 for a, b in pairs if b in {recipe_id for recipe_id, _, _ in index.query(a, limit=100)})
+
+    assert pairs
+    assert found / len(pairs) >= 0.95
+
+
+def test_update_moves_recipe_out_of_old_buckets():
+    base = set(POOL[:10])
+    index = _index({1: base, 2: set(base)})
+    assert [recipe_id for recipe_id, _, _ in index.query(1)] == [2]
+
+    index._set(2, set(POOL[100:110]), minhash(set(POOL[100:110])))
+
+    assert index.query(1) == []
+    assert index.query(3) == []
+
+
+def test_similar_endpoint(client):
+    client.post("/recipes/bulk", json=[
+        make_recipe(1, rcp_parts_dtls="두부 1모, 애호박 1/2개, 양파 1/2개, 된장 2큰술, 대파 1대"),
+        make_recipe(2, rcp_parts_dtls="두부 1/2모, 애호박 1개, 양파 1개, 된장 1큰술, 고추 1개"),
+        make_recipe(3, rcp_parts_dtls="밀가루 200g, 설탕 50g, 버터 30g"),
+        make_recipe(4, rcp_parts_dtls=""),
+    ])
+    ids = {recipe["rcp_seq"]: recipe["id"] for recipe in client.get("/recipes/").json()}
+
+    results = client.get(f"/recipes/{ids['1']}/similar").json()
+
+    assert [row["id"] for row in results] == [ids["2"]]
+    assert results[0]["rcp_nm"] == "레시피2"
+    assert results[0]["shared_ingredients"] == sorted(["두부", "애호박", "양파", "된장"])
+    assert abs(results[0]["jaccard"] - 4 / 6) < 1e-9
+    assert client.get(f"/recipes/{ids['1']}/similar", params={"min_jaccard": 0.9}).json() == []
+    assert client.get(f"/recipes/{ids['4']}/similar").json() == []
+    assert client.get("/recipes/999999/similar").status_code == 404
+
+
+def test_startup_build_fills_missing_signatures(reset_db):
+    with TestClient(app) as client:
+        recipe = client.post("/recipes/", json=make_recipe(1)).json()
+        client.post("/recipes/", json=make_recipe(2))
+    with engine.begin() as conn:
+        conn.execute(recipe_minhash.delete())
+
+    # 서버 재시작 → 서명이 없는 레시피는 다시 계산해서 저장
+    with TestClient(app) as client:
+        assert len(similar_index.signatures) == 2
+        assert len(client.get(f"/recipes/{recipe['id']}/similar").json()) == 1
+    with engine.connect() as conn:
+        assert len(conn.execute(recipe_minhash.select()).fetchall()) == 2
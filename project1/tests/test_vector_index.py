@@ -0,0 +1,178 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from conftest import make_recipe
+
+from app import semantic_search as semantic_search_module
+from app.vector_index import (
+    INDEX_DIR, HashingEmbedder, IVFIndex, append_index, build_index, normalize, recipe_text,
+)
+
+
+def _clustered(n, dim=32, n_clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    labels = rng.integers(0, n_clusters, n)
+    return normalize(centers[labels] + rng.normal(size=(n, dim)) * 0.3), labels
+
+
+def _index_dir(tmp_path, ids, vectors, nlist=10):
+    index_dir = str(tmp_path / "index")
+    build_index(index_dir, ids, vectors, "test", nlist=nlist)
+    return index_dir
+
+
+def test_build_and_append_round_trip(tmp_path):
+    vectors, _ = _clustered(300)
+    index_dir = _index_dir(tmp_path, np.arange(1, 201), vectors[:200])
+
+    meta = append_index(index_dir, np.arange(201, 301), vectors[200:], "test")
+    index = IVFIndex(index_dir)
+
+    assert meta["count"] == 300 and meta["trained_count"] == 200
+    assert len(index) == 300
+    assert index.ids.tolist() == list(range(1, 301))
+    # float16로 저장해도 자기 자신이 가장 가까움
+    for row in (0, 150, 250):
+        found, scores = index.exact_search(vectors[row], 1)
+        assert found == [row + 1]
+        assert abs(scores[0] - 1.0) < 1e-2
+    assert sum(len(rows) for rows in index.lists) == 300
+
+
+def test_append_rejects_other_model(tmp_path):
+    vectors, _ = _clustered(50)
+    index_dir = _index_dir(tmp_path, np.arange(50), vectors)
+
+    with pytest.raises(ValueError):
+        append_index(index_dir, [99], vectors[:1], "other-model")
+
+
+def test_reappended_id_supersedes_old_row(tmp_path):
+    vectors, _ = _clustered(101)
+    index_dir = _index_dir(tmp_path, np.arange(1, 101), vectors[:100])
+
+    append_index(index_dir, [5], vectors[100:], "test")
+    index = IVFIndex(index_dir)
+
+    assert len(index) == 100
+    assert index.row_of_id[5] == 100
+    assert not index.live[4] and index.live[100]
+    assert index.exact_search(vectors[100], 1)[0] == [5]
+    # 예전 벡터(행 4)는 더 이상 검색되지 않음
+    assert index.exact_search(vectors[4], 1)[1][0] < 0.99
+    assert 4 not in np.concatenate(index.lists)
+    assert index.search(vectors[100], 1, nprobe=10)[0] == [5]
+    assert index.search_ids(vectors[4], [5], 1)[0] == [5]
+
+
+def test_append_truncates_leftovers_of_interrupted_append(tmp_path):
+    vectors, _ = _clustered(120)
+    index_dir = _index_dir(tmp_path, np.arange(100), vectors[:100])
+    # meta.json을 쓰기 전에 멈춘 append: 파일 끝에 일부만 기록된 행
+    for filename, size in (("vectors.f16", 2 * 32 * 3 + 7), ("ids.i64", 8 * 2), ("lists.i32", 4)):
+        with open(f"{index_dir}/{filename}", "ab") as f:
+            f.write(b"\xff" * size)
+    assert len(IVFIndex(index_dir)) == 100
+
+    append_index(index_dir, np.arange(100, 120), vectors[100:], "test")
+    index = IVFIndex(index_dir)
+
+    assert index.ids.tolist() == list(range(120))
+    assert index.exact_search(vectors[110], 1)[0] == [110]
+    assert (tmp_path / "index" / "ids.i64").stat().st_size == 120 * 8
+
+
+def test_ivf_recall_against_exact_search(tmp_path):
+    vectors, _ = _clustered(3000)
+    index = IVFIndex(_index_dir(tmp_path, np.arange(3000), vectors, nlist=30))
+
+    recalls = []
+    for query in vectors[:100]:
+        expected, _ = index.exact_search(query, 10)
+        assert index.search(query, 10, nprobe=30)[0] == expected
+        recalls.append(len(set(index.search(query, 10, nprobe=8)[0]) & set(expected)) / 10)
+    assert np.mean(recalls) >= 0.95
+
+
+def test_filtered_ivf_search_only_returns_allowed_rows(tmp_path):
+    vectors, labels = _clustered(2000)
+    ids = np.arange(1, 2001)
+    build_index(str(tmp_path / "index"), ids, vectors, "test", nlist=20)
+    index = IVFIndex(str(tmp_path / "index"))
+
+    recalls = []
+    for query in range(50):
+        # 질의와 다른 클러스터에 있는 레시피만 필터를 통과
+        allowed = ids[labels != labels[query]][:300].tolist()
+        mask = index.row_mask(allowed)
+
+        found, scores = index.search(vectors[query], 10, nprobe=1, allowed=mask)
+        assert len(found) == 10
+        assert set(found) <= set(allowed)
+        assert (np.diff(scores) <= 0).all()
+
+        found, _ = index.search(vectors[query], 10, nprobe=8, allowed=mask)
+        expected, _ = index.search_ids(vectors[query], allowed, 10)
+        recalls.append(len(set(found) & set(expected)) / 10)
+    assert np.mean(recalls) >= 0.9
+
+
+def test_filtered_ivf_search_with_fewer_matches_than_k(tmp_path):
+    vectors, _ = _clustered(500)
+    build_index(str(tmp_path / "index"), np.arange(500), vectors, "test", nlist=10)
+    index = IVFIndex(str(tmp_path / "index"))
+
+    found, _ = index.search(vectors[0], 10, nprobe=1, allowed=index.row_mask([3, 250, 499, 12345]))
+
+    assert sorted(found) == [3, 250, 499]
+
+
+def _build_from_api(client):
+    embedder = HashingEmbedder()
+    rows = [client.get(f"/recipes/{recipe['id']}").json() for recipe in client.get("/recipes/").json()]
+    texts = [recipe_text(row["rcp_nm"], row["rcp_parts_dtls"], row["hash_tag"]) for row in rows]
+    build_index(INDEX_DIR, [row["id"] for row in rows], embedder.encode(texts), embedder.name, nlist=8)
+
+
+def test_semantic_search_filter_on_ivf_path(client, monkeypatch):
+    recipes = [make_recipe(i, rcp_nm=f"매콤한 닭가슴살 볶음{i}", rcp_pat2="일품", info_eng=500.0) for i in range(60)]
+    recipes += [make_recipe(100 + i, rcp_nm=f"된장국{i}", rcp_pat2="반찬", info_eng=150.0) for i in range(5)]
+    client.post("/recipes/bulk", json=recipes)
+    _build_from_api(client)
+    # 필터를 통과한 레시피가 적어도 IVF 경로를 타게 함
+    monkeypatch.setattr(semantic_search_module, "EXACT_SEARCH_MAX", 0)
+
+    results = client.get("/recipes/semantic-search", params={
+        "q": "매콤한 닭가슴살", "rcp_pat2": "반찬", "max_eng": 200, "nprobe": 1, "limit": 10}).json()
+
+    assert len(results) == 5
+    assert {row["rcp_pat2"] for row in results} == {"반찬"}
+
+
+def test_semantic_search_without_index_is_503(client):
+    shutil.rmtree(INDEX_DIR, ignore_errors=True)
+
+    response = client.get("/recipes/semantic-search", params={"q": "된장국"})
+
+    assert response.status_code == 503
+
+
+def test_semantic_search_exact_path_and_filters(client):
+    client.post("/recipes/bulk", json=[
+        make_recipe(1, rcp_nm="된장국", rcp_pat2="국&찌개", info_eng=120.0),
+        make_recipe(2, rcp_nm="된장찌개", rcp_pat2="국&찌개", info_eng=300.0),
+        make_recipe(3, rcp_nm="초코 케이크", rcp_pat2="후식", rcp_parts_dtls="밀가루 200g, 초콜릿 100g", info_eng=450.0),
+    ])
+    _build_from_api(client)
+
+    results = client.get("/recipes/semantic-search", params={"q": "된장국", "limit": 3}).json()
+    assert results[0]["rcp_nm"] == "된장국"
+    assert [row["score"] for row in results] == sorted((row["score"] for row in results), reverse=True)
+
+    results = client.get("/recipes/semantic-search", params={"q": "된장국", "min_eng": 200}).json()
+    assert [row["rcp_nm"] for row in results] == ["된장찌개", "초코 케이크"]
+    results = client.get("/recipes/semantic-search", params={"q": "된장국", "rcp_pat2": "후식"}).json()
+    assert [row["rcp_nm"] for row in results] == ["초코 케이크"]
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from conftest import make_recipe
+
+from app import write_batcher
+from app.crud_recipes import after_insert
+from app.database import database
+from app.main import app
+from app.models import notes, recipes
+from app.recipe_bodies import fetch_recipe
+from app.write_batcher import WriteBatcher
+
+
+@pytest.fixture
+def chunk_sizes(monkeypatch):
+    """배처가 INSERT 한 번에 넣은 행 수 기록"""
+    sizes = []
+    insert_chunk = write_batcher._insert_chunk
+
+    async def recording(table, chunk, *args):
+        sizes.append(len(chunk))
+        return await insert_chunk(table, chunk, *args)
+
+    monkeypatch.setattr(write_batcher, "_insert_chunk", recording)
+    return sizes
+
+
+def _run(scenario):
+    async def wrapped():
+        await database.connect()
+        try:
+            return await scenario()
+        finally:
+            await database.disconnect()
+    return asyncio.run(wrapped())
+
+
+def test_each_request_gets_its_own_id(reset_db, chunk_sizes):
+    async def scenario():
+        batcher = WriteBatcher(notes, window_ms=20, max_size=64)
+        batcher.start()
+        ids = await asyncio.gather(*[
+            batcher.insert({"title": f"title{i}", "content": f"content{i}"}) for i in range(150)])
+        await batcher.stop()
+        rows = {record["id"]: record["title"] for record in await database.fetch_all(notes.select())}
+        return ids, rows
+
+    ids, rows = _run(scenario)
+
+    assert len(set(ids)) == 150
+    assert [rows[note_id] for note_id in ids] == [f"title{i}" for i in range(150)]
+    # 여러 요청이 실제로 한 INSERT로 합쳐졌고 max_size를 넘지 않음
+    assert sum(chunk_sizes) == 150
+    assert max(chunk_sizes) > 1
+    assert max(chunk_sizes) <= 64
+
+
+def test_failed_row_gets_error_and_others_are_inserted(reset_db, chunk_sizes):
+    async def scenario():
+        batcher = WriteBatcher(recipes, window_ms=50, after_insert=after_insert)
+        batcher.start()
+        results = await asyncio.gather(
+            batcher.insert(make_recipe(1)),
+            batcher.insert(make_recipe(2, rcp_parts_dtls="돼지고기 200g, 김치 1/4포기")),
+            batcher.insert(make_recipe(1, rcp_nm="중복")),
+            return_exceptions=True,
+        )
+        await batcher.stop()
+        stored = [await fetch_recipe(result) for result in results[:2]]
+        count = len(await database.fetch_all(select(recipes.c.id)))
+        return results, stored, count
+
+    results, stored, count = _run(scenario)
+
+    assert isinstance(results[2], Exception)
+    assert count == 2
+    # 행 단위로 다시 넣을 때도 id와 본문(after_insert)이 해당 요청의 행과 짝지어짐
+    assert [row["rcp_seq"] for row in stored] == ["1", "2"]
+    assert stored[1]["rcp_parts_dtls"] == "돼지고기 200g, 김치 1/4포기"
+    assert chunk_sizes == [3]
+
+
+def test_stop_flushes_pending_rows(reset_db):
+    async def scenario():
+        batcher = WriteBatcher(notes, window_ms=1000, max_size=4)
+        batcher.start()
+        tasks = [asyncio.create_task(batcher.insert({"title": str(i), "content": ""})) for i in range(10)]
+        await asyncio.sleep(0)
+        await batcher.stop()
+        ids = await asyncio.gather(*tasks)
+        rows = {record["id"]: record["title"] for record in await database.fetch_all(notes.select())}
+        return ids, rows
+
+    ids, rows = _run(scenario)
+
+    assert [rows[note_id] for note_id in ids] == [str(i) for i in range(10)]
+
+
+def test_post_endpoints_with_coalescing(monkeypatch, reset_db):
+    monkeypatch.setattr(write_batcher, "WRITE_COALESCING", True)
+    with TestClient(app) as client:
+        assert write_batcher.get_batcher(notes) is not None
+        note = client.post("/notes/", json={"title": "t", "content": "c"}).json()
+        recipe = client.post("/recipes/", json=make_recipe(7)).json()
+
+        assert client.get(f"/notes/{note['id']}").json()["title"] == "t"
+        assert client.get(f"/recipes/{recipe['id']}").json()["rcp_parts_dtls"] == make_recipe(7)["rcp_parts_dtls"]
+    assert write_batcher.get_batcher(notes) is None